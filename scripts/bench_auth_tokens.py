@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark des requêtes authentifiées : avec et sans cache des tokens.
+
+Sans cache, chaque requête décode le JWT, vérifie sa signature HMAC et
+construit un nouvel utilisateur ; avec le cache, un terminal qui réutilise
+son token retrouve l'utilisateur déjà vérifié. Mesure verify_token seul,
+puis des requêtes envoyées directement à l'application ASGI (sans client
+HTTP), pour un seul token et pour un parc de terminaux.
+
+Usage:
+    python scripts/bench_auth_tokens.py
+    python scripts/bench_auth_tokens.py --requests 20000 --terminals 500
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api import auth  # noqa: E402
+from poshub_api.auth import (  # noqa: E402
+    TokenCache,
+    create_access_token,
+    verify_token,
+)
+from poshub_api.main import app  # noqa: E402
+from poshub_api.orders.router import order_service  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+ENDPOINTS = ("/auth/me", "/orders/bench-1")
+
+
+def make_tokens(count: int) -> list[str]:
+    return [
+        create_access_token(
+            {"sub": f"pos-{i}", "scopes": ["orders:read", "orders:write"]},
+            expires_delta=timedelta(minutes=30),
+        )
+        for i in range(count)
+    ]
+
+
+async def call(path: str, headers: list) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def use_cache(enabled: bool) -> None:
+    auth.token_cache = TokenCache(max_entries=10000 if enabled else 0)
+
+
+def measure_verify(tokens: list[str], count: int) -> None:
+    for enabled in (False, True):
+        use_cache(enabled)
+        start = time.perf_counter()
+        for i in range(count):
+            verify_token(tokens[i % len(tokens)])
+        elapsed = (time.perf_counter() - start) / count * 1e6
+        label = "avec cache" if enabled else "sans cache"
+        print(f"verify_token {label:<22} {elapsed:>8.1f} µs")
+
+
+async def measure_requests(path: str, tokens: list[str], count: int):
+    headers = [
+        [(b"authorization", f"Bearer {token}".encode())] for token in tokens
+    ]
+    for enabled in (False, True):
+        use_cache(enabled)
+        start = time.perf_counter()
+        for i in range(count):
+            status = await call(path, headers[i % len(headers)])
+            assert status == 200, status
+        elapsed = time.perf_counter() - start
+        label = "avec cache" if enabled else "sans cache"
+        print(f"{path:<18} {label:<16} {count / elapsed:>9,.0f} req/s")
+
+
+async def main(args):
+    # Les logs par requête masqueraient le coût mesuré
+    logging.getLogger().setLevel(logging.WARNING)
+    await order_service.create_order(
+        OrderIn(
+            orderId="bench-1",
+            createdAt=BASE,
+            totalAmount=42.0,
+            currency="EUR",
+        )
+    )
+    for terminals in (1, args.terminals):
+        tokens = make_tokens(terminals)
+        print(f"\n📊 {terminals} token(s), {args.requests} requêtes")
+        measure_verify(tokens, args.requests)
+        for path in ENDPOINTS:
+            await measure_requests(path, tokens, args.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--terminals", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
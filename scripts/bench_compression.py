@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la compression des réponses : coût CPU contre octets gagnés.
+
+Pour des listes de commandes typiques (corps de GET /orders), mesure la
+taille et le temps de compression de chaque encodeur du middleware (gzip
+et brotli, à plusieurs niveaux), puis le temps total d'une requête
+traversant CompressionMiddleware, envoyée directement à l'application
+ASGI (sans client HTTP).
+
+Usage:
+    python scripts/bench_compression.py
+    python scripts/bench_compression.py --sizes 10,100,1000,5000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi import FastAPI, Response  # noqa: E402
+
+from poshub_api.compression import (  # noqa: E402
+    BrotliEncoder,
+    CompressionMiddleware,
+    GzipEncoder,
+    brotli,
+)
+from poshub_api.orders.projection import projection  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CURRENCIES = ("EUR", "USD", "GBP", "CHF")
+
+
+def order_list(count: int) -> bytes:
+    """Corps JSON d'une page de commandes, comme GET /orders."""
+    rng = random.Random(count)
+    fields = projection()
+    items = ",".join(
+        fields.to_json(
+            OrderIn(
+                orderId=f"POS-{rng.randrange(10**8):08d}",
+                createdAt=BASE + timedelta(seconds=rng.randrange(86400)),
+                totalAmount=round(rng.uniform(1, 500), 2),
+                currency=rng.choice(CURRENCIES),
+            )
+        )
+        for _ in range(count)
+    )
+    return (
+        f'{{"items":[{items}],"total":{count},"limit":{count},'
+        f'"nextCursor":null}}'
+    ).encode()
+
+
+def encoders():
+    yield "gzip 1", lambda: GzipEncoder(1)
+    yield "gzip 6", lambda: GzipEncoder(6)
+    yield "gzip 9", lambda: GzipEncoder(9)
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            yield f"br {quality}", lambda q=quality: BrotliEncoder(q)
+
+
+def measure_encoders(body: bytes, duration: float) -> None:
+    """Chaque encodeur est répété pendant au moins duration secondes."""
+    print(f"{'encodeur':<10} {'octets':>10} {'ratio':>7} {'µs':>10}")
+    print(f"{'identity':<10} {len(body):>10,} {1:>7.2f} {0:>10.0f}")
+    for label, factory in encoders():
+        rounds = 0
+        start = time.perf_counter()
+        while rounds < 3 or time.perf_counter() - start < duration:
+            encoder = factory()
+            compressed = encoder.compress(body) + encoder.finish()
+            rounds += 1
+        elapsed = (time.perf_counter() - start) / rounds * 1e6
+        print(
+            f"{label:<10} {len(compressed):>10,} "
+            f"{len(body) / len(compressed):>7.2f} {elapsed:>10.0f}"
+        )
+
+
+async def call(app, accept_encoding: bytes) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/orders",
+        "raw_path": b"/orders",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", accept_encoding)],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure_requests(body: bytes, requests: int) -> None:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/orders")
+    async def orders():
+        return Response(body, media_type="application/json")
+
+    for label, accept_encoding in (
+        ("sans compression", b"identity"),
+        ("gzip (niveau 6)", b"gzip"),
+        ("br (qualité 4)", b"br, gzip"),
+    ):
+        start = time.perf_counter()
+        for _ in range(requests):
+            size = await call(app, accept_encoding)
+        elapsed = (time.perf_counter() - start) / requests * 1e6
+        print(f"{label:<20} {size:>10,} octets {elapsed:>8.0f} µs/requête")
+
+
+async def main(args):
+    for count in map(int, args.sizes.split(",")):
+        body = order_list(count)
+        print(f"\n📊 {count} commandes ({len(body):,} octets)")
+        measure_encoders(body, args.duration)
+        await measure_requests(body, args.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--duration", type=float, default=0.3)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu JSON par endpoint : JSONResponse contre FastJSONResponse.
+
+Pour chaque endpoint, la route de l'application est reconstruite avec la
+classe de réponse de Starlette (json.dumps) puis avec FastJSONResponse
+(orjson ou pydantic-core), et les requêtes sont envoyées directement au
+routeur ASGI (sans middleware ni client HTTP). Un second tableau mesure
+le seul rendu des corps de réponse.
+
+Usage:
+    python scripts/bench_json_responses.py
+    python scripts/bench_json_responses.py --requests 1000 --orders 10000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, request_response  # noqa: E402
+
+from poshub_api.auth import create_access_token  # noqa: E402
+from poshub_api.main import app  # noqa: E402
+from poshub_api.orders.router import order_service  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.responses import (  # noqa: E402
+    JSON_ENGINE,
+    FastJSONResponse,
+)
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+WINDOW = "createdFrom=2025-01-01T00:00:00Z&createdTo=2025-01-02T00:00:00Z"
+ENDPOINTS = [
+    ("/health", ""),
+    ("/metrics", ""),
+    ("/auth/scopes", ""),
+    ("/auth/me", ""),
+    ("/orders/stats", f"{WINDOW}&granularity=hour"),
+    ("/orders/stats", f"{WINDOW}&granularity=minute"),
+]
+
+
+def use_response_class(response_class) -> None:
+    """Reconstruit les routes avec la classe de réponse donnée."""
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.response_class = response_class
+            route.app = request_response(route.get_route_handler())
+
+
+async def call(path: str, query: str, headers: list) -> bytes:
+    """Requête GET envoyée directement au routeur ASGI."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+        "app": app,
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app.router(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(path: str, query: str, headers: list, count: int):
+    start = time.perf_counter()
+    for _ in range(count):
+        body = await call(path, query, headers)
+    return count / (time.perf_counter() - start), body
+
+
+async def seed(count: int) -> None:
+    await order_service.create_orders(
+        OrderIn(
+            orderId=f"bench-{i}",
+            createdAt=BASE + timedelta(seconds=86400 * i / count),
+            totalAmount=10.0 + i % 100,
+            currency=("EUR", "USD", "GBP")[i % 3],
+        )
+        for i in range(count)
+    )
+
+
+def render_bench(bodies: dict, rounds: int) -> None:
+    print(f"\n{'rendu seul':<28} {'json.dumps':>12} {JSON_ENGINE:>14}")
+    for label, content in bodies.items():
+        timings = []
+        for response_class in (JSONResponse, FastJSONResponse):
+            render = response_class.render
+            start = time.perf_counter()
+            for _ in range(rounds):
+                render(None, content)
+            timings.append((time.perf_counter() - start) / rounds * 1e6)
+        print(
+            f"{label:<28} {timings[0]:>9.1f} µs {timings[1]:>11.1f} µs  "
+            f"x{timings[0] / timings[1]:.1f}"
+        )
+
+
+async def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    await seed(args.orders)
+    token = create_access_token(
+        {"sub": "admin", "scopes": ["orders:read", "orders:write"]}
+    )
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+
+    print(f"📊 {args.requests} requêtes par endpoint, moteur {JSON_ENGINE}")
+    print(f"{'endpoint':<28} {'JSONResponse':>14} {'FastJSON':>14}")
+    bodies = {}
+    for path, query in ENDPOINTS:
+        rates = []
+        for response_class in (JSONResponse, FastJSONResponse):
+            use_response_class(response_class)
+            rate, body = await measure(path, query, headers, args.requests)
+            rates.append(rate)
+        label = path + (f" ({query.rsplit('=', 1)[1]})" if query else "")
+        bodies[label] = json.loads(body)
+        print(
+            f"{label:<28} {rates[0]:>10,.0f} r/s {rates[1]:>10,.0f} r/s  "
+            f"x{rates[1] / rates[0]:.2f}  ({len(body):,} o)"
+        )
+    render_bench(bodies, args.requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--orders", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
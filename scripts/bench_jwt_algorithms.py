@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la signature et de la vérification des tokens par algorithme.
+
+Compare HS256 (secret partagé), RS256 (RSA 2048) et ES256 (P-256) avec
+python-jose, la clé étant passée soit en PEM / chaîne (analysée à chaque
+appel, comme avant le trousseau), soit en objet clé pré-analysé par le
+trousseau (poshub_api.keyring). Le cache des tokens vérifiés n'intervient
+pas ici : chaque vérification refait la signature.
+
+EdDSA n'est pas mesuré : python-jose ne le gère pas.
+
+Usage:
+    python scripts/bench_jwt_algorithms.py
+    python scripts/bench_jwt_algorithms.py --count 5000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ec, rsa  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from poshub_api.auth import SECRET_KEY  # noqa: E402
+from poshub_api.keyring import parse_key  # noqa: E402
+
+CLAIMS = {
+    "sub": "pos-terminal-42",
+    "scopes": ["orders:read", "orders:write"],
+    "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+}
+
+
+def pems(private_key) -> tuple[str, str]:
+    private = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private, public
+
+
+def rate(function, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return count / (time.perf_counter() - start)
+
+
+def main(args):
+    rsa_private, rsa_public = pems(
+        rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    )
+    ec_private, ec_public = pems(ec.generate_private_key(ec.SECP256R1()))
+    cases = [
+        ("HS256", SECRET_KEY, SECRET_KEY),
+        ("RS256", rsa_private, rsa_public),
+        ("ES256", ec_private, ec_public),
+    ]
+    print(f"📊 {args.count} opérations par mesure (opérations/s)")
+    print(
+        f"{'algorithme':<11} {'signe PEM':>11} {'signe objet':>12} "
+        f"{'vérifie PEM':>12} {'vérifie objet':>14}"
+    )
+    for algorithm, private, public in cases:
+        key = parse_key("bench", private, algorithm)
+        token = jwt.encode(CLAIMS, key.signer, algorithm=algorithm)
+        results = [
+            rate(
+                lambda: jwt.encode(CLAIMS, private, algorithm=algorithm),
+                args.count,
+            ),
+            rate(
+                lambda: jwt.encode(CLAIMS, key.signer, algorithm=algorithm),
+                args.count,
+            ),
+            rate(
+                lambda: jwt.decode(token, public, algorithms=[algorithm]),
+                args.count,
+            ),
+            rate(
+                lambda: jwt.decode(
+                    token, key.verifier, algorithms=[algorithm]
+                ),
+                args.count,
+            ),
+        ]
+        print(
+            f"{algorithm:<11} {results[0]:>11,.0f} {results[1]:>12,.0f} "
+            f"{results[2]:>12,.0f} {results[3]:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la latence des commandes pendant une rafale de connexions.
+
+Un client lit des commandes en continu (GET /orders/{id}) pendant que des
+clients concurrents se connectent en boucle. Trois scénarios :
+- sans connexion (référence) ;
+- vérification bcrypt directement dans le handler async (bloque la
+  boucle d'événements le temps du hachage) ;
+- vérification par PasswordVerifier (pool de threads borné, file bornée).
+
+Les requêtes sont envoyées directement à l'application ASGI, sans client
+HTTP ; les lectures de commandes partent à cadence fixe et leur latence
+est relevée depuis l'instant prévu (p50, p99, max).
+
+Usage:
+    python scripts/bench_login_flood.py
+    python scripts/bench_login_flood.py --duration 10 --logins 32
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi import FastAPI, HTTPException, Response  # noqa: E402
+
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.service import OrderService  # noqa: E402
+from poshub_api.users import (  # noqa: E402
+    TEST_USERS,
+    InMemoryUserStore,
+    PasswordVerifier,
+    PasswordVerifierBusy,
+    verify_password,
+)
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def build_app(service: OrderService, verifier: PasswordVerifier) -> FastAPI:
+    app = FastAPI()
+    store = InMemoryUserStore(TEST_USERS.values())
+
+    @app.get("/orders/{order_id}")
+    async def get_order(order_id: str):
+        order = await service.get_order_body(order_id)
+        if not order:
+            raise HTTPException(status_code=404)
+        return Response(order.body, media_type="application/json")
+
+    @app.post("/login-inline")
+    async def login_inline(credentials: dict):
+        stored = await store.get(credentials["username"])
+        return {"ok": verify_password(credentials["password"], stored[1])}
+
+    @app.post("/login-pool")
+    async def login_pool(credentials: dict):
+        stored = await store.get(credentials["username"])
+        try:
+            ok = await verifier.verify(credentials["password"], stored[1])
+        except PasswordVerifierBusy:
+            raise HTTPException(status_code=503)
+        return {"ok": ok}
+
+    return app
+
+
+async def call(app, method: str, path: str, body: bytes = b"") -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def read_orders(app, deadline: float, interval: float) -> list[float]:
+    """
+    Lectures à cadence fixe ; la latence part de l'instant prévu, pas de
+    l'envoi effectif : une boucle bloquée compte le temps d'attente.
+    """
+    latencies = []
+    i = 0
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        status = await call(app, "GET", f"/orders/bench-{i % 100}")
+        latencies.append(time.perf_counter() - scheduled)
+        assert status == 200, status
+        i += 1
+        scheduled += interval
+    return latencies
+
+
+async def flood(app, path: str, deadline: float, counts: dict) -> None:
+    body = json.dumps({"username": "admin", "password": "admin123"}).encode()
+    while time.perf_counter() < deadline:
+        status = await call(app, "POST", path, body)
+        counts[status] = counts.get(status, 0) + 1
+        await asyncio.sleep(0)
+
+
+async def scenario(app, label: str, path, logins: int, args):
+    deadline = time.perf_counter() + args.duration
+    counts: dict[int, int] = {}
+    tasks = [
+        asyncio.create_task(flood(app, path, deadline, counts))
+        for _ in range(logins if path else 0)
+    ]
+    latencies = sorted(await read_orders(app, deadline, args.interval / 1000))
+    await asyncio.gather(*tasks)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    logins_done = ", ".join(f"{n}×{s}" for s, n in sorted(counts.items()))
+    print(
+        f"{label:<24} {len(latencies):>6} lectures  p50 {p50:>7.2f} ms  "
+        f"p99 {p99:>7.2f} ms  max {latencies[-1] * 1000:>7.1f} ms  "
+        f"connexions: {logins_done or '-'}"
+    )
+
+
+async def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    service = OrderService()
+    for i in range(100):
+        await service.create_order(
+            OrderIn(
+                orderId=f"bench-{i}",
+                createdAt=BASE,
+                totalAmount=10.0 + i,
+                currency="EUR",
+            )
+        )
+    verifier = PasswordVerifier(workers=args.workers)
+    app = build_app(service, verifier)
+    print(
+        f"📊 {args.logins} clients de connexion, une lecture toutes les "
+        f"{args.interval:g} ms, {args.duration:.0f} s par scénario"
+    )
+    print(
+        f"   pool de {verifier.workers} thread(s), "
+        f"file de {verifier.max_pending}"
+    )
+    await scenario(app, "sans connexion", None, 0, args)
+    await scenario(
+        app,
+        "bcrypt dans le handler",
+        "/login-inline",
+        args.logins,
+        args,
+    )
+    await scenario(app, "PasswordVerifier", "/login-pool", args.logins, args)
+    verifier.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=5.0, help="ms")
+    asyncio.run(main(parser.parse_args()))
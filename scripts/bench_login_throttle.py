@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la limitation des tentatives de connexion.
+
+Mesure le coût d'une tentative décomptée par les seaux à jetons, en
+mémoire (avec et sans éviction LRU) et en SQLite partagé, et le compare à
+celui d'une vérification bcrypt évitée par un refus 429.
+
+Usage:
+    python scripts/bench_login_throttle.py
+    python scripts/bench_login_throttle.py --count 50000 --keys 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.throttling import (  # noqa: E402
+    SQLiteTokenBucketLimiter,
+    TokenBucketLimiter,
+)
+from poshub_api.users import TEST_USERS, verify_password  # noqa: E402
+
+
+async def rate(limiter, keys: list[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        await limiter.acquire(key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+async def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    distinct = [f"user:spray-{i}" for i in range(args.count)]
+    hot = ["ip:203.0.113.7"] * args.count
+    print(f"📊 {args.count} tentatives par mesure (tentatives/s)")
+
+    cases = [
+        ("mémoire, une clé", TokenBucketLimiter(5, 0.1), hot),
+        (
+            "mémoire, clés distinctes",
+            TokenBucketLimiter(5, 0.1, max_keys=args.keys),
+            distinct,
+        ),
+        (
+            "mémoire, éviction LRU",
+            TokenBucketLimiter(5, 0.1, max_keys=args.count // 10),
+            distinct,
+        ),
+    ]
+    for label, limiter, keys in cases:
+        result = await rate(limiter, keys)
+        stats = limiter.stats()
+        print(
+            f"{label:<28} {result:>10,.0f}   refusées {stats['limited']:>7}"
+            f"   clés {stats['keys']:>7}   évincées {stats['evicted']}"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        limiter = SQLiteTokenBucketLimiter(f"{tmp}/throttle.db", 5, 0.1)
+        sqlite_count = min(args.count, 5000)
+        result = await rate(limiter, distinct[:sqlite_count])
+        print(
+            f"{'SQLite partagé':<28} {result:>10,.0f}   "
+            f"({sqlite_count} tentatives)"
+        )
+        limiter.close()
+
+    password_hash = TEST_USERS["admin"].password_hash
+    start = time.perf_counter()
+    for _ in range(5):
+        verify_password("wrong", password_hash)
+    bcrypt_rate = 5 / (time.perf_counter() - start)
+    print(f"{'vérification bcrypt':<28} {bcrypt_rate:>10,.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
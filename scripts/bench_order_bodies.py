@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark de GET et POST /orders : response_model contre JSON pré-sérialisé.
+
+Monte une application FastAPI minimale (sans authentification) exposant les
+mêmes commandes par deux jeux de routes : l'ancien, qui retourne
+l'enregistrement validé puis encodé via response_model=OrderOut, et le
+nouveau, qui sert le JSON mis en cache à l'écriture avec son ETag (et 304
+sur If-None-Match). Les requêtes sont envoyées directement à l'application
+ASGI, sans client HTTP, pour ne mesurer que le coût côté serveur ; la
+latence de chaque requête est relevée (p50, p99).
+
+Usage:
+    python scripts/bench_order_bodies.py
+    python scripts/bench_order_bodies.py --requests 20000 --orders 1000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi import FastAPI, HTTPException, Request, Response  # noqa: E402
+
+from poshub_api.orders.bodies import (  # noqa: E402
+    OrderBodyCache,
+    etag_matches,
+)
+from poshub_api.orders.schemas import OrderIn, OrderOut  # noqa: E402
+from poshub_api.orders.service import OrderService  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def build_app(service: OrderService) -> FastAPI:
+    app = FastAPI()
+
+    def raw(order) -> Response:
+        return Response(
+            order.body,
+            media_type="application/json",
+            headers={"ETag": order.etag},
+        )
+
+    @app.post("/model/", response_model=OrderOut)
+    async def create_model(order: OrderIn):
+        return await service.create_order(order)
+
+    @app.post("/raw/", response_model=OrderOut)
+    async def create_raw(order: OrderIn):
+        record = await service.create_order(order)
+        return raw(service.order_bodies([record])[0])
+
+    @app.get("/model/{order_id}", response_model=OrderOut)
+    async def get_model(order_id: str):
+        order = await service.get_order(order_id)
+        if not order:
+            raise HTTPException(status_code=404)
+        return order
+
+    @app.get("/raw/{order_id}", response_model=OrderOut)
+    async def get_raw(order_id: str, request: Request):
+        order = await service.get_order_body(order_id)
+        if not order:
+            raise HTTPException(status_code=404)
+        if etag_matches(request.headers.get("if-none-match"), order.etag):
+            return Response(status_code=304, headers={"ETag": order.etag})
+        return raw(order)
+
+    return app
+
+
+async def call(app, method: str, path: str, headers: list, body=b"") -> int:
+    """Requête envoyée directement à l'application ASGI."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def order_json(i: int) -> bytes:
+    return json.dumps(
+        {
+            "orderId": f"bench-{i}",
+            "createdAt": (BASE + timedelta(seconds=i)).isoformat(),
+            "totalAmount": 10.0 + i % 100,
+            "currency": "EUR",
+        }
+    ).encode()
+
+
+async def measure(app, label: str, requests, count: int) -> None:
+    latencies = []
+    for i in range(count):
+        method, path, headers, body = requests(i)
+        start = time.perf_counter()
+        status = await call(app, method, path, headers, body)
+        latencies.append(time.perf_counter() - start)
+        assert status in (200, 304), status
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(
+        f"{label:<34} {count / sum(latencies):>9,.0f} req/s  "
+        f"p50 {p50:>6.0f} µs  p99 {p99:>6.0f} µs"
+    )
+
+
+async def main(args):
+    service = OrderService(body_cache=OrderBodyCache())
+    app = build_app(service)
+    json_headers = [(b"content-type", b"application/json")]
+    bodies = [order_json(i) for i in range(args.orders)]
+    print(f"📊 {args.requests} requêtes sur {args.orders} commandes")
+
+    def create(prefix):
+        def request(i):
+            return "POST", f"/{prefix}/", json_headers, bodies[i % args.orders]
+
+        return request
+
+    def read(prefix, etags=None):
+        def request(i):
+            order_id = f"bench-{i % args.orders}"
+            headers = (
+                [(b"if-none-match", etags[order_id].encode())] if etags else []
+            )
+            return "GET", f"/{prefix}/{order_id}", headers, b""
+
+        return request
+
+    for _ in range(args.rounds):
+        await measure(
+            app, "POST response_model=OrderOut", create("model"), args.requests
+        )
+        await measure(
+            app, "POST JSON pré-sérialisé", create("raw"), args.requests
+        )
+        etags = {
+            f"bench-{i}": (await service.get_order_body(f"bench-{i}")).etag
+            for i in range(args.orders)
+        }
+        await measure(
+            app, "GET response_model=OrderOut", read("model"), args.requests
+        )
+        await measure(
+            app, "GET JSON pré-sérialisé", read("raw"), args.requests
+        )
+        await measure(
+            app, "GET If-None-Match (304)", read("raw", etags), args.requests
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark des agrégats de montants : boucle Python flottante contre
+colonnes en unités mineures (NumPy, puis repli Python pur).
+
+Calcule le chiffre d'affaires par devise, la moyenne et les percentiles
+p50/p90/p99 sur l'ensemble des commandes, et compare la somme flottante à
+la somme exacte en unités mineures.
+
+Usage:
+    python scripts/bench_order_columns.py
+    python scripts/bench_order_columns.py --orders 5000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders import columns as columns_module  # noqa: E402
+from poshub_api.orders.columns import AmountColumns  # noqa: E402
+from poshub_api.orders.records import OrderRecord  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CURRENCIES = ("EUR", "USD", "JPY", "KWD")
+PERCENTILES = (50, 90, 99)
+
+
+def make_columns(count: int) -> tuple[AmountColumns, list[OrderRecord]]:
+    rng = random.Random(42)
+    columns = AmountColumns()
+    records = []
+    for i in range(count):
+        currency = CURRENCIES[i % len(CURRENCIES)]
+        amount = round(rng.uniform(0.5, 500), 0 if currency == "JPY" else 2)
+        record = OrderRecord.from_values(
+            f"bench-{i}",
+            BASE + timedelta(seconds=i),
+            amount * (100 if currency == "JPY" else 1),
+            currency,
+        )
+        records.append(record)
+        columns.add(record)
+    return columns, records
+
+
+def float_loop(records) -> dict:
+    """Approche précédente : sommes flottantes et tri en Python."""
+    amounts = defaultdict(list)
+    for record in records:
+        amounts[record.currency].append(record.totalAmount)
+    result = {}
+    for code, values in amounts.items():
+        total = 0.0
+        for value in values:
+            total += value
+        ordered = sorted(values)
+        result[code] = {
+            "total": total,
+            "average": total / len(values),
+            "p99": ordered[int(0.99 * (len(ordered) - 1))],
+        }
+    return result
+
+
+def timed(label: str, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+def main(args):
+    print(f"📊 {args.orders:,} commandes, {len(CURRENCIES)} devises")
+    columns, records = make_columns(args.orders)
+    end = (BASE + timedelta(seconds=args.orders + 60)).timestamp()
+
+    floats = timed("boucle Python (float)", lambda: float_loop(records))
+    exact = timed(
+        "colonnes NumPy (unités mineures)",
+        lambda: columns.summary(0, end, percentiles=PERCENTILES),
+    )
+    numpy = columns_module.np
+    columns_module.np = None
+    try:
+        fallback = timed(
+            "colonnes Python pur",
+            lambda: columns.summary(0, end, percentiles=PERCENTILES),
+        )
+    finally:
+        columns_module.np = numpy
+    assert fallback == exact
+
+    print(
+        f"\n{'devise':<8} {'total exact':>20} {'écart de la somme float':>26}"
+    )
+    for code in CURRENCIES:
+        total = exact[code]["total"]
+        drift = floats[code]["total"] - total
+        print(f"{code:<8} {total:>20,.3f} {drift:>26.3e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=500_000)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark de stress des écritures concurrentes du service.
+
+Lance des milliers de create_order sur un dépôt simulant une latence
+d'écriture (comme un appel réseau ou un fsync), à plusieurs niveaux de
+concurrence ; seules les écritures d'un même orderId se suivent. Vérifie
+ensuite que les index et agrégats correspondent exactement au contenu du
+dépôt.
+
+Usage:
+    python scripts/bench_order_concurrency.py
+    python scripts/bench_order_concurrency.py --orders 20000 --concurrency 1 10
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.repository import InMemoryOrderRepository  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.service import OrderService  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class LatencyRepository(InMemoryOrderRepository):
+    """Dépôt en mémoire avec une latence d'écriture aléatoire."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    async def add(self, order) -> None:
+        await asyncio.sleep(random.uniform(0, self.latency))
+        await super().add(order)
+        await asyncio.sleep(random.uniform(0, self.latency))
+
+
+def make_orders(count: int, distinct: int) -> list[OrderIn]:
+    return [
+        OrderIn.model_construct(
+            orderId=f"bench-{i % distinct}",
+            createdAt=BASE + timedelta(seconds=i % distinct),
+            totalAmount=1.0 + i % 97,
+            currency="EUR",
+        )
+        for i in range(count)
+    ]
+
+
+async def check(service: OrderService) -> bool:
+    """Index et agrégats conformes au contenu du dépôt."""
+    stored = service.repository.orders
+    for order_id, record in stored.items():
+        entry = service.index.entry(order_id)
+        if entry is None or entry[2] != record.totalAmount:
+            return False
+    stats = await service.order_stats(BASE, BASE + timedelta(days=1))
+    totals = stats["totals"].get("EUR", {"count": 0})
+    return totals["count"] == len(stored)
+
+
+async def run(concurrency: int, orders: list[OrderIn], args) -> None:
+    service = OrderService(LatencyRepository(args.latency))
+    await service.list_orders()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(order):
+        async with semaphore:
+            await service.create_order(order)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(create(order) for order in orders))
+    elapsed = time.perf_counter() - start
+    status = "✅" if await check(service) else "❌ index incohérent"
+    print(
+        f"concurrence {concurrency:>5}  "
+        f"{len(orders) / elapsed:>10,.0f} créations/s  "
+        f"{status}"
+    )
+
+
+async def main(args):
+    orders = make_orders(args.orders, args.distinct)
+    print(
+        f"📊 {args.orders} create_order ({args.distinct} orderId distincts), "
+        f"latence ≤ {args.latency * 1000} ms"
+    )
+    for concurrency in args.concurrency:
+        await run(concurrency, orders, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 100, 2000]
+    )
+    parser.add_argument("--latency", type=float, default=0.002)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark du dépôt DynamoDB sur un DynamoDB local simulé (moto).
+
+Compare les écritures unitaires (PutItem) aux écritures par lots
+(BatchWriteItem) et les lectures unitaires (GetItem) aux lectures par lots
+(BatchGetItem), puis mesure /orders/stats servi par les seaux d'agrégats
+stockés dans la table. Les chiffres absolus reflètent moto et non AWS ; le
+ratio d'appels réseau entre les chemins, lui, est représentatif.
+
+Usage:
+    python scripts/bench_order_dynamodb.py
+    python scripts/bench_order_dynamodb.py --orders 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.dynamodb import DynamoDBOrderRepository  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.service import OrderService  # noqa: E402
+
+TABLE = "poshub-orders-bench"
+
+
+NOW = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+def index(name: str, partition: str, sort: str) -> dict:
+    return {
+        "IndexName": name,
+        "KeySchema": [
+            {"AttributeName": partition, "KeyType": "HASH"},
+            {"AttributeName": sort, "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+def make_orders(count: int, prefix: str) -> list[OrderIn]:
+    return [
+        OrderIn(
+            orderId=f"{prefix}-{i}",
+            # Réparties sur les dernières 24 heures
+            createdAt=NOW - timedelta(seconds=i * 37 % 86400),
+            totalAmount=10.0 + i % 100,
+            currency="EUR",
+        )
+        for i in range(count)
+    ]
+
+
+async def timed_calls(func, items) -> list[float]:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        await func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, count: int, elapsed: float, latencies=None) -> None:
+    line = f"{label:<24} {count / elapsed:>10,.0f} commandes/s"
+    if latencies:
+        p50 = statistics.median(latencies) * 1000
+        p99 = sorted(latencies)[int(len(latencies) * 0.99)] * 1000
+        line += f"   p50 {p50:.2f} ms   p99 {p99:.2f} ms"
+    print(line)
+
+
+async def main(args):
+    import boto3
+    from moto import mock_aws
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="eu-north-1")
+        client.create_table(
+            TableName=TABLE,
+            BillingMode="PAY_PER_REQUEST",
+            AttributeDefinitions=[
+                {"AttributeName": name, "AttributeType": "S"}
+                for name in (
+                    "orderId",
+                    "timeShard",
+                    "currency",
+                    "sortKey",
+                    "rollup",
+                    "bucketKey",
+                )
+            ],
+            KeySchema=[{"AttributeName": "orderId", "KeyType": "HASH"}],
+            GlobalSecondaryIndexes=[
+                index("byCreatedAt", "timeShard", "sortKey"),
+                index("byCurrency", "currency", "sortKey"),
+                index("byRollup", "rollup", "bucketKey"),
+            ],
+        )
+        repository = DynamoDBOrderRepository(TABLE, client=client)
+        print(f"📊 {args.orders} commandes (moto)")
+
+        singles = make_orders(args.orders, "single")
+        latencies = await timed_calls(repository.add, singles)
+        report("PutItem", len(singles), sum(latencies), latencies)
+
+        batched = make_orders(args.orders, "batch")
+        start = time.perf_counter()
+        await repository.add_many(batched)
+        report("BatchWriteItem", len(batched), time.perf_counter() - start)
+
+        ids = [order.orderId for order in batched]
+        latencies = await timed_calls(repository.get, ids)
+        report("GetItem", len(ids), sum(latencies), latencies)
+
+        start = time.perf_counter()
+        found = await repository.get_many(ids)
+        report("BatchGetItem", len(found), time.perf_counter() - start)
+
+        service = OrderService(repository)
+        window = (NOW - timedelta(days=1), NOW + timedelta(minutes=1))
+        latencies = await timed_calls(
+            lambda _: service.order_stats(*window, granularity="hour"),
+            range(20),
+        )
+        stats = await service.order_stats(*window)
+        print(
+            f"{'stats 24 h (seaux)':<24} "
+            f"{statistics.median(latencies) * 1000:>10.2f} ms / requête   "
+            f"({stats['totals']['EUR']['count']} commandes)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'export en flux des commandes.
+
+Mesure, pour des volumes croissants, le débit de l'export et le pic de
+mémoire alloué pendant l'export (tracemalloc, hors données déjà chargées) :
+ce pic doit rester stable quel que soit le nombre de commandes.
+
+Usage:
+    python scripts/bench_order_export.py
+    python scripts/bench_order_export.py --orders 10000 100000 1000000 --gzip
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.export import encode_pages, gzip_stream  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.service import OrderService  # noqa: E402
+
+
+async def build_service(count: int) -> OrderService:
+    service = OrderService()
+    base = datetime.now(timezone.utc)
+    await service.create_orders(
+        OrderIn(
+            orderId=f"bench-{i}",
+            createdAt=base + timedelta(seconds=i),
+            totalAmount=10.0 + i % 100,
+            currency="EUR",
+        )
+        for i in range(count)
+    )
+    # Construire l'index avant la mesure
+    await service.order_stats(base, base)
+    return service
+
+
+async def export(service: OrderService, fmt: str, compress: bool):
+    body = encode_pages(service.iter_orders(), fmt)
+    if compress:
+        body = gzip_stream(body)
+    size = 0
+    async for chunk in body:
+        size += len(chunk)
+    return size
+
+
+async def main(args):
+    print(f"{'commandes':>10} {'format':>8} {'débit':>14} {'pic mémoire':>12}")
+    for count in args.orders:
+        service = await build_service(count)
+        for fmt in ("ndjson", "csv"):
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = await export(service, fmt, args.gzip)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{count:>10,} {fmt:>8} {count / elapsed:>10,.0f} c/s "
+                f"{peak / 2**20:>9.1f} MiB   ({size / 2**20:.1f} MiB émis)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--orders", type=int, nargs="+", default=[10000, 100000]
+    )
+    parser.add_argument("--gzip", action="store_true")
+    asyncio.run(main(parser.parse_args()))
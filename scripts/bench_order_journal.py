@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark du mode durable (journal + snapshots) du dépôt en mémoire.
+
+Mesure :
+1. le surcoût d'écriture par commande par rapport au dictionnaire seul,
+   avec N coroutines concurrentes (group commit)
+2. le temps de redémarrage depuis un journal seul puis depuis un snapshot
+
+Usage:
+    python scripts/bench_order_journal.py
+    python scripts/bench_order_journal.py --orders 500000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.journal import JournaledOrderRepository  # noqa: E402
+from poshub_api.orders.repository import InMemoryOrderRepository  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+
+
+def make_orders(count: int) -> list[OrderIn]:
+    now = datetime.now(timezone.utc)
+    return [
+        OrderIn(
+            orderId=f"bench-{i}",
+            createdAt=now,
+            totalAmount=10.0 + i % 100,
+            currency="EUR",
+        )
+        for i in range(count)
+    ]
+
+
+async def timed_writes(repository, orders, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(order):
+        async with semaphore:
+            await repository.add(order)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(order) for order in orders))
+    return time.perf_counter() - start
+
+
+def timed_recovery(directory: str) -> tuple[float, int]:
+    start = time.perf_counter()
+    repository = JournaledOrderRepository(directory)
+    elapsed = time.perf_counter() - start
+    count = len(repository.orders)
+    repository._io.shutdown(wait=True)
+    repository._log.close()
+    return elapsed, count
+
+
+async def main(args):
+    orders = make_orders(args.orders)
+    print(f"📊 {args.orders} commandes, concurrence {args.concurrency}")
+
+    memory_time = await timed_writes(
+        InMemoryOrderRepository(), orders, args.concurrency
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journaled = JournaledOrderRepository(
+            tmp, snapshot_every=args.orders + 1
+        )
+        journal_time = await timed_writes(journaled, orders, args.concurrency)
+        stats = journaled.stats()
+        per_order_us = (journal_time - memory_time) / args.orders * 1e6
+
+        print(
+            f"memory     {args.orders / memory_time:>10,.0f} écritures/s\n"
+            f"journal    {args.orders / journal_time:>10,.0f} écritures/s  "
+            f"(+{per_order_us:.1f} µs/commande, "
+            f"{stats['records_per_fsync']:.0f} commandes/fsync)"
+        )
+
+        # Redémarrage depuis le journal seul
+        journaled._io.shutdown(wait=True)
+        journaled._log.close()
+        elapsed, count = await asyncio.to_thread(timed_recovery, tmp)
+        print(
+            f"replay journal   {count} commandes en {elapsed:.2f}s "
+            f"({count / elapsed:,.0f}/s)"
+        )
+
+        # Redémarrage depuis un snapshot
+        repository = JournaledOrderRepository(tmp)
+        await repository.close()
+        elapsed, count = await asyncio.to_thread(timed_recovery, tmp)
+        print(
+            f"replay snapshot  {count} commandes en {elapsed:.2f}s "
+            f"({count / elapsed:,.0f}/s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'empreinte mémoire par commande (tracemalloc).
+
+Compare un dictionnaire d'instances OrderIn (stockage historique) au dépôt
+en mémoire, qui conserve des OrderRecord compacts.
+
+Usage:
+    python scripts/bench_order_memory.py
+    python scripts/bench_order_memory.py --orders 1000000
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.repository import InMemoryOrderRepository  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+
+CURRENCIES = ("EUR", "USD", "GBP", "JPY")
+
+
+def make_payloads(count: int) -> list[dict]:
+    """Charges utiles JSON, comme reçues par l'API."""
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "orderId": f"order-{i:08d}",
+            "createdAt": (base + timedelta(seconds=i)).isoformat(),
+            "totalAmount": 10.0 + i % 1000 / 100,
+            "currency": CURRENCIES[i % len(CURRENCIES)],
+        }
+        for i in range(count)
+    ]
+
+
+async def store_models(payloads: list[dict]) -> dict:
+    orders = {}
+    for payload in payloads:
+        order = OrderIn.model_validate(payload)
+        orders[order.orderId] = order
+    return orders
+
+
+async def store_records(payloads: list[dict]) -> InMemoryOrderRepository:
+    repository = InMemoryOrderRepository()
+    for payload in payloads:
+        await repository.add(OrderIn.model_validate(payload))
+    return repository
+
+
+def measure(label: str, factory, payloads: list[dict]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    store = asyncio.run(factory(payloads))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_order = current / len(payloads)
+    print(f"{label:<26} {per_order:>7.0f} octets/commande")
+    del store
+    return per_order
+
+
+def main(args):
+    payloads = make_payloads(args.orders)
+    print(f"📊 {args.orders} commandes")
+    before = measure("dict d'OrderIn", store_models, payloads)
+    after = measure("InMemory (OrderRecord)", store_records, payloads)
+    print(f"gain: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark MessagePack contre JSON pour les représentations de commandes.
+
+Compare, pour une commande seule puis pour une page de commandes, la
+taille encodée (brute et gzip) et les temps d'encodage côté serveur et de
+décodage côté terminal. Le décodage JSON inclut la conversion des dates
+ISO en datetime, que MessagePack fournit directement (extension
+Timestamp).
+
+Usage:
+    python scripts/bench_order_msgpack.py
+    python scripts/bench_order_msgpack.py --page 1000 --rounds 200
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.negotiation import (  # noqa: E402
+    order_maps,
+    packb,
+    unpackb,
+)
+from poshub_api.orders.projection import projection  # noqa: E402
+from poshub_api.orders.records import OrderRecord  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def make_records(count: int) -> list[OrderRecord]:
+    return [
+        OrderRecord.from_values(
+            f"POS-{i:08d}",
+            BASE + timedelta(seconds=i * 37, microseconds=i * 1000),
+            1.0 + (i * 7919) % 50000 / 100,
+            ("EUR", "USD", "GBP")[i % 3],
+        )
+        for i in range(count)
+    ]
+
+
+def json_encode(records) -> bytes:
+    return projection().json_array(records).encode()
+
+
+def json_decode(data: bytes) -> list:
+    orders = json.loads(data)
+    for order in orders:
+        order["createdAt"] = datetime.fromisoformat(order["createdAt"])
+    return orders
+
+
+def msgpack_encode(records) -> bytes:
+    return packb(order_maps(records))
+
+
+def timed(function, argument, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function(argument)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def compare(label: str, records, rounds: int) -> None:
+    print(f"\n{label}")
+    print(
+        f"{'format':<10} {'octets':>9} {'gzip':>9} "
+        f"{'encodage':>12} {'décodage':>12}"
+    )
+    codecs = (
+        ("JSON", json_encode, json_decode),
+        ("MsgPack", msgpack_encode, unpackb),
+    )
+    for name, encode, decode in codecs:
+        data = encode(records)
+        assert len(decode(data)) == len(records)
+        print(
+            f"{name:<10} {len(data):>9,} {len(gzip.compress(data)):>9,} "
+            f"{timed(encode, records, rounds):>9.1f} µs "
+            f"{timed(decode, data, rounds):>9.1f} µs"
+        )
+
+
+def main(args):
+    records = make_records(args.page)
+    print(f"📊 {args.rounds} itérations par mesure")
+    compare("Commande seule", records[:1], args.rounds * 10)
+    compare(f"Page de {args.page} commandes", records, args.rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=500)
+    main(parser.parse_args())
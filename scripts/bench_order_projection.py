@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la sérialisation projetée (?fields=).
+
+Compare, pour une page de commandes, la sérialisation complète via OrderOut
+(validation puis dump JSON) avec les sérialiseurs projetés mis en cache,
+pour tous les champs puis pour un sous-ensemble.
+
+Usage:
+    python scripts/bench_order_projection.py
+    python scripts/bench_order_projection.py --orders 5000 --rounds 50
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from poshub_api.orders.projection import parse_fields  # noqa: E402
+from poshub_api.orders.records import OrderRecord  # noqa: E402
+from poshub_api.orders.schemas import OrderOut  # noqa: E402
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+PAGE = TypeAdapter(list[OrderOut])
+
+
+def make_records(count: int) -> list[OrderRecord]:
+    return [
+        OrderRecord.from_values(
+            f"bench-{i}", BASE + timedelta(seconds=i), 1.0 + i % 97, "EUR"
+        )
+        for i in range(count)
+    ]
+
+
+def order_out(records) -> bytes:
+    orders = [
+        OrderOut.model_validate(record, from_attributes=True)
+        for record in records
+    ]
+    return PAGE.dump_json(orders)
+
+
+def measure(label: str, serialize, records, rounds: int) -> None:
+    size = len(serialize(records))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serialize(records)
+    elapsed = (time.perf_counter() - start) / rounds
+    print(
+        f"{label:<28} {elapsed * 1000:>8.2f} ms/page  "
+        f"{len(records) / elapsed:>12,.0f} commandes/s  {size:>9,} octets"
+    )
+
+
+def main(args):
+    records = make_records(args.orders)
+    print(f"📊 Page de {args.orders} commandes, {args.rounds} itérations")
+    measure("OrderOut (complet)", order_out, records, args.rounds)
+    for fields in ("orderId,createdAt,totalAmount,currency", args.fields):
+        projection = parse_fields(fields)
+        measure(
+            f"projection {len(projection.fields)} champ(s)",
+            lambda page: projection.json_array(page).encode(),
+            records,
+            args.rounds,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fields", default="orderId,totalAmount")
+    main(parser.parse_args())
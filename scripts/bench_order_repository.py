@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark de débit des dépôts de commandes (mémoire vs SQLite WAL).
+
+Mesure le nombre d'écritures et de lectures par seconde avec N coroutines
+concurrentes, comme le ferait un worker uvicorn sous charge.
+
+Usage:
+    python scripts/bench_order_repository.py
+    python scripts/bench_order_repository.py --orders 50000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.repository import (  # noqa: E402
+    InMemoryOrderRepository,
+    SQLiteOrderRepository,
+)
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+
+
+def make_orders(count: int) -> list[OrderIn]:
+    now = datetime.now(timezone.utc)
+    return [
+        OrderIn(
+            orderId=f"bench-{i}",
+            createdAt=now,
+            totalAmount=10.0 + i % 100,
+            currency="EUR",
+        )
+        for i in range(count)
+    ]
+
+
+async def run_concurrently(func, items, concurrency: int) -> float:
+    """Exécute func(item) avec au plus `concurrency` appels en vol."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(item):
+        async with semaphore:
+            await func(item)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(item) for item in items))
+    return time.perf_counter() - start
+
+
+async def bench_repository(name, repository, orders, concurrency):
+    write_time = await run_concurrently(repository.add, orders, concurrency)
+    ids = [order.orderId for order in orders]
+    read_time = await run_concurrently(repository.get, ids, concurrency)
+    await repository.close()
+
+    print(
+        f"{name:<10} écritures: {len(orders) / write_time:>10,.0f} ops/s   "
+        f"lectures: {len(ids) / read_time:>10,.0f} ops/s"
+    )
+
+
+async def main(args):
+    orders = make_orders(args.orders)
+    print(
+        f"📊 {args.orders} commandes, concurrence {args.concurrency}, "
+        f"lots SQLite de {args.batch_size}"
+    )
+
+    await bench_repository(
+        "memory", InMemoryOrderRepository(), orders, args.concurrency
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = SQLiteOrderRepository(
+            str(Path(tmp) / "bench.db"), batch_size=args.batch_size
+        )
+        await bench_repository("sqlite", repository, orders, args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=256)
+    asyncio.run(main(parser.parse_args()))
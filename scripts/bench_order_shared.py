@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark multi-processus du dépôt partagé en mémoire projetée.
+
+Lance 1, 2, 4... processus sur la même table, comme autant de workers
+uvicorn, chacun exécutant un mélange de lectures et d'écritures, et mesure
+le débit total. Les lectures prennent un verrou partagé et progressent avec
+le nombre de cœurs ; les écritures sont sérialisées par le verrou exclusif.
+
+Usage:
+    python scripts/bench_order_shared.py
+    python scripts/bench_order_shared.py --workers 1 2 4 8 --write-ratio 0.05
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.shared import SharedMemoryOrderRepository  # noqa: E402
+
+CAPACITY = 1 << 18
+
+
+def make_order(i: int) -> OrderIn:
+    return OrderIn.model_construct(
+        orderId=f"bench-{i}",
+        createdAt=datetime.now(timezone.utc),
+        totalAmount=10.0 + i % 100,
+        currency="EUR",
+    )
+
+
+def worker(path: str, ops: int, preloaded: int, write_ratio: float, seed):
+    async def run():
+        repository = SharedMemoryOrderRepository(path, CAPACITY)
+        rng = random.Random(seed)
+        for _ in range(ops):
+            i = rng.randrange(preloaded)
+            if rng.random() < write_ratio:
+                await repository.add(make_order(i))
+            else:
+                await repository.get(f"bench-{i}")
+        await repository.close()
+
+    asyncio.run(run())
+
+
+def run_workers(path: str, count: int, args) -> float:
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(
+            target=worker,
+            args=(path, args.ops, args.orders, args.write_ratio, seed),
+        )
+        for seed in range(count)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start
+
+
+async def preload(path: str, count: int) -> None:
+    repository = SharedMemoryOrderRepository(path, CAPACITY)
+    await repository.add_many(make_order(i) for i in range(count))
+    await repository.close()
+
+
+def main(args):
+    print(
+        f"📊 {args.orders} commandes, {args.ops} opérations par worker, "
+        f"{args.write_ratio:.0%} d'écritures, {os.cpu_count()} CPU"
+    )
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, "orders.shm")
+        asyncio.run(preload(path, args.orders))
+        baseline = None
+        for count in args.workers:
+            elapsed = run_workers(path, count, args)
+            throughput = count * args.ops / elapsed
+            baseline = baseline or throughput
+            print(
+                f"{count:>3} workers  {throughput:>10,.0f} ops/s  "
+                f"(x{throughput / baseline:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--dir", default="/dev/shm" if os.path.isdir("/dev/shm") else None
+    )
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark du dépôt à budget mémoire borné (niveaux chaud et froid).
+
+Compare au dictionnaire seul :
+1. la mémoire allouée après insertion de N commandes (tracemalloc)
+2. la latence des lectures sur le niveau chaud et sur le niveau froid
+
+Usage:
+    python scripts/bench_order_tiered.py
+    python scripts/bench_order_tiered.py --orders 1000000 --budget-mb 32
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from poshub_api.orders.repository import InMemoryOrderRepository  # noqa: E402
+from poshub_api.orders.schemas import OrderIn  # noqa: E402
+from poshub_api.orders.tiered import TieredOrderRepository  # noqa: E402
+
+
+def make_orders(start: int, count: int) -> list[OrderIn]:
+    now = datetime.now(timezone.utc)
+    return [
+        OrderIn(
+            orderId=f"bench-{i}",
+            createdAt=now,
+            totalAmount=10.0 + i % 100,
+            currency="EUR",
+        )
+        for i in range(start, start + count)
+    ]
+
+
+async def fill(repository, total: int, chunk: int = 10000) -> float:
+    """Insère total commandes et retourne le pic de mémoire en MiB."""
+    tracemalloc.start()
+    for start in range(0, total, chunk):
+        await repository.add_many(
+            make_orders(start, min(chunk, total - start))
+        )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+async def timed_gets(repository, ids: list[str]) -> list[float]:
+    latencies = []
+    for order_id in ids:
+        start = time.perf_counter()
+        await repository.get(order_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    p50 = statistics.median(latencies) * 1e6
+    p99 = sorted(latencies)[int(len(latencies) * 0.99)] * 1e6
+    print(f"{label:<22} p50 {p50:>8.1f} µs   p99 {p99:>8.1f} µs")
+
+
+async def main(args):
+    print(f"📊 {args.orders} commandes, budget {args.budget_mb} MiB")
+
+    peak = await fill(InMemoryOrderRepository(), args.orders)
+    print(f"memory   pic {peak:>8.1f} MiB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = TieredOrderRepository(
+            tmp, memory_budget=args.budget_mb * 2**20
+        )
+        peak = await fill(repository, args.orders)
+        stats = repository.stats()
+        print(
+            f"tiered   pic {peak:>8.1f} MiB   "
+            f"chaud {stats['hot_orders']:,} "
+            f"({stats['hot_bytes'] / 2**20:.1f} MiB)   "
+            f"froid {stats['cold_orders']:,} "
+            f"({stats['cold_bytes'] / 2**20:.1f} MiB sur disque)"
+        )
+
+        hot_ids = list(repository.hot)[-args.reads :]
+        report("get niveau chaud", await timed_gets(repository, hot_ids))
+        cold_ids = random.sample(list(repository._cold), args.reads)
+        report("get niveau froid", await timed_gets(repository, cold_ids))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--budget-mb", type=int, default=16)
+    parser.add_argument("--reads", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
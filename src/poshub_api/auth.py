@@ -1,12 +1,21 @@
+import hashlib
+import os
+import time
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional
+from functools import cached_property
+from typing import Iterable, List, NamedTuple, Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
+from .keyring import KeyRing, SigningKey, load_keyring, parse_key
 from .logging_config import get_logger
+from .metrics import register_metrics
+from .throttling import create_login_throttle
+from .users import PasswordVerifier, PasswordVerifierBusy, create_user_store
 
 logger = get_logger(__name__)
 
@@ -14,6 +23,9 @@ logger = get_logger(__name__)
 SECRET_KEY = "your-secret-key-change-in-production"  # À changer en production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# Un accès accordé sur N est journalisé (1 : tous)
+AUTH_LOG_SAMPLE_EVERY = int(os.getenv("AUTH_LOG_SAMPLE_EVERY", "100"))
 
 # Scopes disponibles
 SCOPES = {
@@ -22,6 +34,17 @@ SCOPES = {
     "demo:read": "Accès aux routes de démonstration",
 }
 
+# Un bit par scope connu, dans l'ordre de SCOPES
+SCOPE_BITS = {scope: 1 << i for i, scope in enumerate(SCOPES)}
+
+
+def scope_mask(scopes: Iterable[str]) -> int:
+    """Masque des scopes connus (les scopes inconnus sont ignorés)."""
+    mask = 0
+    for scope in scopes:
+        mask |= SCOPE_BITS.get(scope, 0)
+    return mask
+
 
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -29,10 +52,181 @@ class TokenData(BaseModel):
 
 
 class User(BaseModel):
+    # Immuable : une même instance est partagée par toutes les requêtes
+    # portant le même token (voir TokenCache)
+    model_config = ConfigDict(frozen=True)
+
     username: str
     email: Optional[str] = None
     full_name: Optional[str] = None
-    scopes: List[str] = []
+    scopes: Tuple[str, ...] = ()
+
+    @cached_property
+    def scope_mask(self) -> int:
+        return scope_mask(self.scopes)
+
+
+class CachedToken(NamedTuple):
+    user: User
+    expires_at: float
+    # Clé ayant vérifié le token
+    key: Optional[SigningKey] = None
+
+
+class TokenCache:
+    """
+    Cache LRU borné des tokens déjà vérifiés.
+
+    Indexé par le SHA-256 du token (le token lui-même n'est pas conservé),
+    il associe au token l'utilisateur construit lors de la première
+    vérification, jusqu'à l'expiration (exp) du token. Un terminal POS qui
+    réutilise son token évite ainsi le décodage et la vérification HMAC.
+
+    Avec un trousseau, une entrée n'est servie que si la clé qui a vérifié
+    le token y figure toujours : retirer ou remplacer une clé révoque
+    aussitôt ses tokens en cache.
+
+    Sans verrou : le cache n'est utilisé que depuis la boucle d'événements
+    (get_current_user est async) et aucune méthode n'y rend la main, si
+    bien que chaque opération est atomique. Un appel depuis un thread
+    (verify_token dans un endpoint synchrone) devrait être synchronisé
+    par l'appelant.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE, clock=time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[bytes, CachedToken] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revocations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(
+        self, token: str, keyring: Optional[KeyRing] = None
+    ) -> Optional[User]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if (
+            keyring is not None
+            and entry.key is not None
+            and keyring.get(entry.key.kid) is not entry.key
+        ):
+            del self._entries[key]
+            self.revocations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.user
+
+    def put(
+        self,
+        token: str,
+        user: User,
+        expires_at: float,
+        signing_key: Optional[SigningKey] = None,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = CachedToken(user, expires_at, signing_key)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "revocations": self.revocations,
+        }
+
+
+class AccessAudit:
+    """
+    Compteurs des contrôles d'accès.
+
+    Les refus sont toujours journalisés ; les accès accordés le sont un sur
+    sample_every, avec le nombre d'accès par scope depuis le précédent.
+    """
+
+    def __init__(self, sample_every: int = AUTH_LOG_SAMPLE_EVERY):
+        self.sample_every = max(1, sample_every)
+        self.authenticated = 0
+        self.granted = 0
+        self.denied = 0
+        self._pending: Counter[str] = Counter()
+
+    def grant(self, user: User, scope: str) -> None:
+        self.granted += 1
+        self._pending[scope] += 1
+        if self.granted % self.sample_every == 0:
+            logger.info(
+                "Access granted",
+                username=user.username,
+                scope=scope,
+                granted=dict(self._pending),
+            )
+            self._pending.clear()
+
+    def deny(self, user: User, scope: str) -> None:
+        self.denied += 1
+        logger.warning(
+            "Access denied - missing scope",
+            username=user.username,
+            required_scope=scope,
+            user_scopes=user.scopes,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "authenticated": self.authenticated,
+            "granted": self.granted,
+            "denied": self.denied,
+            "sample_every": self.sample_every,
+        }
+
+
+token_cache = TokenCache()
+register_metrics("auth_tokens", token_cache.stats)
+access_audit = AccessAudit()
+register_metrics("auth_access", access_audit.stats)
+
+
+# Trousseau de signature : clés configurées (JWT_KEYRING_PARAM ou
+# JWT_KEYRING_DIR), sinon la clé HS256 historique sans kid
+keyring = load_keyring() or KeyRing([parse_key(None, SECRET_KEY, ALGORITHM)])
+
+
+def use_keyring(new_keyring: KeyRing) -> None:
+    """Remplace le trousseau ; les tokens déjà vérifiés sont oubliés."""
+    global keyring
+    keyring = new_keyring
+    token_cache.clear()
 
 
 # Security scheme
@@ -47,14 +241,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    key = keyring.active
+    encoded_jwt = jwt.encode(
+        to_encode,
+        key.signer,
+        algorithm=key.algorithm,
+        headers={"kid": key.kid} if key.kid is not None else None,
+    )
     return encoded_jwt
 
 
-def verify_token(token: str) -> TokenData:
-    """Vérifie et décode un token JWT."""
+def verify_token(token: str) -> User:
+    """
+    Vérifie et décode un token JWT ; retourne l'utilisateur qu'il désigne.
+
+    Un token déjà vérifié est servi par token_cache jusqu'à son expiration,
+    tant que sa clé reste au trousseau.
+    """
+    user = token_cache.get(token, keyring)
+    if user is not None:
+        return user
+    return _decode_token(token)
+
+
+def _decode_token(token: str) -> User:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Clé choisie par le kid de l'en-tête, avec son seul algorithme
+        key = keyring.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise JWTError("Unknown signing key")
+        payload = jwt.decode(token, key.verifier, algorithms=[key.algorithm])
         username: str = payload.get("sub")
         scopes: List[str] = payload.get("scopes", [])
 
@@ -65,7 +281,12 @@ def verify_token(token: str) -> TokenData:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return TokenData(username=username, scopes=scopes)
+        user = User(username=username, scopes=scopes)
+        # Sans exp, le token n'expire pas : il n'est pas mis en cache
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)):
+            token_cache.put(token, user, expires_at, key)
+        return user
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,44 +295,54 @@ def verify_token(token: str) -> TokenData:
         )
 
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> User:
-    """Dépendance pour obtenir l'utilisateur courant."""
-    token = credentials.credentials
-    token_data = verify_token(token)
+    """
+    Dépendance pour obtenir l'utilisateur courant.
 
-    logger.info(
-        "User authenticated",
-        username=token_data.username,
-        scopes=token_data.scopes,
-    )
+    Résolu une fois par requête et conservé dans request.state.user, où les
+    contrôles de scopes et le reste de la requête le retrouvent.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
 
-    return User(username=token_data.username, scopes=token_data.scopes)
+    token = credentials.credentials
+    user = token_cache.get(token, keyring)
+    if user is None:
+        # Journalisé à la vérification du token, pas à chaque requête
+        user = _decode_token(token)
+        access_audit.authenticated += 1
+        logger.info(
+            "User authenticated",
+            username=user.username,
+            scopes=user.scopes,
+        )
+
+    request.state.user = user
+    return user
 
 
 def require_scope(required_scope: str):
     """Décorateur pour vérifier qu'un scope est requis."""
-
-    def scope_checker(current_user: User = Depends(get_current_user)) -> User:
-        if required_scope not in current_user.scopes:
-            logger.warning(
-                "Access denied - missing scope",
-                username=current_user.username,
-                required_scope=required_scope,
-                user_scopes=current_user.scopes,
-            )
+    required = SCOPE_BITS.get(required_scope)
+    if required is None:
+        raise ValueError(f"Unknown scope: {required_scope}")
+
+    async def scope_checker(
+        current_user: User = Depends(get_current_user),
+    ) -> User:
+        if not current_user.scope_mask & required:
+            access_audit.deny(current_user, required_scope)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Not enough permissions. Required scope: "
                 f"{required_scope}",
             )
 
-        logger.info(
-            "Access granted",
-            username=current_user.username,
-            scope=required_scope,
-        )
+        access_audit.grant(current_user, required_scope)
         return current_user
 
     return scope_checker
@@ -122,30 +353,53 @@ require_orders_read = require_scope("orders:read")
 require_orders_write = require_scope("orders:write")
 require_demo_read = require_scope("demo:read")
 
-# Utilisateurs de test (en production, utiliser une base de données)
-TEST_USERS = {
-    "admin": {
-        "username": "admin",
-        "password": "admin123",
-        "scopes": ["orders:read", "orders:write", "demo:read"],
-    },
-    "user": {
-        "username": "user",
-        "password": "user123",
-        "scopes": ["orders:read"],
-    },
-    "demo": {
-        "username": "demo",
-        "password": "demo123",
-        "scopes": ["demo:read"],
-    },
-}
+# Comptes (USER_STORE) et vérification bcrypt hors de la boucle d'événements
+user_store = create_user_store()
+password_verifier = PasswordVerifier()
+register_metrics("auth_users", user_store.stats)
+register_metrics("auth_passwords", password_verifier.stats)
+# Seaux à jetons par IP et par compte (LOGIN_THROTTLE_BACKEND)
+login_throttle = create_login_throttle()
+register_metrics("auth_throttle", login_throttle.stats)
+
 
+async def throttle_login(request: Request, username: str) -> None:
+    """
+    Décompte une tentative de connexion ; lève une HTTPException 429 avec
+    Retry-After si l'IP ou le compte a épuisé ses tentatives.
+    """
+    await login_throttle.check(request, username)
 
-def authenticate_user(username: str, password: str) -> Optional[User]:
-    """Authentifie un utilisateur avec username/password."""
-    user_data = TEST_USERS.get(username)
-    if not user_data or user_data["password"] != password:
+
+async def record_failed_login(username: str) -> None:
+    """Décompte un échec d'authentification pour le compte."""
+    await login_throttle.failed(username)
+
+
+async def authenticate_user(username: str, password: str) -> Optional[User]:
+    """
+    Authentifie un utilisateur avec username/password.
+
+    Lève une HTTPException 503 si trop de vérifications sont en attente.
+    """
+    stored = await user_store.get(username)
+    try:
+        matches = await password_verifier.verify(
+            password, stored.password_hash if stored else None
+        )
+    except PasswordVerifierBusy:
+        logger.warning("Login rejected - password verifier saturated")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry later",
+            headers={"Retry-After": "1"},
+        )
+    if not matches:
         return None
 
-    return User(username=user_data["username"], scopes=user_data["scopes"])
+    return User(
+        username=stored.username,
+        email=stored.email,
+        full_name=stored.full_name,
+        scopes=stored.scopes,
+    )
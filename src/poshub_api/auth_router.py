@@ -1,6 +1,6 @@
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 
@@ -10,6 +10,8 @@ from .auth import (
     authenticate_user,
     create_access_token,
     get_current_user,
+    record_failed_login,
+    throttle_login,
 )
 from .logging_config import get_logger
 
@@ -31,13 +33,19 @@ class LoginRequest(BaseModel):
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    """Endpoint de connexion pour obtenir un token JWT."""
+    """
+    Endpoint de connexion pour obtenir un token JWT.
+    429 avec Retry-After si trop de tentatives (IP ou compte).
+    """
     logger.info("Login attempt", username=form_data.username)
+    await throttle_login(request, form_data.username)
 
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
+        await record_failed_login(form_data.username)
         logger.warning(
             "Login failed - invalid credentials", username=form_data.username
         )
@@ -63,12 +71,17 @@ async def login_for_access_token(
 
 
 @router.post("/login-json", response_model=Token)
-async def login_with_json(login_data: LoginRequest):
-    """Endpoint de connexion alternatif avec JSON."""
+async def login_with_json(login_data: LoginRequest, request: Request):
+    """
+    Endpoint de connexion alternatif avec JSON.
+    429 avec Retry-After si trop de tentatives (IP ou compte).
+    """
     logger.info("JSON login attempt", username=login_data.username)
+    await throttle_login(request, login_data.username)
 
-    user = authenticate_user(login_data.username, login_data.password)
+    user = await authenticate_user(login_data.username, login_data.password)
     if not user:
+        await record_failed_login(login_data.username)
         logger.warning(
             "JSON login failed - invalid credentials",
             username=login_data.username,
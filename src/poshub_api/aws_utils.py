@@ -29,7 +29,7 @@ class SSMParameterStore:
             logger.warning(f"Impossible d'initialiser le client SSM: {e}")
 
     def get_parameter(
-        self, parameter_name: str, decrypt: bool = True
+        self, parameter_name: str, decrypt: bool = True, log_value: bool = True
     ) -> Optional[str]:
         """
         Récupère un paramètre depuis AWS SSM Parameter Store.
@@ -37,6 +37,7 @@ class SSMParameterStore:
         Args:
             parameter_name: Nom du paramètre SSM (ex: /pos/api-key)
             decrypt: Si True, décrypte les SecureString
+            log_value: Si False, la valeur n'est jamais journalisée (clés)
 
         Returns:
             La valeur du paramètre ou None si erreur
@@ -53,6 +54,8 @@ class SSMParameterStore:
             )
 
             parameter_value = response["Parameter"]["Value"]
+            if not log_value:
+                return parameter_value
 
             # ⚠️ ATTENTION: Ne JAMAIS faire cela en production !
             # Ceci est uniquement pour l'exercice de démonstration
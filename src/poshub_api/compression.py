@@ -0,0 +1,256 @@
+"""
+Compression des réponses (brotli ou gzip) négociée par Accept-Encoding.
+
+Middleware ASGI pur : les messages de réponse sont compressés au passage,
+sans tamponner la réponse entière. Une réponse en un seul bloc n'est
+compressée qu'au-delà de COMPRESSION_MIN_SIZE octets ; une réponse en flux
+(StreamingResponse) est compressée bloc par bloc, avec un vidage du
+compresseur après chaque bloc pour que le client reçoive les données au
+fil de l'eau.
+
+Sont laissées telles quelles : les réponses déjà encodées (en-tête
+Content-Encoding, comme l'export ?gzip=true), les types déjà compressés
+(images, archives...), les 204/304 et les requêtes sans Accept-Encoding
+compatible. Les autres en-têtes (X-Correlation-ID, Vary...) sont
+conservés ; un ETag fort devient faible, la représentation compressée
+n'étant pas identique octet pour octet.
+
+Toute réponse d'un type compressible porte « Vary: Accept-Encoding »,
+qu'elle soit compressée ou non (corps trop court, requête sans
+Accept-Encoding) : sa représentation dépend de cet en-tête, et un cache
+partagé ne doit pas servir la version en clair à un client qui accepte
+gzip, ni l'inverse.
+
+Derrière API Gateway, Mangum renvoie un corps compressé en base64
+(BinaryMediaTypes "*/*" dans template.yaml). brotli est une dépendance
+optionnelle : sans lui, seul gzip est proposé.
+"""
+
+import os
+import zlib
+from functools import lru_cache
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Types dont le contenu est déjà compressé
+UNCOMPRESSIBLE_PREFIXES = ("image/", "audio/", "video/", "font/woff")
+UNCOMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/x-gzip",
+        "application/zip",
+        "application/zstd",
+        "application/x-brotli",
+        "application/octet-stream",
+    }
+)
+
+
+@lru_cache(maxsize=256)
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Encodage retenu pour un en-tête Accept-Encoding : « br » ou « gzip »
+    (brotli à qualité égale), None si aucun n'est accepté.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_q:
+            best, best_q = coding, quality
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "image/svg+xml":
+        return True
+    return media_type not in UNCOMPRESSIBLE_TYPES and not (
+        media_type.startswith(UNCOMPRESSIBLE_PREFIXES)
+    )
+
+
+class GzipEncoder:
+    __slots__ = ("_compressor",)
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    __slots__ = ("_compressor",)
+
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=quality
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compresse les réponses HTTP selon l'en-tête Accept-Encoding."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = select_encoding(value.decode("latin-1"))
+                break
+        responder = _CompressedResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+
+class _CompressedResponder:
+    """État de compression d'une réponse."""
+
+    __slots__ = ("middleware", "encoding", "_send", "start", "encoder")
+
+    def __init__(self, middleware: CompressionMiddleware, encoding, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        # Message de début retenu jusqu'au premier bloc du corps
+        self.start: Optional[Message] = None
+        self.encoder = None
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            status = message["status"]
+            if (
+                status < 200
+                or status in (204, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+            ):
+                await self._send(message)
+                return
+            MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                await self._send(message)
+            else:
+                self.start = message
+            return
+        if kind != "http.response.body" or (
+            self.start is None and self.encoder is None
+        ):
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            start, self.start = self.start, None
+            if not more_body:
+                await self._send_whole(start, message, body)
+                return
+            length = Headers(raw=start["headers"]).get("content-length")
+            if length is not None and int(length) < (
+                self.middleware.minimum_size
+            ):
+                await self._send(start)
+                await self._send(message)
+                return
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers = self._encoded_headers(start)
+            del headers["content-length"]
+            await self._send(start)
+
+        chunk = self.encoder.compress(body)
+        chunk += self.encoder.flush() if more_body else self.encoder.finish()
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": more_body,
+            }
+        )
+
+    async def _send_whole(self, start: Message, message: Message, body):
+        if len(body) < self.middleware.minimum_size:
+            await self._send(start)
+            await self._send(message)
+            return
+        encoder = self.middleware.encoder(self.encoding)
+        body = encoder.compress(body) + encoder.finish()
+        headers = self._encoded_headers(start)
+        headers["content-length"] = str(len(body))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": body})
+
+    def _encoded_headers(self, start: Message) -> MutableHeaders:
+        headers = MutableHeaders(scope=start)
+        headers["content-encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag is not None and etag.startswith('"'):
+            headers["etag"] = "W/" + etag
+        return headers
@@ -0,0 +1,237 @@
+"""
+Trousseau des clés de signature des tokens JWT.
+
+Les clés sont lues une fois (fichiers PEM locaux ou paramètre SSM), puis
+analysées en objets clés python-jose : la vérification d'un token choisit
+sa clé par l'en-tête kid (accès dict) sans ré-analyser de PEM. Avec des
+clés asymétriques (RS256, ES256/384/512), seule cette API détient les clés
+privées ; les clés publiques sont publiées en JWKS pour que les autres
+services vérifient les tokens localement.
+
+Rotation sans coupure :
+    1. ajouter la nouvelle clé (add) : publiée dans le JWKS, pas encore
+       utilisée pour signer ;
+    2. après la durée de cache du JWKS (JWKS_MAX_AGE), l'activer
+       (activate) : les nouveaux tokens sont signés avec elle ;
+    3. après la durée de vie des tokens, retirer l'ancienne (retire).
+
+Sans configuration, le trousseau contient la seule clé HS256 historique
+(sans kid) et les tokens restent ceux d'avant.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+from jose.backends.base import Key
+
+from .logging_config import get_logger
+from .responses import dumps
+
+logger = get_logger(__name__)
+
+# Répertoire de fichiers <kid>.pem, ou paramètre SSM (SecureString JSON :
+# {"active": kid, "keys": [{"kid": ..., "pem": ..., "alg": ...}]})
+JWT_KEYRING_DIR = os.getenv("JWT_KEYRING_DIR")
+JWT_KEYRING_PARAM = os.getenv("JWT_KEYRING_PARAM")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+
+EC_ALGORITHMS = {
+    "secp256r1": "ES256",
+    "secp384r1": "ES384",
+    "secp521r1": "ES512",
+}
+
+
+class KeyRingError(ValueError):
+    """Clé ou trousseau invalide."""
+
+
+class SigningKey(NamedTuple):
+    kid: Optional[str]
+    algorithm: str
+    # Clé privée (ou secret HMAC) ; None pour une clé publique seule
+    signer: Optional[Key]
+    # Clé publique (ou secret HMAC)
+    verifier: Key
+    # Clé publique au format JWK, None pour une clé symétrique
+    public_jwk: Optional[dict]
+
+    @property
+    def can_sign(self) -> bool:
+        return self.signer is not None
+
+
+def infer_algorithm(pem: bytes) -> str:
+    """Algorithme JWS d'une clé PEM (privée ou publique)."""
+    try:
+        key = serialization.load_pem_private_key(pem, password=None)
+    except (ValueError, TypeError):
+        try:
+            key = serialization.load_pem_public_key(pem)
+        except ValueError:
+            raise KeyRingError("Invalid PEM key")
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(
+        key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)
+    ):
+        algorithm = EC_ALGORITHMS.get(key.curve.name)
+        if algorithm:
+            return algorithm
+    # python-jose ne gère pas EdDSA (Ed25519)
+    raise KeyRingError(f"Unsupported key type: {type(key).__name__}")
+
+
+def parse_key(
+    kid: Optional[str], material: str, algorithm: Optional[str] = None
+) -> SigningKey:
+    """Analyse une clé PEM (ou un secret HMAC si algorithm est HS*)."""
+    if algorithm is None:
+        algorithm = infer_algorithm(material.encode())
+    try:
+        key = jwk.construct(material, algorithm)
+    except Exception as e:
+        raise KeyRingError(f"Invalid key {kid!r}: {e}")
+    if algorithm.startswith("HS"):
+        return SigningKey(kid, algorithm, key, key, None)
+    public = key.public_key()
+    public_jwk = {**public.to_dict(), "use": "sig"}
+    if kid is not None:
+        public_jwk["kid"] = kid
+    signer = None if key.is_public() else key
+    return SigningKey(kid, algorithm, signer, public, public_jwk)
+
+
+class KeyRing:
+    """Clés de vérification indexées par kid, et clé active de signature."""
+
+    def __init__(
+        self, keys: Iterable[SigningKey] = (), active: Optional[str] = None
+    ):
+        self._keys: dict[Optional[str], SigningKey] = {}
+        self._active: Optional[SigningKey] = None
+        self._jwks: Optional[tuple[bytes, str]] = None
+        keys = list(keys)
+        for key in keys:
+            self.add(key)
+        if active is not None:
+            self.activate(active)
+        else:
+            signing = [key for key in keys if key.can_sign]
+            if signing:
+                self.activate(signing[-1].kid)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, kid: Optional[str]) -> bool:
+        return kid in self._keys
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        return self._keys.get(kid)
+
+    @property
+    def active(self) -> SigningKey:
+        if self._active is None:
+            raise KeyRingError("No active signing key")
+        return self._active
+
+    def add(self, key: SigningKey, activate: bool = False) -> None:
+        """Ajoute (ou remplace) une clé ; elle vérifie et est publiée."""
+        # Copie puis remplacement : les lecteurs voient un dict cohérent
+        self._keys = {**self._keys, key.kid: key}
+        self._jwks = None
+        if activate:
+            self.activate(key.kid)
+
+    def activate(self, kid: Optional[str]) -> None:
+        key = self._keys.get(kid)
+        if key is None:
+            raise KeyRingError(f"Unknown key: {kid!r}")
+        if not key.can_sign:
+            raise KeyRingError(f"Key {kid!r} has no private part")
+        self._active = key
+        logger.info("JWT signing key activated", kid=kid)
+
+    def retire(self, kid: Optional[str]) -> None:
+        """Retire une clé : les tokens signés avec elle sont refusés."""
+        if self._active is not None and self._active.kid == kid:
+            raise KeyRingError(f"Key {kid!r} is the active signing key")
+        self._keys = {k: v for k, v in self._keys.items() if k != kid}
+        self._jwks = None
+
+    def jwks(self) -> dict:
+        """Clés publiques au format JWK Set (RFC 7517)."""
+        return {
+            "keys": [
+                key.public_jwk
+                for key in self._keys.values()
+                if key.public_jwk is not None
+            ]
+        }
+
+    def jwks_body(self) -> tuple[bytes, str]:
+        """JWKS sérialisé et son ETag, recalculés après chaque changement."""
+        if self._jwks is None:
+            body = dumps(self.jwks())
+            digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+            self._jwks = (body, f'"{digest}"')
+        return self._jwks
+
+
+def keyring_from_dir(path: str, active: Optional[str] = None) -> KeyRing:
+    """Trousseau des fichiers <kid>.pem d'un répertoire (ordre des noms)."""
+    files = sorted(Path(path).glob("*.pem"))
+    if not files:
+        raise KeyRingError(f"No .pem key in {path}")
+    return KeyRing(
+        (parse_key(file.stem, file.read_text()) for file in files), active
+    )
+
+
+def keyring_from_document(
+    document: str, active: Optional[str] = None
+) -> KeyRing:
+    """Trousseau décrit par un document JSON (paramètre SSM)."""
+    try:
+        data = json.loads(document)
+        keys = [
+            parse_key(entry["kid"], entry["pem"], entry.get("alg"))
+            for entry in data["keys"]
+        ]
+    except (ValueError, KeyError, TypeError) as e:
+        raise KeyRingError(f"Invalid keyring document: {e}")
+    return KeyRing(keys, active or data.get("active"))
+
+
+def load_keyring(ssm=None) -> Optional[KeyRing]:
+    """
+    Trousseau configuré par l'environnement : JWT_KEYRING_PARAM (lu avec
+    le SSMParameterStore fourni, ou un nouveau) ou JWT_KEYRING_DIR ; None
+    sinon. Chargé à l'import de auth, donc à l'initialisation de la Lambda
+    (le lifespan est désactivé sous Mangum).
+    """
+    if JWT_KEYRING_PARAM:
+        if ssm is None:
+            from .aws_utils import SSMParameterStore
+
+            ssm = SSMParameterStore()
+        document = ssm.get_parameter(JWT_KEYRING_PARAM, log_value=False)
+        if document is None:
+            raise KeyRingError(f"SSM parameter {JWT_KEYRING_PARAM} not found")
+        keyring = keyring_from_document(document, JWT_ACTIVE_KID)
+    elif JWT_KEYRING_DIR:
+        keyring = keyring_from_dir(JWT_KEYRING_DIR, JWT_ACTIVE_KID)
+    else:
+        return None
+    logger.info(
+        "JWT keyring loaded", keys=len(keyring), active=keyring.active.kid
+    )
+    return keyring
@@ -1,15 +1,23 @@
 import os
 
 import httpx
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from mangum import Mangum
 
+from poshub_api import auth
 from poshub_api.auth_router import router as auth_router
 from poshub_api.aws_utils import initialize_aws_resources
+from poshub_api.compression import CompressionMiddleware
 from poshub_api.demo.router import router as demo_router
+from poshub_api.keyring import JWKS_MAX_AGE
 from poshub_api.logging_config import configure_logging, get_logger
+from poshub_api.metrics import collect_metrics
 from poshub_api.middleware import CorrelationIDMiddleware
+from poshub_api.orders.bodies import etag_matches
+from poshub_api.orders.exceptions import IdempotentReplayException
+from poshub_api.orders.idempotency import replay_idempotent_response
 from poshub_api.orders.router import router as orders_router
+from poshub_api.responses import FastJSONResponse
 
 # Configure structured logging
 configure_logging()
@@ -29,11 +37,21 @@ app = FastAPI(
     version="1.0.0",
     description=f"API sécurisée pour système POS avec authentification JWT "
     f"et gestion des scopes - Stage: {STAGE}",
+    default_response_class=FastJSONResponse,
 )
 
 # Add correlation ID middleware
 app.add_middleware(CorrelationIDMiddleware)
 
+# Compression gzip/brotli des réponses (ajouté en dernier : le plus externe,
+# il compresse la réponse finale, en-têtes de corrélation compris)
+app.add_middleware(CompressionMiddleware)
+
+# Rejeu des réponses idempotentes (Idempotency-Key)
+app.add_exception_handler(
+    IdempotentReplayException, replay_idempotent_response
+)
+
 
 @app.on_event("startup")
 async def startup():
@@ -122,6 +140,28 @@ async def health_check():
     return health_data
 
 
+@app.get("/metrics")
+async def metrics():
+    """Compteurs internes (caches, stockage) pour le suivi de performance."""
+    # Valeurs déjà sérialisables : pas de passage par jsonable_encoder
+    return FastJSONResponse(collect_metrics())
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """Clés publiques de vérification des tokens (JWK Set, RFC 7517)."""
+    body, etag = auth.keyring.jwks_body()
+    # La durée de cache borne le délai entre l'ajout d'une clé et son
+    # activation (voir poshub_api.keyring)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={JWKS_MAX_AGE}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 # ========================================================================
 # AWS Lambda Handler avec Mangum
 # ========================================================================
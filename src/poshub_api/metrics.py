@@ -0,0 +1,20 @@
+"""
+Registre des compteurs internes exposés par l'endpoint /metrics.
+
+Chaque composant (caches, stockage, ...) enregistre une fonction qui
+retourne un instantané de ses compteurs sous forme de dictionnaire.
+"""
+
+from typing import Any, Callable, Dict
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]):
+    """Enregistre (ou remplace) un fournisseur de métriques."""
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, Dict[str, Any]]:
+    """Instantané de toutes les métriques enregistrées."""
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,117 @@
+"""
+Cache des représentations JSON des commandes.
+
+Le JSON canonique d'une commande et son ETag fort sont calculés une fois,
+à l'écriture, puis servis tels quels par les endpoints de lecture. Chaque
+entrée garde l'enregistrement dont elle est issue : elle n'est réutilisée
+que si le dépôt renvoie toujours ce même enregistrement, ce qui reste
+correct si un orderId est réécrit (y compris par un autre processus sur un
+dépôt partagé).
+
+Le cache est borné en entrées et en octets : une entrée coûte son JSON
+plus BODY_ENTRY_OVERHEAD, et retient l'enregistrement même quand le dépôt
+l'a évincé de la mémoire.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from .projection import projection
+from .schemas import OrderIn
+
+ORDER_BODY_CACHE_SIZE = int(os.getenv("ORDER_BODY_CACHE_SIZE", "100000"))
+ORDER_BODY_CACHE_MB = int(os.getenv("ORDER_BODY_CACHE_MB", "16"))
+
+# ETag, tuple, entrée de dictionnaire et enregistrement retenu (mesuré)
+BODY_ENTRY_OVERHEAD = 400
+
+
+class OrderBody(NamedTuple):
+    order: OrderIn
+    body: bytes
+    etag: str
+
+
+def encode_order(order: OrderIn) -> OrderBody:
+    """JSON canonique (mêmes champs que OrderOut) et ETag fort."""
+    body = projection().to_json(order).encode()
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return OrderBody(order, body, f'"{digest}"')
+
+
+def entry_size(entry: OrderBody) -> int:
+    """Empreinte approximative d'une entrée du cache, en octets."""
+    return BODY_ENTRY_OVERHEAD + len(entry.body)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible d'If-None-Match (RFC 9110, section 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class OrderBodyCache:
+    """Cache LRU borné orderId -> OrderBody ; 0 entrée le désactive."""
+
+    def __init__(
+        self,
+        max_entries: int = ORDER_BODY_CACHE_SIZE,
+        max_bytes: int = ORDER_BODY_CACHE_MB * 2**20,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, OrderBody] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, order: OrderIn) -> OrderBody:
+        entry = encode_order(order)
+        if self.max_entries > 0:
+            previous = self._entries.pop(order.orderId, None)
+            if previous is not None:
+                self.bytes -= entry_size(previous)
+            self._entries[order.orderId] = entry
+            self.bytes += entry_size(entry)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= entry_size(evicted)
+                self.evictions += 1
+        return entry
+
+    def get(self, order: OrderIn) -> OrderBody:
+        """Représentation de la commande lue dans le dépôt."""
+        entry = self._entries.get(order.orderId)
+        if entry is not None and (
+            entry.order is order or entry.order == order
+        ):
+            self._entries.move_to_end(order.orderId)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return self.put(order)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
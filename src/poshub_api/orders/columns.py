@@ -0,0 +1,193 @@
+"""
+Colonnes contiguës des montants de commandes, par devise.
+
+Chaque devise garde deux tableaux parallèles (array.array, donc contigus) :
+l'horodatage epoch et le montant en unités mineures entières. Les agrégats
+d'une fenêtre (nombre, somme, min, max, moyenne, percentiles) sont calculés
+en une passe vectorisée par NumPy, sur des vues sans copie des tableaux ;
+les sommes entières sont exactes. Sans NumPy, le même calcul est fait en
+Python pur.
+
+Une commande réécrite (même orderId) est retirée de sa position par
+échange avec la dernière ligne de sa devise.
+"""
+
+from array import array
+from math import floor
+from typing import Iterable, Optional, Sequence, Union
+
+from .indexes import order_epoch
+from .money import from_minor
+from .records import OrderRecord, order_minor
+from .rollups import MINUTE
+from .schemas import OrderIn
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    np = None
+
+
+class _Column:
+    """Lignes (orderId, epoch, montant) d'une devise."""
+
+    __slots__ = ("ids", "epochs", "amounts")
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.epochs = array("d")
+        self.amounts = array("q")
+
+    def append(self, order_id: str, epoch: float, amount: int) -> int:
+        self.ids.append(order_id)
+        self.epochs.append(epoch)
+        self.amounts.append(amount)
+        return len(self.ids) - 1
+
+    def pop(self, row: int) -> Optional[str]:
+        """Retire une ligne ; retourne l'orderId déplacé à sa place."""
+        last = len(self.ids) - 1
+        moved = None
+        if row != last:
+            moved = self.ids[row] = self.ids[last]
+            self.epochs[row] = self.epochs[last]
+            self.amounts[row] = self.amounts[last]
+        self.ids.pop()
+        self.epochs.pop()
+        self.amounts.pop()
+        return moved
+
+
+def percentile(ordered: Sequence[int], q: float) -> float:
+    """Percentile par interpolation linéaire (méthode par défaut NumPy)."""
+    position = q / 100 * (len(ordered) - 1)
+    low = floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def parse_percentiles(value: Optional[str]) -> list[float]:
+    """Rangs séparés par des virgules (ex. « 50,90,99.9 »), entre 0 et 100."""
+    if not value:
+        return []
+    try:
+        ranks = [float(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid percentiles: {value!r}")
+    if not ranks or any(not 0 <= q <= 100 for q in ranks):
+        raise ValueError("Percentiles must be between 0 and 100")
+    return ranks
+
+
+class AmountColumns:
+    """Montants en colonnes par devise, agrégés par fenêtre de temps."""
+
+    def __init__(self):
+        self._columns: dict[str, _Column] = {}
+        # orderId -> (devise, ligne)
+        self._rows: dict[str, tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def reset(self) -> None:
+        self._columns.clear()
+        self._rows.clear()
+
+    def add(self, order: Union[OrderIn, OrderRecord]) -> None:
+        previous = self._rows.get(order.orderId)
+        if previous is not None:
+            currency, row = previous
+            moved = self._columns[currency].pop(row)
+            if moved is not None:
+                self._rows[moved] = (currency, row)
+        column = self._columns.get(order.currency)
+        if column is None:
+            column = self._columns[order.currency] = _Column()
+        self._rows[order.orderId] = (
+            order.currency,
+            column.append(
+                order.orderId, order_epoch(order), order_minor(order)
+            ),
+        )
+
+    def summary(
+        self,
+        start: float,
+        end: float,
+        currency: Optional[str] = None,
+        percentiles: Iterable[float] = (),
+    ) -> dict[str, dict]:
+        """
+        Agrégats par devise des commandes de [start, end), bornes tronquées
+        à la minute comme pour les rollups. Les montants sont renvoyés en
+        unités majeures ; percentiles est une liste de rangs (0-100).
+        """
+        start -= start % MINUTE
+        end -= end % MINUTE
+        percentiles = list(percentiles)
+        codes = [currency] if currency is not None else list(self._columns)
+        result = {}
+        for code in codes:
+            column = self._columns.get(code)
+            if column is None or not column.ids:
+                continue
+            if np is not None:
+                stats = self._summary_numpy(column, start, end, percentiles)
+            else:
+                stats = self._summary_python(column, start, end, percentiles)
+            if stats is None:
+                continue
+            count, total, minimum, maximum, ranks = stats
+            result[code] = {
+                "count": count,
+                "total": from_minor(total, code),
+                "min": from_minor(minimum, code),
+                "max": from_minor(maximum, code),
+                "average": from_minor(total, code) / count,
+                "percentiles": {
+                    q: from_minor(value, code)
+                    for q, value in zip(percentiles, ranks)
+                },
+            }
+        return result
+
+    @staticmethod
+    def _summary_numpy(column, start, end, percentiles):
+        # Vues sur les tampons des array.array : aucune copie, et aucune
+        # vue ne survit à l'appel (les array.array restent redimensionnables)
+        epochs = np.frombuffer(column.epochs, dtype=np.float64)
+        amounts = np.frombuffer(column.amounts, dtype=np.int64)
+        selected = amounts[(epochs >= start) & (epochs < end)]
+        if not selected.size:
+            return None
+        ranks = (
+            np.percentile(selected, percentiles).tolist()
+            if percentiles
+            else []
+        )
+        return (
+            int(selected.size),
+            int(selected.sum()),
+            int(selected.min()),
+            int(selected.max()),
+            ranks,
+        )
+
+    @staticmethod
+    def _summary_python(column, start, end, percentiles):
+        selected = [
+            amount
+            for epoch, amount in zip(column.epochs, column.amounts)
+            if start <= epoch < end
+        ]
+        if not selected:
+            return None
+        ordered = sorted(selected) if percentiles else selected
+        return (
+            len(selected),
+            sum(selected),
+            min(selected),
+            max(selected),
+            [percentile(ordered, q) for q in percentiles],
+        )
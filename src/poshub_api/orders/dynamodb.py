@@ -0,0 +1,651 @@
+"""
+Dépôt de commandes DynamoDB pour le déploiement serverless.
+
+Le client boto3 est créé une seule fois par conteneur Lambda et réutilisé
+entre les invocations. Les insertions en masse passent par BatchWriteItem
+(25 éléments par requête) et les lectures multiples par BatchGetItem
+(100 clés par requête), en relançant les éléments non traités avec un
+backoff exponentiel.
+
+Les listes, exports et statistiques sont servis par la table elle-même,
+jamais par un index en mémoire : chaque conteneur Lambda ne voit que ses
+propres écritures. Deux index secondaires globaux (projection ALL)
+trient les commandes par sortKey = "<createdAt en µs sur 16 chiffres>#<id>" :
+- byCreatedAt : partition timeShard ("t0".."t{ORDERS_TIME_SHARDS-1}",
+  hachage de l'orderId), pour répartir les écritures ; une page
+  interroge toutes les partitions et fusionne leurs résultats
+- byCurrency : partition currency, pour le filtre par devise
+Les bornes de montant sont un FilterExpression : Limit borne les éléments
+examinés par requête, une page peut donc être incomplète avec une clé de
+reprise. ORDERS_TIME_SHARDS est fixé à la création de la table ; les
+éléments écrits avant ces attributs doivent être réécrits pour apparaître
+dans les index.
+
+Les statistiques lisent des éléments d'agrégats rangés dans la même table
+(orderId "#rollup#<taille>#<devise>#<début>", préfixe réservé) : un seau
+par devise et par minute, heure et jour, avec nombre, somme, min et max en
+unités mineures. Chaque écriture de commande les met à jour (UpdateItem
+ADD pour nombre et somme, SET conditionnel pour min et max) ; une commande
+remplacée est retranchée, et le min/max de ses seaux est recalculé depuis
+les commandes de la minute puis depuis les seaux plus fins. L'index
+byRollup (partition rollup = taille, tri bucketKey = "<début>#<devise>")
+sert une fenêtre en quelques requêtes, quel que soit le nombre de
+commandes. La mise à jour suit l'écriture de la commande sans transaction :
+un échec entre les deux laisse les agrégats en retard sur la table.
+"""
+
+import asyncio
+import os
+import random
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from poshub_api.logging_config import get_logger
+
+from .indexes import IndexKey, merge_pages, order_epoch, to_epoch
+from .money import to_minor
+from .records import order_minor
+from .repository import OrderRepository
+from .rollups import (
+    DAY,
+    GRANULARITIES,
+    HOUR,
+    MINUTE,
+    RollupBucket,
+    SalesRollup,
+    cover,
+    series_range,
+)
+from .schemas import OrderIn
+
+logger = get_logger(__name__)
+
+ORDERS_TABLE = os.getenv("ORDERS_TABLE", "poshub-orders")
+ORDERS_CONSISTENT_READ = os.getenv("ORDERS_CONSISTENT_READ", "false") == "true"
+ORDERS_TIME_SHARDS = int(os.getenv("ORDERS_TIME_SHARDS", "8"))
+
+TIME_INDEX = "byCreatedAt"
+CURRENCY_INDEX = "byCurrency"
+ROLLUP_INDEX = "byRollup"
+
+# Préfixe des orderId réservés aux éléments d'agrégats
+ROLLUP_PREFIX = "#rollup#"
+# Seau plus fin dont se recalcule le min/max d'un seau
+FINER = {HOUR: MINUTE, DAY: HOUR}
+# Scans des seules commandes
+WITHOUT_ROLLUPS = {
+    "FilterExpression": "attribute_not_exists(#r)",
+    "ExpressionAttributeNames": {"#r": "rollup"},
+}
+
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+
+
+class DynamoDBBatchError(RuntimeError):
+    """Éléments toujours non traités après toutes les tentatives."""
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_client(region: Optional[str] = None):
+    """Client DynamoDB partagé, créé au premier appel."""
+    region = region or os.getenv("AWS_REGION", "eu-north-1")
+    logger.info(f"Client DynamoDB initialisé pour la région: {region}")
+    return boto3.client(
+        "dynamodb",
+        region_name=region,
+        config=Config(
+            retries={"max_attempts": 5, "mode": "adaptive"},
+            max_pool_connections=50,
+        ),
+    )
+
+
+def _micros(epoch: float) -> str:
+    return f"{round(epoch * 1_000_000):016d}"
+
+
+def sort_key(key: IndexKey) -> str:
+    """Clé de tri des index secondaires : ordre de (createdAt, orderId)."""
+    return f"{_micros(key[0])}#{key[1]}"
+
+
+def parse_sort_key(value: str) -> IndexKey:
+    micros, order_id = value.split("#", 1)
+    return int(micros) / 1_000_000, order_id
+
+
+def time_shard(order_id: str, shards: int = ORDERS_TIME_SHARDS) -> str:
+    return f"t{zlib.crc32(order_id.encode()) % shards}"
+
+
+def to_item(order: OrderIn, time_shards: int = ORDERS_TIME_SHARDS) -> dict:
+    return {
+        "orderId": {"S": order.orderId},
+        "createdAt": {"S": order.createdAt.isoformat()},
+        "totalAmount": {"N": repr(order.totalAmount)},
+        "currency": {"S": order.currency},
+        "timeShard": {"S": time_shard(order.orderId, time_shards)},
+        "sortKey": {"S": sort_key((order_epoch(order), order.orderId))},
+    }
+
+
+def rollup_key(size: int, currency: str, start: int) -> dict:
+    return {"orderId": {"S": f"{ROLLUP_PREFIX}{size}#{currency}#{start}"}}
+
+
+def bucket_key(start: int, currency: str = "") -> str:
+    return f"{start:011d}#{currency}"
+
+
+def is_rollup(item: dict) -> bool:
+    return "rollup" in item
+
+
+def rollup_changes(
+    added: Iterable[OrderIn], removed: Iterable[OrderIn]
+) -> dict[tuple[int, str, int], tuple[RollupBucket, RollupBucket]]:
+    """Seaux touchés (taille, devise, début) -> (ajouts, retraits)."""
+    changes = defaultdict(lambda: (RollupBucket(), RollupBucket()))
+    for side, orders in enumerate((added, removed)):
+        for order in orders:
+            second = int(order_epoch(order))
+            amount = order_minor(order)
+            for size in GRANULARITIES.values():
+                start = second - second % size
+                changes[size, order.currency, start][side].add(amount)
+    return changes
+
+
+def rollup_ranges(
+    start: float, end: float, granularity: Optional[str]
+) -> list[tuple[int, int, int]]:
+    """
+    Plages (taille, premier début, dernier début) de seaux à lire : les
+    suites contiguës de seaux d'une même taille qui couvrent [start, end),
+    plus la série de la granularité demandée.
+    """
+    ranges = []
+    for size, bucket_start in cover(int(start), int(end)):
+        if ranges and ranges[-1][0] == size:
+            ranges[-1][2] = bucket_start
+        else:
+            ranges.append([size, bucket_start, bucket_start])
+    if granularity is not None:
+        size, first = series_range(start, end, granularity)
+        if first < int(end):
+            last = int(end) - 1 - (int(end) - 1 - first) % size
+            ranges.append([size, first, last])
+    return [tuple(r) for r in ranges]
+
+
+def _bucket(item: dict) -> RollupBucket:
+    bucket = RollupBucket()
+    bucket.count = int(item["bucketCount"]["N"])
+    bucket.total = int(item["bucketTotal"]["N"])
+    if "bucketMin" in item:
+        bucket.minimum = int(item["bucketMin"]["N"])
+        bucket.maximum = int(item["bucketMax"]["N"])
+    return bucket
+
+
+def _same_point(old: OrderIn, new: OrderIn) -> bool:
+    """Même devise, seconde et montant : agrégats inchangés."""
+    return (old.currency, int(order_epoch(old)), order_minor(old)) == (
+        new.currency,
+        int(order_epoch(new)),
+        order_minor(new),
+    )
+
+
+def from_item(item: dict) -> OrderIn:
+    # Données écrites par ce module : pas de re-validation
+    return OrderIn.model_construct(
+        orderId=item["orderId"]["S"],
+        createdAt=datetime.fromisoformat(item["createdAt"]["S"]),
+        totalAmount=float(item["totalAmount"]["N"]),
+        currency=item["currency"]["S"],
+    )
+
+
+class DynamoDBOrderRepository(OrderRepository):
+    """Dépôt DynamoDB (clé de partition : orderId)."""
+
+    serves_queries = True
+
+    def __init__(
+        self,
+        table_name: str = ORDERS_TABLE,
+        client=None,
+        consistent_read: bool = ORDERS_CONSISTENT_READ,
+        max_attempts: int = 8,
+        base_delay: float = 0.05,
+        time_shards: int = ORDERS_TIME_SHARDS,
+    ):
+        self.table_name = table_name
+        self.client = client or get_dynamodb_client()
+        self.consistent_read = consistent_read
+        self.time_shards = time_shards
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+
+    def _backoff(self, attempt: int) -> None:
+        # Backoff exponentiel avec jitter complet
+        time.sleep(random.uniform(0, self.base_delay * 2**attempt))
+
+    def _batch_write(self, items: list[dict]) -> None:
+        requests = [{"PutRequest": {"Item": item}} for item in items]
+        for attempt in range(self.max_attempts):
+            response = self.client.batch_write_item(
+                RequestItems={self.table_name: requests}
+            )
+            requests = response.get("UnprocessedItems", {}).get(
+                self.table_name, []
+            )
+            if not requests:
+                return
+            logger.warning(
+                "DynamoDB unprocessed items, retrying",
+                count=len(requests),
+                attempt=attempt + 1,
+            )
+            self._backoff(attempt)
+        raise DynamoDBBatchError(
+            f"{len(requests)} items still unprocessed after "
+            f"{self.max_attempts} attempts"
+        )
+
+    def _write_many(self, orders: list[OrderIn]) -> None:
+        # Une même clé ne peut apparaître qu'une fois par BatchWriteItem
+        latest = {order.orderId: order for order in orders}
+        # Commandes remplacées, lues avant l'écriture (sans atomicité :
+        # BatchWriteItem ne renvoie pas les anciennes valeurs)
+        previous = self._read_many(list(latest))
+        items = [to_item(order, self.time_shards) for order in latest.values()]
+        for start in range(0, len(items), BATCH_WRITE_SIZE):
+            self._batch_write(items[start : start + BATCH_WRITE_SIZE])
+        self._update_rollups(
+            (order, previous.get(order_id))
+            for order_id, order in latest.items()
+        )
+
+    def _write_one(self, order: OrderIn) -> None:
+        response = self.client.put_item(
+            TableName=self.table_name,
+            Item=to_item(order, self.time_shards),
+            ReturnValues="ALL_OLD",
+        )
+        old = response.get("Attributes")
+        self._update_rollups([(order, from_item(old) if old else None)])
+
+    def _update_rollups(
+        self, writes: Iterable[tuple[OrderIn, Optional[OrderIn]]]
+    ) -> None:
+        """Reporte des écritures (commande, commande remplacée) en seaux."""
+        added, removed = [], []
+        for order, old in writes:
+            if old is not None and _same_point(old, order):
+                continue
+            added.append(order)
+            if old is not None:
+                removed.append(old)
+        changes = rollup_changes(added, removed)
+        # Minutes, puis heures, puis jours : un min/max recalculé lit des
+        # seaux plus fins déjà à jour
+        for (size, currency, start), (plus, minus) in sorted(changes.items()):
+            key = rollup_key(size, currency, start)
+            self.client.update_item(
+                TableName=self.table_name,
+                Key=key,
+                UpdateExpression=(
+                    "SET #r = :r, bucketKey = :k, bucketCurrency = :c "
+                    "ADD bucketCount :n, bucketTotal :t"
+                ),
+                ExpressionAttributeNames={"#r": "rollup"},
+                ExpressionAttributeValues={
+                    ":r": {"S": str(size)},
+                    ":k": {"S": bucket_key(start, currency)},
+                    ":c": {"S": currency},
+                    ":n": {"N": str(plus.count - minus.count)},
+                    ":t": {"N": str(plus.total - minus.total)},
+                },
+            )
+            if minus.count:
+                self._rebuild_extremes(key, size, currency, start)
+            elif plus.count:
+                self._extend(key, "bucketMin", ">", plus.minimum)
+                self._extend(key, "bucketMax", "<", plus.maximum)
+
+    def _extend(
+        self, key: dict, attribute: str, replaced_if: str, value: int
+    ) -> None:
+        """SET conditionnel : min ou max d'un seau, sans lecture."""
+        try:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key=key,
+                UpdateExpression=f"SET {attribute} = :v",
+                ConditionExpression=(
+                    f"attribute_not_exists({attribute}) "
+                    f"OR {attribute} {replaced_if} :v"
+                ),
+                ExpressionAttributeValues={":v": {"N": str(value)}},
+            )
+        except ClientError as e:
+            if (
+                e.response["Error"]["Code"]
+                != "ConditionalCheckFailedException"
+            ):
+                raise
+
+    def _rebuild_extremes(
+        self, key: dict, size: int, currency: str, start: int
+    ) -> None:
+        """Min/max d'un seau après retrait d'une commande remplacée."""
+        merged = RollupBucket()
+        if size == MINUTE:
+            for item in self._query_items(
+                CURRENCY_INDEX,
+                "currency",
+                currency,
+                sort_key((start, "")),
+                _micros(start + MINUTE),
+            ):
+                merged.add(to_minor(float(item["totalAmount"]["N"]), currency))
+        else:
+            for item in self._query_items(
+                ROLLUP_INDEX,
+                "rollup",
+                str(FINER[size]),
+                bucket_key(start),
+                f"{start + size - 1:011d}$",
+            ):
+                if item["bucketCurrency"]["S"] == currency:
+                    merged.merge(_bucket(item))
+        if merged.count:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key=key,
+                UpdateExpression="SET bucketMin = :min, bucketMax = :max",
+                ExpressionAttributeValues={
+                    ":min": {"N": str(merged.minimum)},
+                    ":max": {"N": str(merged.maximum)},
+                },
+            )
+        else:
+            self.client.update_item(
+                TableName=self.table_name,
+                Key=key,
+                UpdateExpression="REMOVE bucketMin, bucketMax",
+            )
+
+    def _query_items(
+        self, index: str, attribute: str, value: str, low: str, high: str
+    ) -> Iterator[dict]:
+        """Tous les éléments d'une partition d'index, tri dans [low, high]."""
+        kwargs = {
+            "TableName": self.table_name,
+            "IndexName": index,
+            "KeyConditionExpression": "#p = :p AND #s BETWEEN :low AND :high",
+            "ExpressionAttributeNames": {
+                "#p": attribute,
+                "#s": "bucketKey" if index == ROLLUP_INDEX else "sortKey",
+            },
+            "ExpressionAttributeValues": {
+                ":p": {"S": value},
+                ":low": {"S": low},
+                ":high": {"S": high},
+            },
+        }
+        while True:
+            response = self.client.query(**kwargs)
+            yield from response["Items"]
+            if "LastEvaluatedKey" not in response:
+                return
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _batch_get(self, order_ids: list[str]) -> list[dict]:
+        request = {
+            "Keys": [{"orderId": {"S": oid}} for oid in order_ids],
+            "ConsistentRead": self.consistent_read,
+        }
+        items = []
+        for attempt in range(self.max_attempts):
+            response = self.client.batch_get_item(
+                RequestItems={self.table_name: request}
+            )
+            items.extend(
+                response.get("Responses", {}).get(self.table_name, [])
+            )
+            request = response.get("UnprocessedKeys", {}).get(self.table_name)
+            if not request or not request.get("Keys"):
+                return items
+            self._backoff(attempt)
+        raise DynamoDBBatchError(
+            f"{len(request['Keys'])} keys still unprocessed after "
+            f"{self.max_attempts} attempts"
+        )
+
+    def _read_many(self, order_ids: list[str]) -> dict[str, OrderIn]:
+        ids = list(dict.fromkeys(order_ids))
+        found = {}
+        for start in range(0, len(ids), BATCH_GET_SIZE):
+            for item in self._batch_get(ids[start : start + BATCH_GET_SIZE]):
+                if is_rollup(item):
+                    continue
+                order = from_item(item)
+                found[order.orderId] = order
+        return found
+
+    def _get_one(self, order_id: str) -> Optional[OrderIn]:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={"orderId": {"S": order_id}},
+            ConsistentRead=self.consistent_read,
+        )
+        item = response.get("Item")
+        return from_item(item) if item and not is_rollup(item) else None
+
+    async def add(self, order: OrderIn) -> None:
+        await asyncio.to_thread(self._write_one, order)
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        await asyncio.to_thread(self._write_many, list(orders))
+
+    async def get(self, order_id: str) -> Optional[OrderIn]:
+        return await asyncio.to_thread(self._get_one, order_id)
+
+    async def get_many(self, order_ids: Iterable[str]) -> dict[str, OrderIn]:
+        return await asyncio.to_thread(self._read_many, list(order_ids))
+
+    def _query_partition(
+        self,
+        index: str,
+        attribute: str,
+        value: str,
+        low: Optional[str],
+        high: Optional[str],
+        min_amount: Optional[float],
+        max_amount: Optional[float],
+        limit: int,
+    ) -> tuple[list[dict], Optional[dict]]:
+        """Une page d'une partition d'index, sortKey dans [low, high]."""
+        condition = "#p = :p"
+        values = {":p": {"S": value}}
+        if low is not None and high is not None:
+            condition += " AND sortKey BETWEEN :low AND :high"
+        elif low is not None:
+            condition += " AND sortKey >= :low"
+        elif high is not None:
+            condition += " AND sortKey <= :high"
+        if low is not None:
+            values[":low"] = {"S": low}
+        if high is not None:
+            values[":high"] = {"S": high}
+        filters = []
+        if min_amount is not None:
+            filters.append("totalAmount >= :min")
+            values[":min"] = {"N": repr(float(min_amount))}
+        if max_amount is not None:
+            filters.append("totalAmount <= :max")
+            values[":max"] = {"N": repr(float(max_amount))}
+        kwargs = {
+            "TableName": self.table_name,
+            "IndexName": index,
+            "KeyConditionExpression": condition,
+            "ExpressionAttributeNames": {"#p": attribute},
+            "ExpressionAttributeValues": values,
+            "Limit": limit,
+        }
+        if filters:
+            kwargs["FilterExpression"] = " AND ".join(filters)
+        response = self.client.query(**kwargs)
+        return response["Items"], response.get("LastEvaluatedKey")
+
+    async def query(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        after: Optional[IndexKey] = None,
+        limit: int = 100,
+    ) -> tuple[list[OrderIn], Optional[IndexKey]]:
+        if currency is not None:
+            partitions = [(CURRENCY_INDEX, "currency", currency)]
+        else:
+            partitions = [
+                (TIME_INDEX, "timeShard", f"t{n}")
+                for n in range(self.time_shards)
+            ]
+        low = None
+        if created_from is not None:
+            low = _micros(to_epoch(created_from)) + "#"
+        if after is not None and (low is None or sort_key(after) > low):
+            # BETWEEN est inclusif : l'élément after est écarté ci-dessous
+            low = sort_key(after)
+        # Préfixe sans "#" : toute clé de createdTo lui est supérieure
+        high = _micros(to_epoch(created_to)) if created_to else None
+        if low is not None and high is not None and low > high:
+            return [], None
+
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    self._query_partition,
+                    *partition,
+                    low,
+                    high,
+                    min_amount,
+                    max_amount,
+                    limit,
+                )
+                for partition in partitions
+            )
+        )
+        orders, pages = {}, []
+        for items, last_evaluated in results:
+            keys = []
+            for item in items:
+                key = parse_sort_key(item["sortKey"]["S"])
+                if after is not None and key <= after:
+                    continue
+                orders[key] = from_item(item)
+                keys.append(key)
+            pages.append(
+                (
+                    keys,
+                    (
+                        parse_sort_key(last_evaluated["sortKey"]["S"])
+                        if last_evaluated
+                        else None
+                    ),
+                )
+            )
+        keys, last_key = merge_pages(pages, limit)
+        return [orders[key] for key in keys], last_key
+
+    def _read_rollups(self, size: int, first: int, last: int) -> list[dict]:
+        # "$" suit "#" : toutes les devises du dernier début sont incluses
+        return list(
+            self._query_items(
+                ROLLUP_INDEX,
+                "rollup",
+                str(size),
+                bucket_key(first),
+                f"{last:011d}$",
+            )
+        )
+
+    async def rollups(
+        self,
+        start: float,
+        end: float,
+        currency: Optional[str] = None,
+        granularity: Optional[str] = None,
+    ) -> SalesRollup:
+        ranges = rollup_ranges(start, end, granularity)
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._read_rollups, *r) for r in ranges)
+        )
+        rollup = SalesRollup()
+        for (size, _, _), items in zip(ranges, results):
+            for item in items:
+                code = item["bucketCurrency"]["S"]
+                bucket = _bucket(item)
+                if bucket.count and currency in (None, code):
+                    bucket_start = int(item["bucketKey"]["S"].split("#")[0])
+                    rollup.put(size, code, bucket_start, bucket)
+        return rollup
+
+    def _scan_page(self, batch_size: int, start_key: Optional[dict]):
+        kwargs = {
+            "TableName": self.table_name,
+            "Limit": batch_size,
+            "ConsistentRead": self.consistent_read,
+            **WITHOUT_ROLLUPS,
+        }
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        return self.client.scan(**kwargs)
+
+    async def scan(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[list[OrderIn]]:
+        start_key = None
+        while True:
+            page = await asyncio.to_thread(
+                self._scan_page, batch_size, start_key
+            )
+            if page["Items"]:
+                yield [from_item(item) for item in page["Items"]]
+            start_key = page.get("LastEvaluatedKey")
+            if not start_key:
+                return
+
+    def _count(self) -> int:
+        total = 0
+        kwargs = {
+            "TableName": self.table_name,
+            "Select": "COUNT",
+            **WITHOUT_ROLLUPS,
+        }
+        while True:
+            page = self.client.scan(**kwargs)
+            total += page["Count"]
+            if "LastEvaluatedKey" not in page:
+                return total
+            kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+    async def count(self) -> int:
+        # Scan complet : réservé à l'administration, pas au chemin chaud
+        return await asyncio.to_thread(self._count)
@@ -1,2 +1,33 @@
 class OrderNotFoundException(Exception):
     """Exception levée quand une commande n'est pas trouvée."""
+
+
+class InvalidCursorException(ValueError):
+    """Exception levée quand un curseur de pagination est invalide."""
+
+
+class OrderStoreFullException(RuntimeError):
+    """
+    Le dépôt ne peut plus accepter de nouvelle commande. stored indique
+    combien des commandes de l'écriture ont été enregistrées avant l'échec
+    (les premières, dans l'ordre).
+    """
+
+    def __init__(self, message: str, stored: int = 0):
+        super().__init__(message)
+        self.stored = stored
+
+
+class OrderNotStorableException(ValueError):
+    """
+    Commande valide que le dépôt actif ne sait pas stocker (ex. orderId
+    trop long pour les cases de taille fixe du dépôt partagé).
+    """
+
+
+class IdempotentReplayException(Exception):
+    """Levée pour rejouer la réponse stockée d'une requête idempotente."""
+
+    def __init__(self, response):
+        super().__init__("Idempotent replay")
+        self.response = response
@@ -0,0 +1,66 @@
+"""
+Export des commandes en flux (NDJSON ou CSV), compressé à la volée.
+
+Les commandes sont lues page par page et chaque page est sérialisée
+directement en octets : la mémoire utilisée dépend de la taille d'une page,
+pas du nombre de commandes exportées.
+"""
+
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from .projection import OrderProjection, projection
+from .schemas import OrderIn
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def ndjson_chunk(orders: Iterable[OrderIn], fields: OrderProjection) -> bytes:
+    lines = list(map(fields.to_json, orders))
+    return ("\n".join(lines) + "\n").encode() if lines else b""
+
+
+def csv_header(fields: OrderProjection) -> bytes:
+    return (",".join(fields.fields) + "\r\n").encode()
+
+
+def csv_chunk(orders: Iterable[OrderIn], fields: OrderProjection) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(map(fields.values, orders))
+    return buffer.getvalue().encode()
+
+
+SERIALIZERS: dict[
+    str, Callable[[Iterable[OrderIn], OrderProjection], bytes]
+] = {
+    "ndjson": ndjson_chunk,
+    "csv": csv_chunk,
+}
+
+
+async def encode_pages(
+    pages: AsyncIterator[list[OrderIn]],
+    export_format: str,
+    fields: Optional[OrderProjection] = None,
+) -> AsyncIterator[bytes]:
+    """Sérialise chaque page de commandes en un bloc d'octets."""
+    fields = fields or projection()
+    if export_format == "csv":
+        yield csv_header(fields)
+    serialize = SERIALIZERS[export_format]
+    async for page in pages:
+        chunk = serialize(page, fields)
+        if chunk:
+            yield chunk
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compresse un flux d'octets au format gzip, bloc par bloc."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,261 @@
+"""
+Support de l'en-tête Idempotency-Key sur la création de commandes.
+
+La réponse sérialisée de la première requête est conservée dans un cache
+LRU borné avec expiration, indexé par (utilisateur, clé), avec ses
+en-têtes de représentation (ETag, Vary). Une nouvelle tentative avec la
+même clé, le même corps et le même type de réponse négocié (Accept) rejoue
+ces octets tels quels, sans re-valider le corps ni rappeler le service.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.responses import Response
+
+from poshub_api.auth import User, require_orders_write
+from poshub_api.logging_config import get_logger
+from poshub_api.metrics import register_metrics
+
+from .exceptions import IdempotentReplayException
+from .negotiation import MSGPACK_MEDIA_TYPE, accepts_msgpack
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+MAX_KEY_LENGTH = 255
+# En-têtes de la réponse d'origine rejoués avec son corps
+REPLAYED_HEADERS = ("etag", "vary")
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes
+    status_code: int
+    body: Optional[bytes]  # None tant que la requête est en cours
+    media_type: str
+    headers: tuple  # paires (nom, valeur) de REPLAYED_HEADERS
+    expires_at: float
+
+
+class IdempotencyContext(NamedTuple):
+    key: tuple
+    fingerprint: bytes
+
+
+class IdempotencyCache:
+    """Cache LRU + TTL des réponses de requêtes idempotentes."""
+
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_CACHE_SIZE,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple, StoredResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: tuple) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: tuple, entry: StoredResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def reserve(self, key: tuple, fingerprint: bytes) -> None:
+        """Marque la clé comme en cours de traitement."""
+        self._store(
+            key,
+            StoredResponse(
+                fingerprint,
+                0,
+                None,
+                "",
+                (),
+                self._clock() + self.ttl_seconds,
+            ),
+        )
+
+    def complete(
+        self,
+        key: tuple,
+        fingerprint: bytes,
+        status_code: int,
+        body: bytes,
+        media_type: str,
+        headers: tuple = (),
+    ) -> None:
+        self._store(
+            key,
+            StoredResponse(
+                fingerprint,
+                status_code,
+                body,
+                media_type,
+                headers,
+                self._clock() + self.ttl_seconds,
+            ),
+        )
+
+    def release(self, key: tuple) -> None:
+        """Libère une clé dont le traitement a échoué."""
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "conflicts": self.conflicts,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+idempotency_cache = IdempotencyCache()
+register_metrics("idempotency", idempotency_cache.stats)
+
+
+def replayed_headers(response: Response) -> tuple:
+    """En-têtes de la réponse à conserver pour un rejeu."""
+    return tuple(
+        (name, response.headers[name])
+        for name in REPLAYED_HEADERS
+        if name in response.headers
+    )
+
+
+def _fingerprint(request: Request, body: bytes) -> bytes:
+    """
+    Empreinte de la requête : corps et type de réponse négocié. Une même
+    clé rejouée avec un autre Accept recevrait sinon la représentation
+    d'origine (JSON au lieu de MessagePack, ou l'inverse).
+    """
+    media_type = (
+        MSGPACK_MEDIA_TYPE
+        if accepts_msgpack(request.headers.get("accept"))
+        else "application/json"
+    )
+    digest = hashlib.sha256(media_type.encode())
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.digest()
+
+
+def _resolve_stored(
+    stored: StoredResponse, context: IdempotencyContext
+) -> None:
+    """
+    Clé déjà connue : rejoue la réponse stockée, ou rejette une clé
+    réutilisée avec un autre corps ou un autre Accept (422) ou en cours de
+    traitement (409).
+    """
+    username, idempotency_key = context.key
+    if stored.fingerprint != context.fingerprint:
+        idempotency_cache.conflicts += 1
+        logger.warning(
+            "Idempotency-Key reused with a different payload",
+            username=username,
+            idempotency_key=idempotency_key,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                "Idempotency-Key already used with a different payload "
+                "or Accept header"
+            ),
+        )
+    if stored.body is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is in progress",
+        )
+
+    idempotency_cache.hits += 1
+    logger.info(
+        "Idempotent replay", username=username, idempotency_key=idempotency_key
+    )
+    raise IdempotentReplayException(
+        Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type=stored.media_type,
+            headers={**dict(stored.headers), "Idempotent-Replayed": "true"},
+        )
+    )
+
+
+async def check_idempotency_key(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(require_orders_write),
+) -> Optional[IdempotencyContext]:
+    """
+    Dépendance résolue avant la validation du corps : rejoue la réponse
+    stockée ou rejette une clé réutilisée, sans rien réserver. La clé est
+    réservée par claim_idempotency_key, une fois le corps validé : une
+    requête invalide (422) ne bloque pas la clé.
+    """
+    if idempotency_key is None:
+        return None
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+        )
+
+    context = IdempotencyContext(
+        (current_user.username, idempotency_key),
+        _fingerprint(request, await request.body()),
+    )
+    stored = idempotency_cache.get(context.key)
+    if stored is not None:
+        _resolve_stored(stored, context)
+    return context
+
+
+def claim_idempotency_key(context: Optional[IdempotencyContext]) -> None:
+    """
+    Réserve la clé pour une requête validée. Une requête concurrente a pu
+    la réserver depuis la dépendance : elle est alors traitée de même.
+    L'appelant libère la clé (release) sur tout chemin sans succès.
+    """
+    if context is None:
+        return
+    stored = idempotency_cache.get(context.key)
+    if stored is not None:
+        _resolve_stored(stored, context)
+    idempotency_cache.misses += 1
+    idempotency_cache.reserve(context.key, context.fingerprint)
+
+
+async def replay_idempotent_response(
+    request: Request, exc: IdempotentReplayException
+) -> Response:
+    """Gestionnaire d'exception renvoyant la réponse stockée."""
+    return exc.response
@@ -0,0 +1,198 @@
+"""
+Index secondaires des commandes, maintenus par OrderService.
+
+- un index temporel trié sur (createdAt, orderId)
+- un index trié par devise (une liste par code devise)
+
+Une page coûte O(log n + taille de page) : la position de départ est
+trouvée par dichotomie puis l'index est parcouru jusqu'à remplir la page.
+Les bornes de montant sont appliquées pendant ce parcours, qui examine au
+plus ORDER_QUERY_MAX_SCAN entrées par appel : un filtre sélectif rend
+alors une page incomplète (voire vide) avec une clé de reprise, au lieu
+de parcourir tout l'index sur la boucle d'événements.
+"""
+
+import base64
+import heapq
+import json
+import os
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from itertools import islice, takewhile
+from typing import Iterable, Optional, Tuple
+
+from .exceptions import InvalidCursorException
+from .records import OrderRecord
+from .schemas import OrderIn
+
+IndexKey = Tuple[float, str]
+
+ORDER_QUERY_MAX_SCAN = int(os.getenv("ORDER_QUERY_MAX_SCAN", "10000"))
+
+
+def to_epoch(value: datetime) -> float:
+    """Horodatage epoch ; les dates naïves sont considérées en UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def order_epoch(order: OrderIn) -> float:
+    """Horodatage epoch d'une commande, sans datetime pour un OrderRecord."""
+    if isinstance(order, OrderRecord):
+        return order.epoch
+    return to_epoch(order.createdAt)
+
+
+def encode_cursor(key: IndexKey) -> str:
+    """Curseur opaque désignant la dernière clé d'une page."""
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> IndexKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        epoch, order_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(epoch), str(order_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorException(f"Invalid cursor: {cursor}") from e
+
+
+class OrderIndex:
+    """Index temporel et par devise sur les commandes."""
+
+    def __init__(self):
+        self._by_time: list[IndexKey] = []
+        self._by_currency: dict[str, list[IndexKey]] = {}
+        # orderId -> (clé, devise, montant) pour les remplacements et filtres
+        self._entries: dict[str, tuple[IndexKey, str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _remove(keys: list[IndexKey], key: IndexKey) -> None:
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+
+    @staticmethod
+    def _insert(keys: list[IndexKey], key: IndexKey) -> None:
+        # Cas courant : les commandes arrivent dans l'ordre chronologique
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            insort(keys, key)
+
+    def entry(self, order_id: str) -> Optional[tuple[IndexKey, str, float]]:
+        """Retourne (clé, devise, montant) d'une commande indexée."""
+        return self._entries.get(order_id)
+
+    def amounts_between(
+        self, currency: str, start: float, end: float
+    ) -> list[float]:
+        """Montants des commandes d'une devise sur [start, end)."""
+        keys = self._by_currency.get(currency, [])
+        position = bisect_left(keys, (start, ""))
+        amounts = []
+        while position < len(keys) and keys[position][0] < end:
+            amounts.append(self._entries[keys[position][1]][2])
+            position += 1
+        return amounts
+
+    def add(self, order: OrderIn) -> None:
+        key = (order_epoch(order), order.orderId)
+        previous = self._entries.get(order.orderId)
+        if previous is not None:
+            old_key, old_currency, _ = previous
+            self._remove(self._by_time, old_key)
+            self._remove(self._by_currency[old_currency], old_key)
+
+        self._entries[order.orderId] = (key, order.currency, order.totalAmount)
+        self._insert(self._by_time, key)
+        self._insert(self._by_currency.setdefault(order.currency, []), key)
+
+    def query(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        after: Optional[IndexKey] = None,
+        limit: int = 100,
+        max_scan: int = ORDER_QUERY_MAX_SCAN,
+    ) -> tuple[list[str], Optional[IndexKey]]:
+        """
+        Retourne les orderId d'une page et la clé de reprise éventuelle.
+
+        created_from est inclusif, created_to exclusif. Au plus
+        max(max_scan, limit) entrées sont examinées : la clé de reprise est
+        alors la dernière entrée examinée, pas forcément la dernière
+        retenue.
+        """
+        if currency is not None:
+            keys = self._by_currency.get(currency, [])
+        else:
+            keys = self._by_time
+
+        start: IndexKey = (float("-inf"), "")
+        if created_from is not None:
+            start = (to_epoch(created_from), "")
+        if after is not None and after > start:
+            position = bisect_left(keys, after)
+            if position < len(keys) and keys[position] == after:
+                position += 1
+        else:
+            position = bisect_left(keys, start)
+        end = to_epoch(created_to) if created_to is not None else None
+        check_amount = min_amount is not None or max_amount is not None
+
+        page: list[str] = []
+        last_key = None
+        stop = min(len(keys), position + max(max_scan, limit))
+        while position < stop and len(page) < limit:
+            key = keys[position]
+            position += 1
+            last_key = key
+            if end is not None and key[0] >= end:
+                return page, None
+            if check_amount:
+                amount = self._entries[key[1]][2]
+                if min_amount is not None and amount < min_amount:
+                    continue
+                if max_amount is not None and amount > max_amount:
+                    continue
+            page.append(key[1])
+
+        has_more = position < len(keys) and (
+            end is None or keys[position][0] < end
+        )
+        return page, last_key if has_more else None
+
+
+def merge_pages(
+    pages: Iterable[tuple[list[IndexKey], Optional[IndexKey]]], limit: int
+) -> tuple[list[IndexKey], Optional[IndexKey]]:
+    """
+    Fusionne des pages triées (une par partition) en O(limit log n) ;
+    chaque page est accompagnée de sa clé de reprise (None si épuisée).
+
+    Une partition interrompue n'a couvert les clés que jusqu'à sa clé de
+    reprise : la page fusionnée s'arrête à la plus petite de ces clés, qui
+    devient la clé de reprise si la page n'est pas pleine.
+    """
+    keys_by_page, bound = [], None
+    for keys, last_key in pages:
+        if last_key is not None and (bound is None or last_key < bound):
+            bound = last_key
+        keys_by_page.append(keys)
+    merged = heapq.merge(*keys_by_page)
+    if bound is not None:
+        merged = takewhile(lambda key: key <= bound, merged)
+    keys = list(islice(merged, limit + 1))
+    if len(keys) > limit:
+        del keys[limit:]
+        return keys, keys[-1]
+    return keys, bound
@@ -0,0 +1,200 @@
+"""
+Lecture incrémentale des corps de requête d'ingestion en masse.
+
+Les corps NDJSON (une commande par ligne), tableaux JSON et suites d'objets
+MessagePack sont lus au fil de l'eau depuis request.stream() : seule la
+ligne ou l'élément en cours de décodage est gardé en mémoire, quelle que
+soit la taille de l'envoi.
+"""
+
+import codecs
+import json
+from typing import AsyncIterator, Tuple
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+
+from .negotiation import msgpack
+from .schemas import OrderIn
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+# Taille maximale d'un enregistrement, pour borner la mémoire par requête
+MAX_RECORD_BYTES = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class BatchFormatError(ValueError):
+    """Corps illisible ou enregistrement dépassant MAX_RECORD_BYTES."""
+
+
+async def iter_ndjson_lines(
+    stream: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """Produit (numéro de ligne, contenu) pour chaque ligne non vide."""
+    buffer = b""
+    line_no = 0
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+        if len(buffer) > MAX_RECORD_BYTES:
+            raise BatchFormatError(f"Line {line_no + 1} exceeds size limit")
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def iter_json_array_items(
+    stream: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Produit (index, élément décodé) pour chaque élément d'un tableau.
+
+    Les éléments sont séparés par exactement une virgule ; un élément n'est
+    produit qu'une fois lu le « , » ou le « ] » qui le suit, si bien qu'une
+    erreur de syntaxe autour du premier élément est levée avant tout
+    résultat.
+    """
+    buffer = ""
+    started = finished = False
+    pending = None  # élément décodé, en attente de son séparateur
+    index = 0
+    # Les séquences UTF-8 peuvent être coupées entre deux fragments
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in stream:
+        try:
+            buffer += decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise BatchFormatError(f"Invalid UTF-8 body: {e}")
+        while not finished:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if not started:
+                if buffer[0] != "[":
+                    raise BatchFormatError("Expected a JSON array")
+                started = True
+                buffer = buffer[1:]
+                continue
+            if pending is not None:
+                if buffer[0] not in ",]":
+                    raise BatchFormatError(
+                        f"Expected ',' or ']' after item {index}"
+                    )
+                finished = buffer[0] == "]"
+                buffer = buffer[1:]
+                item, pending = pending, None
+                yield index, item
+                continue
+            if buffer[0] == "]" and index == 0:
+                finished = True
+                buffer = buffer[1:]
+                break
+            if buffer[0] in ",]":
+                raise BatchFormatError(f"Expected item {index + 1}")
+            try:
+                pending, end = _decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Élément incomplet : attendre le fragment suivant
+                if len(buffer) > MAX_RECORD_BYTES:
+                    raise BatchFormatError(
+                        f"Item {index + 1} is malformed or exceeds size limit"
+                    )
+                break
+            buffer = buffer[end:]
+            index += 1
+        if finished:
+            if buffer.strip():
+                raise BatchFormatError("Unexpected data after JSON array")
+            buffer = ""
+    if not finished:
+        raise BatchFormatError("Truncated or malformed JSON array")
+
+
+async def iter_msgpack_items(
+    stream: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, object]]:
+    """Produit (index, objet décodé) pour une suite d'objets MessagePack."""
+    # Le tampon interne ne garde que l'objet incomplet en cours : il ne
+    # dépasse la limite que pour un enregistrement trop grand
+    unpacker = msgpack.Unpacker(
+        timestamp=3, max_buffer_size=2 * MAX_RECORD_BYTES
+    )
+    # tell() avance aussi sur un objet incomplet : on garde la fin du
+    # dernier objet décodé pour détecter un corps tronqué
+    received = decoded = index = 0
+    async for chunk in stream:
+        received += len(chunk)
+        for start in range(0, len(chunk), MAX_RECORD_BYTES):
+            try:
+                unpacker.feed(chunk[start : start + MAX_RECORD_BYTES])
+            except msgpack.BufferFull:
+                raise BatchFormatError(f"Item {index + 1} exceeds size limit")
+            while True:
+                try:
+                    item = unpacker.unpack()
+                except msgpack.OutOfData:
+                    break
+                except (ValueError, msgpack.StackError) as e:
+                    raise BatchFormatError(f"Invalid MessagePack body: {e}")
+                decoded = unpacker.tell()
+                index += 1
+                yield index, item
+    if decoded != received:
+        raise BatchFormatError("Truncated MessagePack body")
+
+
+async def peek_records(records: AsyncIterator) -> AsyncIterator:
+    """
+    Lit le premier enregistrement avant de répondre : un corps illisible
+    dès le début lève BatchFormatError, que l'appelant renvoie en 400, au
+    lieu d'une ligne d'erreur dans un rapport déjà parti en 200.
+    """
+    try:
+        first = await anext(records)
+    except StopAsyncIteration:
+        return _prepend((), records)
+    return _prepend((first,), records)
+
+
+async def _prepend(head: tuple, records: AsyncIterator) -> AsyncIterator:
+    for record in head:
+        yield record
+    async for record in records:
+        yield record
+
+
+class IngestReportResponse(StreamingResponse):
+    """
+    Rapport NDJSON produit pendant la lecture du corps de la requête.
+
+    StreamingResponse écoute receive() pour détecter une déconnexion, ce
+    qui consommerait les fragments du corps encore en cours de lecture ;
+    ici, une déconnexion du client est remontée par send().
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def validate_record(raw) -> OrderIn:
+    """Valide une ligne NDJSON (bytes) ou un élément de tableau (objet)."""
+    if isinstance(raw, (bytes, str)):
+        return OrderIn.model_validate_json(raw)
+    return OrderIn.model_validate(raw)
+
+
+def format_errors(error: ValidationError) -> list[dict]:
+    """Réduit les erreurs pydantic à une forme sérialisable en JSON."""
+    return [
+        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+        for err in error.errors(include_url=False)
+    ]
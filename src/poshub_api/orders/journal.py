@@ -0,0 +1,310 @@
+"""
+Mode durable pour le dépôt en mémoire : journal append-only et snapshots.
+
+Le dictionnaire reste le chemin chaud des lectures. Chaque écriture est
+ajoutée au journal (une ligne JSON par commande) ; les écritures
+concurrentes sont regroupées et partagent un seul fsync (group commit).
+Un ajout qui échoue (disque plein, erreur d'E/S) est retiré du journal,
+ramené au dernier enregistrement validé.
+
+Tous les snapshot_every enregistrements, le journal est renommé en
+orders.log.1 et un nouveau journal est ouvert ; l'état à cet instant est
+écrit dans un snapshot compact en tâche de fond, pendant que les écritures
+continuent, puis orders.log.1 est supprimé. Au démarrage, l'état est
+reconstruit à partir du snapshot, de orders.log.1 s'il existe encore, puis
+du journal ; les lignes illisibles sont signalées et ignorées.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable
+
+from poshub_api.logging_config import get_logger
+
+from .records import OrderRecord
+from .repository import InMemoryOrderRepository
+from .schemas import OrderIn
+
+logger = get_logger(__name__)
+
+LOG_FILE = "orders.log"
+ROTATED_LOG_FILE = "orders.log.1"
+SNAPSHOT_FILE = "orders.snapshot"
+
+
+def encode_order(order: OrderIn) -> bytes:
+    row = [
+        order.orderId,
+        order.createdAt.isoformat(),
+        order.totalAmount,
+        order.currency,
+    ]
+    return json.dumps(row, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_order(line: bytes) -> OrderRecord:
+    order_id, created_at, total_amount, currency = json.loads(line)
+    # Données écrites par ce module : pas de re-validation
+    return OrderRecord.from_values(
+        order_id, datetime.fromisoformat(created_at), total_amount, currency
+    )
+
+
+class JournaledOrderRepository(InMemoryOrderRepository):
+    """Dépôt en mémoire rendu durable par un journal et des snapshots."""
+
+    def __init__(self, directory: str, snapshot_every: int = 100_000):
+        super().__init__()
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.log_path = os.path.join(directory, LOG_FILE)
+        self.rotated_path = os.path.join(directory, ROTATED_LOG_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self._io = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="orders-journal"
+        )
+        # Écriture des snapshots, hors du fil des ajouts au journal
+        self._snapshot_io = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="orders-snapshot"
+        )
+        self._pending = []
+        self._flush_task = None
+        self._snapshot_task = None
+        self._since_snapshot = 0
+        # Taille du journal au dernier enregistrement validé
+        self._log_size = 0
+        self.fsyncs = 0
+        self.records = 0
+        self.snapshots = 0
+        self.rollbacks = 0
+        self.skipped = 0
+        self.snapshot_failures = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self._log = open(self.log_path, "ab")
+
+    def _recover(self) -> None:
+        """Recharge le snapshot puis rejoue les journaux."""
+        replayed = 0
+        for path in (self.snapshot_path, self.rotated_path, self.log_path):
+            if not os.path.exists(path):
+                continue
+            valid_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Dernière ligne interrompue par un arrêt brutal
+                        logger.warning("Ignoring truncated journal record")
+                        break
+                    valid_bytes += len(line)
+                    try:
+                        order = decode_order(line)
+                    except (ValueError, TypeError) as e:
+                        # Ligne corrompue : les suivantes restent valables
+                        self.skipped += 1
+                        logger.error(
+                            "Skipping undecodable journal record",
+                            path=path,
+                            offset=valid_bytes - len(line),
+                            error=str(e),
+                        )
+                        continue
+                    self.orders[order.orderId] = order
+                    if path != self.snapshot_path:
+                        replayed += 1
+            if path == self.log_path:
+                # Les prochains ajouts repartent après le dernier
+                # enregistrement complet
+                os.truncate(path, valid_bytes)
+                self._log_size = valid_bytes
+        self._since_snapshot = replayed
+        logger.info(
+            "Order journal recovered",
+            directory=self.directory,
+            orders=len(self.orders),
+            replayed=replayed,
+            skipped=self.skipped,
+        )
+
+    def _append(self, data: bytes) -> None:
+        try:
+            self._log.write(data)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        except OSError:
+            self._rollback()
+            raise
+        self._log_size += len(data)
+        self.fsyncs += 1
+
+    def _rollback(self) -> None:
+        """
+        Ramène le journal au dernier enregistrement validé après un ajout
+        en échec : une ligne partielle au milieu du journal arrêterait la
+        reprise avant les enregistrements suivants.
+        """
+        try:
+            # Le tampon non écrit est abandonné avec le fichier
+            self._log.close()
+        except OSError:
+            pass
+        os.truncate(self.log_path, self._log_size)
+        self._log = open(self.log_path, "ab")
+        self.rollbacks += 1
+        logger.warning("Order journal rolled back", offset=self._log_size)
+
+    def _rotate(self) -> None:
+        """Renomme le journal courant et en ouvre un nouveau, vide."""
+        self._log.close()
+        if os.path.exists(self.rotated_path):
+            # Snapshot précédent en échec : le journal renommé n'est dans
+            # aucun snapshot, le journal courant s'y ajoute
+            with open(self.log_path, "rb") as src, open(
+                self.rotated_path, "ab"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.unlink(self.log_path)
+        else:
+            os.replace(self.log_path, self.rotated_path)
+        self._log = open(self.log_path, "ab")
+        self._log_size = 0
+        self._fsync_directory()
+
+    def _fsync_directory(self) -> None:
+        dir_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _write_snapshot(self, orders: list[OrderIn]) -> None:
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(orders), 10_000):
+                f.write(
+                    b"".join(map(encode_order, orders[start : start + 10_000]))
+                )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._fsync_directory()
+        # Toutes les entrées du journal renommé sont dans le snapshot
+        os.unlink(self.rotated_path)
+
+    async def _start_snapshot(self) -> asyncio.Task:
+        """
+        Renomme le journal puis lance l'écriture du snapshot de l'état à
+        cet instant. Appelé entre deux ajouts : le dictionnaire reflète
+        alors exactement le journal renommé.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._io, self._rotate)
+        orders = list(self.orders.values())
+        self._since_snapshot = 0
+        self._snapshot_task = loop.create_task(self._snapshot(orders))
+        return self._snapshot_task
+
+    async def _snapshot(self, orders: list[OrderIn]) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._snapshot_io, self._write_snapshot, orders
+            )
+        except Exception as e:
+            # Le journal renommé reste rejoué au démarrage, et repris par
+            # le snapshot suivant
+            self.snapshot_failures += 1
+            logger.error("Order snapshot failed", error=str(e))
+            return
+        self.snapshots += 1
+        logger.info("Order snapshot written", orders=len(orders))
+
+    def _snapshot_running(self) -> bool:
+        return (
+            self._snapshot_task is not None and not self._snapshot_task.done()
+        )
+
+    async def _drain(self) -> None:
+        """Attend les ajouts au journal et le snapshot en cours."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self._snapshot_running():
+            await self._snapshot_task
+
+    async def snapshot(self) -> None:
+        """Écrit un snapshot de l'état courant et attend sa fin."""
+        await self._drain()
+        await (await self._start_snapshot())
+
+    async def _flush(self) -> None:
+        """Écrit les enregistrements en attente avec un seul fsync par lot."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            data = b"".join(line for line, _, _ in batch)
+            try:
+                await loop.run_in_executor(self._io, self._append, data)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, orders, future in batch:
+                for order in orders:
+                    self.orders[order.orderId] = OrderRecord.from_order(order)
+                self.records += len(orders)
+                self._since_snapshot += len(orders)
+                if not future.done():
+                    future.set_result(None)
+            # Un seul snapshot à la fois : sinon, au prochain lot
+            if (
+                self._since_snapshot >= self.snapshot_every
+                and not self._snapshot_running()
+            ):
+                await self._start_snapshot()
+
+    async def _enqueue(self, orders: list[OrderIn]) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        data = b"".join(map(encode_order, orders))
+        self._pending.append((data, orders, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+        await future
+
+    async def add(self, order: OrderIn) -> None:
+        await self._enqueue([order])
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        orders = list(orders)
+        if orders:
+            await self._enqueue(orders)
+
+    def stats(self) -> dict:
+        return {
+            "orders": len(self.orders),
+            "records": self.records,
+            "fsyncs": self.fsyncs,
+            "records_per_fsync": (
+                self.records / self.fsyncs if self.fsyncs else 0.0
+            ),
+            "snapshots": self.snapshots,
+            "rollbacks": self.rollbacks,
+            "skipped": self.skipped,
+            "snapshot_failures": self.snapshot_failures,
+        }
+
+    async def close(self) -> None:
+        if self._since_snapshot:
+            await self.snapshot()
+        else:
+            await self._drain()
+        self._io.shutdown(wait=True)
+        self._snapshot_io.shutdown(wait=True)
+        self._log.close()
@@ -0,0 +1,51 @@
+"""
+Montants en unités mineures entières (centimes, yens...).
+
+Le nombre de décimales dépend de la devise (ISO 4217) ; les devises
+inconnues (ou sans unité mineure, comme XAU) utilisent deux décimales.
+"""
+
+DEFAULT_MINOR_UNITS = 2
+
+# Exposants ISO 4217 des devises en circulation (table de maintenance
+# SIX), regroupés par nombre de décimales
+_ISO_4217 = {
+    0: "BIF CLP DJF GNF ISK JPY KMF KRW PYG RWF UGX UYI VND VUV XAF XOF "
+    "XPF",
+    2: "AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BMD BND BOB "
+    "BOV BRL BSD BTN BWP BYN BZD CAD CDF CHE CHF CHW CNY COP COU CRC CUP "
+    "CVE CZK DKK DOP DZD EGP ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GTQ "
+    "GYD HKD HNL HTG HUF IDR ILS INR IRR JMD KES KGS KHR KPW KYD KZT LAK "
+    "LBP LKR LRD LSL MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MXV "
+    "MYR MZN NAD NGN NIO NOK NPR NZD PAB PEN PGK PHP PKR PLN QAR RON RSD "
+    "RUB SAR SBD SCR SDG SEK SGD SHP SLE SOS SRD SSP STN SVC SYP SZL THB "
+    "TJS TMT TOP TRY TTD TWD TZS UAH USD USN UYU UZS VED VES WST XCD XCG "
+    "YER ZAR ZMW ZWG",
+    3: "BHD IQD JOD KWD LYD OMR TND",
+    4: "CLF UYW",
+}
+
+MINOR_UNITS = {
+    code: exponent
+    for exponent, codes in _ISO_4217.items()
+    for code in codes.split()
+}
+
+
+def minor_units(currency: str) -> int:
+    """Nombre de décimales de la devise."""
+    return MINOR_UNITS.get(currency, DEFAULT_MINOR_UNITS)
+
+
+def to_minor(amount: float, currency: str) -> int:
+    """Montant arrondi à l'unité mineure la plus proche."""
+    return round(amount * 10 ** minor_units(currency))
+
+
+def from_minor(minor: int, currency: str) -> float:
+    return minor / 10 ** minor_units(currency)
+
+
+def is_exact_minor(amount: float, currency: str) -> bool:
+    """Vrai si le montant s'écrit exactement en unités mineures entières."""
+    return from_minor(to_minor(amount, currency), currency) == amount
@@ -0,0 +1,155 @@
+"""
+Négociation de contenu MessagePack pour les terminaux POS.
+
+Les endpoints de commandes acceptent un corps application/msgpack
+(Content-Type) et répondent en MessagePack quand l'en-tête Accept le
+préfère à JSON. Les dates sont encodées avec l'extension Timestamp de
+MessagePack (instant UTC) et les montants en flottants ; une date sans
+fuseau reste une chaîne ISO. Le corps décodé est validé par OrderIn comme
+un corps JSON.
+
+msgpack est une dépendance optionnelle : sans lui, les réponses restent en
+JSON et un corps MessagePack est refusé (415).
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+
+from .projection import ORDER_FIELDS, OrderProjection
+from .schemas import OrderIn
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (
+    MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+)
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return _media_type(content_type) in MSGPACK_MEDIA_TYPES
+
+
+def accepts_msgpack(accept: Optional[str]) -> bool:
+    """MessagePack demandé avec une qualité au moins égale à JSON."""
+    if msgpack is None or not accept:
+        return False
+    msgpack_q = json_q = 0.0
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        media_type = _media_type(media_type)
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, quality)
+        elif media_type == "application/json":
+            json_q = max(json_q, quality)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, datetime=True)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, timestamp=3)
+
+
+def msgpack_etag(etag: str) -> str:
+    """ETag fort de la représentation MessagePack d'une commande."""
+    return etag[:-1] + '-msgpack"'
+
+
+def order_map(
+    order: OrderIn, fields: Optional[OrderProjection] = None
+) -> dict:
+    """Commande (éventuellement projetée) prête à être encodée."""
+    names = fields.fields if fields is not None else ORDER_FIELDS
+    data = {name: getattr(order, name) for name in names}
+    created = data.get("createdAt")
+    if created is not None and created.tzinfo is None:
+        data["createdAt"] = created.isoformat()
+    return data
+
+
+def order_maps(
+    orders: Iterable[OrderIn], fields: Optional[OrderProjection] = None
+) -> list[dict]:
+    return [order_map(order, fields) for order in orders]
+
+
+def msgpack_response(
+    content: Any, headers: Optional[dict] = None, status_code: int = 200
+) -> Response:
+    return Response(
+        content=packb(content),
+        status_code=status_code,
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+class MsgPackRequest(Request):
+    """
+    Requête dont le corps MessagePack est décodé à la place du JSON.
+
+    FastAPI ne décode en JSON que les corps sans Content-Type ou de type
+    JSON : l'en-tête est masqué pour que le corps passe par json(), qui
+    décode ici le MessagePack, puis par la validation habituelle.
+    """
+
+    def __init__(self, scope, receive):
+        super().__init__(scope, receive)
+        self._headers = Headers(
+            raw=[
+                (name, value)
+                for name, value in scope["headers"]
+                if name != b"content-type"
+            ]
+        )
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpackb(await self.body())
+        return self._json
+
+
+class NegotiatedRoute(APIRoute):
+    """Route dont le corps (modèle pydantic) peut être en MessagePack."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if self.body_field is None:
+            return handler
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                if msgpack is None:
+                    raise HTTPException(
+                        status_code=415,
+                        detail="MessagePack support is not installed",
+                    )
+                request = MsgPackRequest(request.scope, request.receive)
+            return await handler(request)
+
+        return route_handler
@@ -0,0 +1,88 @@
+"""
+Projection des commandes sur un sous-ensemble de champs (?fields=).
+
+Un OrderProjection est construit une fois par ensemble de champs puis mis
+en cache : il n'accède qu'aux attributs demandés et les encode directement
+en JSON (ou en valeurs CSV), sans passer par OrderOut. Une date n'est
+formatée en ISO que si createdAt fait partie de la projection.
+"""
+
+import json
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from .schemas import OrderIn
+
+ORDER_FIELDS = ("orderId", "createdAt", "totalAmount", "currency")
+
+
+def _iso(order: OrderIn) -> str:
+    # Même rendu que pydantic : UTC écrit « Z » plutôt que « +00:00 »
+    value = order.createdAt.isoformat()
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+# Valeur sérialisable et fragment JSON de chaque champ
+_VALUES: dict[str, Callable[[OrderIn], object]] = {
+    "orderId": lambda order: order.orderId,
+    "createdAt": _iso,
+    "totalAmount": lambda order: order.totalAmount,
+    "currency": lambda order: order.currency,
+}
+_JSON: dict[str, Callable[[OrderIn], str]] = {
+    "orderId": lambda order: json.dumps(order.orderId),
+    "createdAt": lambda order: f'"{_iso(order)}"',
+    "totalAmount": lambda order: repr(order.totalAmount),
+    "currency": lambda order: json.dumps(order.currency),
+}
+
+
+class OrderProjection:
+    """Sérialiseur d'un ensemble de champs donné."""
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self._values = [_VALUES[name] for name in fields]
+        self._json = [(f'"{name}":', _JSON[name]) for name in fields]
+
+    def values(self, order: OrderIn) -> tuple:
+        return tuple(value(order) for value in self._values)
+
+    def to_dict(self, order: OrderIn) -> dict:
+        return dict(zip(self.fields, self.values(order)))
+
+    def to_json(self, order: OrderIn) -> str:
+        return (
+            "{"
+            + ",".join(key + encode(order) for key, encode in self._json)
+            + "}"
+        )
+
+    def json_array(self, orders: Iterable[OrderIn]) -> str:
+        return "[" + ",".join(map(self.to_json, orders)) + "]"
+
+
+@lru_cache(maxsize=None)
+def projection(fields: tuple[str, ...] = ORDER_FIELDS) -> OrderProjection:
+    """Projection mise en cache pour un ensemble canonique de champs."""
+    return OrderProjection(fields)
+
+
+def parse_fields(value: Optional[str]) -> Optional[OrderProjection]:
+    """
+    Projection correspondant au paramètre fields (séparé par des virgules),
+    ou None sans paramètre. Lève ValueError pour un champ inconnu.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - set(ORDER_FIELDS)
+    if unknown or not requested:
+        raise ValueError(
+            f"Invalid fields: {', '.join(sorted(unknown)) or value!r} "
+            f"(allowed: {', '.join(ORDER_FIELDS)})"
+        )
+    # Ordre canonique : une seule entrée de cache par ensemble de champs
+    return projection(
+        tuple(name for name in ORDER_FIELDS if name in requested)
+    )
@@ -0,0 +1,140 @@
+"""
+Représentation compacte des commandes stockées en mémoire.
+
+Un OrderRecord occupe une fraction de l'instance pydantic équivalente :
+pas de __dict__ ni de suivi des champs, un horodatage en microsecondes
+epoch, un décalage horaire partagé, un code devise interné et un montant
+entier en unités mineures. Il expose les mêmes attributs que OrderIn
+(orderId, createdAt, totalAmount, currency) : les modèles pydantic ne sont
+construits qu'à la frontière de l'API, par validation depuis les attributs.
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+from .money import from_minor, to_minor
+from .schemas import OrderIn
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Décalage en secondes -> fuseau partagé par tous les enregistrements
+_TIMEZONES: dict[int, timezone] = {0: timezone.utc}
+
+
+def _timezone(offset: int) -> timezone:
+    tz = _TIMEZONES.get(offset)
+    if tz is None:
+        tz = _TIMEZONES.setdefault(offset, timezone(timedelta(seconds=offset)))
+    return tz
+
+
+class OrderRecord:
+    """Commande stockée sous forme compacte."""
+
+    __slots__ = ("orderId", "currency", "created_us", "tz_offset", "minor")
+
+    def __init__(
+        self,
+        order_id: str,
+        currency: str,
+        created_us: int,
+        tz_offset: Optional[int],
+        minor: int,
+    ):
+        self.orderId = order_id
+        self.currency = sys.intern(currency)
+        self.created_us = created_us
+        # None pour une date naïve, sinon décalage UTC en secondes
+        self.tz_offset = tz_offset
+        self.minor = minor
+
+    @classmethod
+    def from_values(
+        cls,
+        order_id: str,
+        created_at: datetime,
+        total_amount: float,
+        currency: str,
+    ) -> "OrderRecord":
+        offset = created_at.utcoffset()
+        if offset is None:
+            created_us = (created_at - NAIVE_EPOCH) // MICROSECOND
+            tz_offset = None
+        else:
+            created_us = (created_at - EPOCH) // MICROSECOND
+            tz_offset = int(offset.total_seconds())
+        return cls(
+            order_id,
+            currency,
+            created_us,
+            tz_offset,
+            to_minor(total_amount, currency),
+        )
+
+    @classmethod
+    def from_order(cls, order: Union[OrderIn, "OrderRecord"]) -> "OrderRecord":
+        if isinstance(order, OrderRecord):
+            return order
+        return cls.from_values(
+            order.orderId, order.createdAt, order.totalAmount, order.currency
+        )
+
+    @property
+    def epoch(self) -> float:
+        """Horodatage epoch, identique à indexes.to_epoch(createdAt)."""
+        return self.created_us / 1_000_000
+
+    @property
+    def createdAt(self) -> datetime:
+        if self.tz_offset is None:
+            return NAIVE_EPOCH + self.created_us * MICROSECOND
+        created = EPOCH + self.created_us * MICROSECOND
+        if self.tz_offset:
+            created = created.astimezone(_timezone(self.tz_offset))
+        return created
+
+    @property
+    def totalAmount(self) -> float:
+        return from_minor(self.minor, self.currency)
+
+    def to_model(self) -> OrderIn:
+        # Valeurs issues d'un OrderIn déjà validé : pas de re-validation
+        return OrderIn.model_construct(
+            orderId=self.orderId,
+            createdAt=self.createdAt,
+            totalAmount=self.totalAmount,
+            currency=self.currency,
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OrderRecord):
+            return (
+                self.orderId == other.orderId
+                and self.currency == other.currency
+                and self.created_us == other.created_us
+                and self.tz_offset == other.tz_offset
+                and self.minor == other.minor
+            )
+        if isinstance(other, OrderIn):
+            return self == OrderRecord.from_order(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderRecord(orderId={self.orderId!r}, "
+            f"createdAt={self.createdAt.isoformat()!r}, "
+            f"totalAmount={self.totalAmount!r}, "
+            f"currency={self.currency!r})"
+        )
+
+
+def order_minor(order: Union[OrderIn, OrderRecord]) -> int:
+    """Montant d'une commande en unités mineures entières."""
+    if isinstance(order, OrderRecord):
+        return order.minor
+    return to_minor(order.totalAmount, order.currency)
@@ -0,0 +1,436 @@
+"""
+Dépôts de commandes : abstraction de stockage utilisée par OrderService.
+
+Deux implémentations sont fournies ici :
+- InMemoryOrderRepository : dictionnaire en mémoire (comportement historique)
+- SQLiteOrderRepository : base SQLite embarquée en mode WAL, persistante
+
+Les autres backends (journal, tiered, shared, dynamodb) vivent dans leurs
+modules et sont sélectionnés par create_order_repository().
+"""
+
+import abc
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional
+
+from poshub_api.logging_config import get_logger
+
+from .indexes import IndexKey
+from .records import OrderRecord
+from .rollups import SalesRollup
+from .schemas import OrderIn
+
+logger = get_logger(__name__)
+
+ORDER_STORE = os.getenv("ORDER_STORE", "memory")
+ORDER_STORE_PATH = os.getenv("ORDER_STORE_PATH", "poshub-orders.db")
+ORDER_JOURNAL_DIR = os.getenv("ORDER_JOURNAL_DIR", "poshub-orders-journal")
+ORDER_SNAPSHOT_EVERY = int(os.getenv("ORDER_SNAPSHOT_EVERY", "100000"))
+ORDER_COLD_DIR = os.getenv("ORDER_COLD_DIR", "/tmp/poshub-orders-cold")
+ORDER_MEMORY_BUDGET_MB = int(os.getenv("ORDER_MEMORY_BUDGET_MB", "128"))
+ORDER_HOT_TTL_SECONDS = float(os.getenv("ORDER_HOT_TTL_SECONDS", "0"))
+ORDER_SHARED_PATH = os.getenv(
+    "ORDER_SHARED_PATH",
+    "/dev/shm/poshub-orders" if os.path.isdir("/dev/shm") else "",
+) or os.path.join(tempfile.gettempdir(), "poshub-orders")
+ORDER_SHARED_CAPACITY = int(os.getenv("ORDER_SHARED_CAPACITY", "1048576"))
+
+
+class OrderRepository(abc.ABC):
+    """Interface de stockage des commandes."""
+
+    # Le dépôt sert lui-même les pages triées par createdAt (index
+    # secondaires côté stockage, voir query) : OrderService ne maintient
+    # alors ni index ni agrégats en mémoire
+    serves_queries = False
+
+    @abc.abstractmethod
+    async def add(self, order: OrderIn) -> None:
+        """Enregistre une commande (remplace une commande de même ID)."""
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        """Enregistre plusieurs commandes."""
+        for order in orders:
+            await self.add(order)
+
+    def check(self, order: OrderIn) -> None:
+        """
+        Lève OrderNotStorableException si le dépôt ne peut pas stocker la
+        commande (limites propres au stockage ; aucune par défaut).
+        """
+
+    @abc.abstractmethod
+    async def get(self, order_id: str) -> Optional[OrderIn]:
+        """Retourne la commande ou None si elle n'existe pas."""
+
+    async def get_many(self, order_ids: Iterable[str]) -> dict[str, OrderIn]:
+        """Retourne les commandes trouvées, indexées par orderId."""
+        found = {}
+        for order_id in order_ids:
+            order = await self.get(order_id)
+            if order is not None:
+                found[order_id] = order
+        return found
+
+    @abc.abstractmethod
+    def scan(self, batch_size: int = 1000) -> AsyncIterator[list[OrderIn]]:
+        """Parcourt toutes les commandes par lots de batch_size."""
+
+    @abc.abstractmethod
+    async def count(self) -> int:
+        """Retourne le nombre de commandes stockées."""
+
+    async def change_position(self) -> Optional[int]:
+        """
+        Position courante du flux de modifications, pour un dépôt partagé
+        entre processus ; None si le dépôt n'est écrit que par ce processus.
+        """
+        return None
+
+    async def changes_since(
+        self, position: int
+    ) -> Optional[tuple[list[OrderIn], int]]:
+        """
+        Commandes écrites depuis position et nouvelle position, ou None si
+        position n'est plus disponible (reconstruction complète requise).
+        Le dépôt peut n'en rendre qu'une partie : l'appelant rappelle
+        tant que la position avance.
+        """
+        raise NotImplementedError
+
+    async def query(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        after: Optional[IndexKey] = None,
+        limit: int = 100,
+    ) -> tuple[list[OrderIn], Optional[IndexKey]]:
+        """
+        Page de commandes triées par (createdAt, orderId) et clé de reprise,
+        mêmes filtres que OrderIndex.query ; requis si serves_queries.
+        """
+        raise NotImplementedError
+
+    async def rollups(
+        self,
+        start: float,
+        end: float,
+        currency: Optional[str] = None,
+        granularity: Optional[str] = None,
+    ) -> SalesRollup:
+        """
+        Seaux d'agrégats couvrant [start, end) (et la série de granularity),
+        lus dans le stockage ; requis si serves_queries.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Libère les ressources du dépôt."""
+
+
+class InMemoryOrderRepository(OrderRepository):
+    """
+    Dépôt volatil basé sur un dictionnaire, propre à chaque processus.
+    Les commandes y sont conservées sous forme d'OrderRecord compacts.
+    """
+
+    def __init__(self):
+        self.orders: dict[str, OrderRecord] = {}
+
+    async def add(self, order: OrderIn) -> None:
+        self.orders[order.orderId] = OrderRecord.from_order(order)
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        from_order = OrderRecord.from_order
+        self.orders.update(
+            (order.orderId, from_order(order)) for order in orders
+        )
+
+    async def get(self, order_id: str) -> Optional[OrderIn]:
+        return self.orders.get(order_id)
+
+    async def get_many(self, order_ids: Iterable[str]) -> dict[str, OrderIn]:
+        orders = self.orders
+        return {oid: orders[oid] for oid in order_ids if oid in orders}
+
+    async def scan(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[list[OrderIn]]:
+        values = list(self.orders.values())
+        for start in range(0, len(values), batch_size):
+            yield values[start : start + batch_size]
+
+    async def count(self) -> int:
+        return len(self.orders)
+
+
+class SQLiteOrderRepository(OrderRepository):
+    """
+    Dépôt SQLite embarqué en mode WAL.
+
+    Les écritures passent par un unique thread écrivain qui possède sa
+    propre connexion ; les appels concurrents à add() sont regroupés en
+    transactions courtes (au plus batch_size lignes). Les lectures utilisent
+    une connexion par thread lecteur, ce que le mode WAL autorise en
+    parallèle des écritures. Les requêtes SQL sont des constantes afin de
+    profiter du cache de requêtes préparées de sqlite3.
+    """
+
+    _CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS orders ("
+        "order_id TEXT PRIMARY KEY, "
+        "created_at TEXT NOT NULL, "
+        "total_amount REAL NOT NULL, "
+        "currency TEXT NOT NULL)"
+    )
+    _UPSERT = (
+        "INSERT OR REPLACE INTO orders "
+        "(order_id, created_at, total_amount, currency) VALUES (?, ?, ?, ?)"
+    )
+    _SELECT_ONE = (
+        "SELECT order_id, created_at, total_amount, currency "
+        "FROM orders WHERE order_id = ?"
+    )
+    _COUNT = "SELECT COUNT(*) FROM orders"
+    _SCAN = (
+        "SELECT order_id, created_at, total_amount, currency "
+        "FROM orders WHERE order_id > ? ORDER BY order_id LIMIT ?"
+    )
+    # Taille maximale d'une clause IN (limite de variables SQLite)
+    _MAX_IN_PARAMS = 500
+
+    def __init__(
+        self,
+        path: str = ORDER_STORE_PATH,
+        batch_size: int = 256,
+        read_workers: int = 4,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="orders-sqlite-writer"
+        )
+        self._readers = ThreadPoolExecutor(
+            max_workers=read_workers, thread_name_prefix="orders-sqlite-reader"
+        )
+        self._connections = []
+        self._pending = []
+        self._flush_task = None
+
+        # Création du schéma et activation du WAL depuis le thread écrivain
+        self._writer.submit(self._connection).result()
+        logger.info("SQLite order repository initialized", path=path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion SQLite propre au thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(self._CREATE_TABLE)
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _to_row(order: OrderIn) -> tuple:
+        return (
+            order.orderId,
+            order.createdAt.isoformat(),
+            order.totalAmount,
+            order.currency,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> OrderIn:
+        # Données issues de notre propre stockage : pas de re-validation
+        return OrderIn.model_construct(
+            orderId=row[0],
+            createdAt=datetime.fromisoformat(row[1]),
+            totalAmount=row[2],
+            currency=row[3],
+        )
+
+    def _write_rows(self, rows: list) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(self._UPSERT, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    async def _flush(self) -> None:
+        """Vide la file d'écritures par lots, une transaction par lot."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            rows = [row for row, _ in batch]
+            try:
+                await loop.run_in_executor(
+                    self._writer, self._write_rows, rows
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush()
+            )
+
+    async def add(self, order: OrderIn) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((self._to_row(order), future))
+        self._schedule_flush()
+        await future
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        rows = [self._to_row(order) for order in orders]
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start : start + self.batch_size]
+            await loop.run_in_executor(self._writer, self._write_rows, chunk)
+
+    def _select_one(self, order_id: str) -> Optional[tuple]:
+        return (
+            self._connection()
+            .execute(self._SELECT_ONE, (order_id,))
+            .fetchone()
+        )
+
+    async def get(self, order_id: str) -> Optional[OrderIn]:
+        row = await asyncio.get_running_loop().run_in_executor(
+            self._readers, self._select_one, order_id
+        )
+        return self._from_row(row) if row else None
+
+    def _select_many(self, order_ids: list[str]) -> list[tuple]:
+        placeholders = ", ".join("?" * len(order_ids))
+        sql = (
+            "SELECT order_id, created_at, total_amount, currency "
+            f"FROM orders WHERE order_id IN ({placeholders})"
+        )
+        return self._connection().execute(sql, order_ids).fetchall()
+
+    async def get_many(self, order_ids: Iterable[str]) -> dict[str, OrderIn]:
+        ids = list(dict.fromkeys(order_ids))
+        loop = asyncio.get_running_loop()
+        found = {}
+        for start in range(0, len(ids), self._MAX_IN_PARAMS):
+            rows = await loop.run_in_executor(
+                self._readers,
+                self._select_many,
+                ids[start : start + self._MAX_IN_PARAMS],
+            )
+            for row in rows:
+                found[row[0]] = self._from_row(row)
+        return found
+
+    def _scan_page(self, after: str, batch_size: int) -> list[tuple]:
+        return (
+            self._connection()
+            .execute(self._SCAN, (after, batch_size))
+            .fetchall()
+        )
+
+    async def scan(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[list[OrderIn]]:
+        # Pagination par clé : mémoire bornée quel que soit le volume
+        loop = asyncio.get_running_loop()
+        after = ""
+        while True:
+            rows = await loop.run_in_executor(
+                self._readers, self._scan_page, after, batch_size
+            )
+            if not rows:
+                return
+            after = rows[-1][0]
+            yield [self._from_row(row) for row in rows]
+
+    def _count(self) -> int:
+        return self._connection().execute(self._COUNT).fetchone()[0]
+
+    async def count(self) -> int:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, self._count
+        )
+
+    async def close(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+
+def create_order_repository() -> OrderRepository:
+    """Construit le dépôt configuré via la variable ORDER_STORE."""
+    if ORDER_STORE == "sqlite":
+        return SQLiteOrderRepository(ORDER_STORE_PATH)
+    if ORDER_STORE == "dynamodb":
+        from .dynamodb import DynamoDBOrderRepository
+
+        return DynamoDBOrderRepository()
+    if ORDER_STORE == "journal":
+        from poshub_api.metrics import register_metrics
+
+        from .journal import JournaledOrderRepository
+
+        repository = JournaledOrderRepository(
+            ORDER_JOURNAL_DIR, snapshot_every=ORDER_SNAPSHOT_EVERY
+        )
+        register_metrics("order_journal", repository.stats)
+        return repository
+    if ORDER_STORE == "shared":
+        from poshub_api.metrics import register_metrics
+
+        from .shared import SharedMemoryOrderRepository
+
+        repository = SharedMemoryOrderRepository(
+            ORDER_SHARED_PATH, capacity=ORDER_SHARED_CAPACITY
+        )
+        register_metrics("order_shared", repository.stats)
+        return repository
+    if ORDER_STORE == "tiered":
+        from poshub_api.metrics import register_metrics
+
+        from .service import TRACKED_ORDER_SIZE
+        from .tiered import TieredOrderRepository
+
+        # Les index de OrderService gardent chaque commande, même évincée :
+        # leur empreinte compte dans le budget
+        repository = TieredOrderRepository(
+            ORDER_COLD_DIR,
+            memory_budget=ORDER_MEMORY_BUDGET_MB * 2**20,
+            hot_ttl=ORDER_HOT_TTL_SECONDS,
+            order_overhead=TRACKED_ORDER_SIZE,
+        )
+        register_metrics("order_tiers", repository.stats)
+        return repository
+    return InMemoryOrderRepository()
@@ -0,0 +1,200 @@
+"""
+Agrégats de ventes pré-calculés pour les tableaux de bord POS.
+
+Chaque commande met à jour trois seaux (minute, heure, jour) pour sa
+devise : nombre, somme, minimum et maximum de totalAmount, en unités
+mineures entières pour que les sommes restent exactes. Une fenêtre
+arbitraire est couverte par les seaux les plus grossiers qui y tiennent
+entièrement ; le coût d'une requête dépend donc du nombre de seaux et non
+du nombre de commandes. Les bornes des fenêtres sont tronquées à la minute.
+"""
+
+from typing import Callable, Iterable, Iterator, Optional
+
+from .money import from_minor
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+GRANULARITIES = {"minute": MINUTE, "hour": HOUR, "day": DAY}
+
+# Nombre maximal de seaux renvoyés par une série
+MAX_SERIES_BUCKETS = 10_000
+
+
+class RollupBucket:
+    """
+    Agrégat (nombre, somme, min, max) d'un intervalle de temps, en unités
+    mineures de la devise.
+    """
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, amount: int) -> None:
+        self.count += 1
+        self.total += amount
+        if amount < self.minimum:
+            self.minimum = amount
+        if amount > self.maximum:
+            self.maximum = amount
+
+    def merge(self, other: "RollupBucket") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def as_dict(self, currency: str) -> dict:
+        total = from_minor(self.total, currency)
+        return {
+            "count": self.count,
+            "total": total,
+            "min": from_minor(self.minimum, currency),
+            "max": from_minor(self.maximum, currency),
+            "average": total / self.count,
+        }
+
+
+def cover(start: int, end: int) -> Iterator[tuple[int, int]]:
+    """
+    Découpe [start, end) en seaux alignés (taille, début), du plus grossier
+    possible : au plus 59 minutes et 23 heures de chaque côté, plus un seau
+    par jour complet.
+    """
+    t = start - start % MINUTE
+    end -= end % MINUTE
+    while t < end:
+        for size in (DAY, HOUR, MINUTE):
+            if t % size == 0 and t + size <= end:
+                yield size, t
+                t += size
+                break
+
+
+def series_range(
+    start: float, end: float, granularity: str
+) -> tuple[int, int]:
+    """
+    Taille et premier début des seaux d'une série sur [start, end) ;
+    ValueError au-delà de MAX_SERIES_BUCKETS seaux.
+    """
+    size = GRANULARITIES[granularity]
+    first = int(start) - int(start) % size
+    if (int(end) - first) // size > MAX_SERIES_BUCKETS:
+        raise ValueError(
+            f"Window too large for granularity '{granularity}' "
+            f"(max {MAX_SERIES_BUCKETS} buckets)"
+        )
+    return size, first
+
+
+class SalesRollup:
+    """Seaux d'agrégats par granularité, devise et début d'intervalle."""
+
+    def __init__(self):
+        # taille -> devise -> début -> seau
+        self._buckets: dict[int, dict[str, dict[int, RollupBucket]]] = {
+            size: {} for size in GRANULARITIES.values()
+        }
+
+    def add(self, currency: str, epoch: float, amount: int) -> None:
+        second = int(epoch)
+        for size, by_currency in self._buckets.items():
+            buckets = by_currency.setdefault(currency, {})
+            start = second - second % size
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = RollupBucket()
+            bucket.add(amount)
+
+    def put(
+        self, size: int, currency: str, start: int, bucket: RollupBucket
+    ) -> None:
+        """Place un seau calculé ailleurs (agrégats stockés en table)."""
+        for by_currency in self._buckets.values():
+            by_currency.setdefault(currency, {})
+        self._buckets[size][currency][start] = bucket
+
+    def remove(
+        self,
+        currency: str,
+        epoch: float,
+        amount: int,
+        minute_amounts: Callable[[int, int], Iterable[int]],
+    ) -> None:
+        """
+        Retire une commande remplacée. Le min/max de sa minute est recalculé
+        à partir des montants restants (minute_amounts(début, fin)), puis
+        l'heure et le jour sont reconstruits depuis les seaux plus fins.
+        """
+        second = int(epoch)
+        minute_start = second - second % MINUTE
+        minute = self._buckets[MINUTE][currency][minute_start]
+        minute.count -= 1
+        minute.total -= amount
+        rebuilt = RollupBucket()
+        for remaining in minute_amounts(minute_start, minute_start + MINUTE):
+            rebuilt.add(remaining)
+        minute.minimum, minute.maximum = rebuilt.minimum, rebuilt.maximum
+
+        for size, finer in ((HOUR, MINUTE), (DAY, HOUR)):
+            start = second - second % size
+            merged = RollupBucket()
+            finer_buckets = self._buckets[finer][currency]
+            for sub_start in range(start, start + size, finer):
+                sub = finer_buckets.get(sub_start)
+                if sub is not None and sub.count:
+                    merged.merge(sub)
+            self._buckets[size][currency][start] = merged
+
+        for size, by_currency in self._buckets.items():
+            buckets = by_currency[currency]
+            start = second - second % size
+            if not buckets[start].count:
+                del buckets[start]
+
+    def _currencies(self, currency: Optional[str]) -> list[str]:
+        if currency is not None:
+            return [currency] if currency in self._buckets[DAY] else []
+        return list(self._buckets[DAY])
+
+    def totals(
+        self, start: float, end: float, currency: Optional[str] = None
+    ) -> dict[str, RollupBucket]:
+        """Agrégats par devise sur la fenêtre [start, end)."""
+        result = {}
+        for code in self._currencies(currency):
+            merged = RollupBucket()
+            for size, bucket_start in cover(int(start), int(end)):
+                bucket = self._buckets[size][code].get(bucket_start)
+                if bucket is not None:
+                    merged.merge(bucket)
+            if merged.count:
+                result[code] = merged
+        return result
+
+    def series(
+        self,
+        start: float,
+        end: float,
+        granularity: str,
+        currency: Optional[str] = None,
+    ) -> list[tuple[int, str, RollupBucket]]:
+        """Seaux (début, devise, agrégat) non vides d'une granularité."""
+        size, first = series_range(start, end, granularity)
+        result = []
+        for code in self._currencies(currency):
+            buckets = self._buckets[size][code]
+            for bucket_start in range(first, int(end), size):
+                bucket = buckets.get(bucket_start)
+                if bucket is not None:
+                    result.append((bucket_start, code, bucket))
+        result.sort(key=lambda item: (item[0], item[1]))
+        return result
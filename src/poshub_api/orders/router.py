@@ -1,58 +1,588 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
 from poshub_api.auth import User, require_orders_read, require_orders_write
 from poshub_api.logging_config import get_logger
+from poshub_api.metrics import register_metrics
 
-from .schemas import OrderIn, OrderOut
+from .bodies import OrderBody, OrderBodyCache, etag_matches
+from .columns import parse_percentiles
+from .exceptions import (
+    InvalidCursorException,
+    OrderNotStorableException,
+    OrderStoreFullException,
+)
+from .export import MEDIA_TYPES, encode_pages, gzip_stream
+from .idempotency import (
+    IdempotencyContext,
+    check_idempotency_key,
+    claim_idempotency_key,
+    idempotency_cache,
+    replayed_headers,
+)
+from .ingest import (
+    NDJSON_MEDIA_TYPES,
+    BatchFormatError,
+    IngestReportResponse,
+    format_errors,
+    iter_json_array_items,
+    iter_msgpack_items,
+    iter_ndjson_lines,
+    peek_records,
+    validate_record,
+)
+from .negotiation import (
+    MSGPACK_MEDIA_TYPE,
+    NegotiatedRoute,
+    accepts_msgpack,
+    is_msgpack,
+    msgpack,
+    msgpack_etag,
+    msgpack_response,
+    order_map,
+    order_maps,
+    packb,
+)
+from .projection import OrderProjection, parse_fields
+from .repository import create_order_repository
+from .schemas import (
+    OrderIn,
+    OrderLookup,
+    OrderLookupRequest,
+    OrderOut,
+    OrderPage,
+    OrderStats,
+)
 from .service import OrderService
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(
+    prefix="/orders", tags=["orders"], route_class=NegotiatedRoute
+)
 logger = get_logger(__name__)
-order_service = OrderService()
+order_body_cache = OrderBodyCache()
+order_service = OrderService(
+    create_order_repository(), body_cache=order_body_cache
+)
+register_metrics("order_bodies", order_body_cache.stats)
+
+# Nombre d'enregistrements validés puis insérés ensemble par /orders/batch
+BATCH_CHUNK_SIZE = int(os.getenv("ORDERS_BATCH_CHUNK_SIZE", "500"))
+# Nombre maximal d'IDs résolus par une recherche groupée
+LOOKUP_MAX_IDS = int(os.getenv("ORDERS_LOOKUP_MAX_IDS", "500"))
+
+_BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {
+                "schema": {
+                    "type": "string",
+                    "description": "Un OrderIn par ligne",
+                }
+            },
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/OrderIn"},
+                }
+            },
+            "application/msgpack": {
+                "schema": {
+                    "type": "string",
+                    "format": "binary",
+                    "description": "Suite d'objets OrderIn MessagePack",
+                }
+            },
+        },
+    }
+}
+
+
+# Réponses négociées selon Accept (JSON ou MessagePack)
+VARY = {"Vary": "Accept"}
+
+
+def _json_response(content, headers: Optional[dict] = None) -> Response:
+    return Response(
+        content=content, media_type="application/json", headers=headers
+    )
+
+
+def _wants_msgpack(request: Request) -> bool:
+    return accepts_msgpack(request.headers.get("accept"))
+
+
+def _order_etag(order: OrderBody, binary: bool) -> str:
+    return msgpack_etag(order.etag) if binary else order.etag
+
+
+def _order_response(order: OrderBody, binary: bool) -> Response:
+    """Commande déjà sérialisée : response_model n'est pas ré-appliqué."""
+    headers = {"ETag": _order_etag(order, binary), **VARY}
+    if binary:
+        return msgpack_response(order_map(order.order), headers)
+    return _json_response(order.body, headers)
 
 
 @router.post("/", response_model=OrderOut)
 async def create_order(
-    order: OrderIn, current_user: User = Depends(require_orders_write)
+    order: OrderIn,
+    request: Request,
+    current_user: User = Depends(require_orders_write),
+    idempotency: Optional[IdempotencyContext] = Depends(check_idempotency_key),
 ):
     """
-    Crée une commande en mémoire.
+    Crée une commande en mémoire, depuis un corps JSON ou MessagePack.
+    La réponse reprend le JSON sérialisé à l'écriture, sans re-valider la
+    commande en OrderOut (MessagePack si Accept le demande).
+    Avec un en-tête Idempotency-Key, une nouvelle tentative rejoue la
+    réponse d'origine à l'identique.
     Requiert le scope: orders:write
     """
     logger.info(
-        "Creating new order", order_id=order.id, username=current_user.username
+        "Creating new order",
+        order_id=order.orderId,
+        username=current_user.username,
     )
+    # Corps validé : la clé n'est réservée qu'à partir d'ici
+    claim_idempotency_key(idempotency)
+    completed = False
     try:
         result = await order_service.create_order(order)
         logger.info(
             "Order created successfully",
-            order_id=order.id,
+            order_id=order.orderId,
             username=current_user.username,
         )
-        return result
+        response = _order_response(
+            order_service.order_bodies([result])[0], _wants_msgpack(request)
+        )
+        if idempotency is not None:
+            idempotency_cache.complete(
+                idempotency.key,
+                idempotency.fingerprint,
+                response.status_code,
+                response.body,
+                response.media_type,
+                replayed_headers(response),
+            )
+        completed = True
+        return response
+    except OrderStoreFullException as e:
+        logger.error(
+            "Order store full",
+            order_id=order.orderId,
+            username=current_user.username,
+            error=str(e),
+        )
+        raise HTTPException(status_code=507, detail="Order store is full")
+    except OrderNotStorableException as e:
+        # Limite du dépôt actif (ex. cases de taille fixe du dépôt partagé)
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(
             "Failed to create order",
-            order_id=order.id,
+            order_id=order.orderId,
             username=current_user.username,
             error=str(e),
         )
         raise
+    finally:
+        # Échec ou annulation (CancelledError) : la clé est libérée
+        if idempotency is not None and not completed:
+            idempotency_cache.release(idempotency.key)
+
+
+def _report_line(entry: dict) -> bytes:
+    return json.dumps(entry).encode() + b"\n"
+
+
+async def _flush_chunk(chunk: list, username: str):
+    """
+    Insère les commandes valides du lot et produit le rapport par ligne.
+    Si le dépôt est plein en cours de lot, les commandes déjà enregistrées
+    restent « created » et seules les suivantes sont en erreur.
+    """
+    orders = [item for _, item in chunk if isinstance(item, OrderIn)]
+    stored, failure = len(orders), None
+    try:
+        if orders:
+            await order_service.create_orders(orders)
+    except Exception as e:
+        logger.error(
+            "Failed to store order batch chunk",
+            username=username,
+            size=len(orders),
+            error=str(e),
+        )
+        stored = e.stored if isinstance(e, OrderStoreFullException) else 0
+        failure = str(e)
+
+    position = 0
+    for line_no, item in chunk:
+        if isinstance(item, OrderIn):
+            if position < stored:
+                entry = {
+                    "line": line_no,
+                    "orderId": item.orderId,
+                    "status": "created",
+                }
+            else:
+                entry = {
+                    "line": line_no,
+                    "orderId": item.orderId,
+                    "status": "error",
+                    "error": failure,
+                }
+            position += 1
+        else:
+            entry = {"line": line_no, "status": "rejected", "errors": item}
+        yield entry
+
+
+async def _ingest_batch(records, username: str, encode=_report_line):
+    """Valide et insère les enregistrements par lots de BATCH_CHUNK_SIZE."""
+    counts = {"created": 0, "rejected": 0, "error": 0}
+    chunk = []
+
+    async def flush():
+        async for entry in _flush_chunk(chunk, username):
+            counts[entry["status"]] += 1
+            yield encode(entry)
+        chunk.clear()
+
+    try:
+        async for line_no, raw in records:
+            try:
+                order = validate_record(raw)
+                order_service.check_order(order)
+                chunk.append((line_no, order))
+            except ValidationError as e:
+                chunk.append((line_no, format_errors(e)))
+            except OrderNotStorableException as e:
+                chunk.append(
+                    (line_no, [{"loc": [], "msg": str(e), "type": "store"}])
+                )
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                async for line in flush():
+                    yield line
+    except BatchFormatError as e:
+        async for line in flush():
+            yield line
+        counts["error"] += 1
+        yield encode({"status": "error", "error": str(e)})
+    else:
+        async for line in flush():
+            yield line
+
+    logger.info("Order batch ingested", username=username, **counts)
+    yield encode({"summary": counts})
+
+
+@router.post("/batch", openapi_extra=_BATCH_OPENAPI)
+async def create_orders_batch(
+    request: Request, current_user: User = Depends(require_orders_write)
+):
+    """
+    Crée des commandes en masse depuis un corps NDJSON, un tableau JSON ou
+    une suite d'objets MessagePack.
+    Le corps est lu en flux ; la réponse est un rapport NDJSON par ligne
+    (MessagePack si Accept le demande) suivi d'une ligne de synthèse.
+    Un corps illisible dès le premier enregistrement est refusé (400) ;
+    plus loin, l'erreur termine le rapport.
+    Requiert le scope: orders:write
+    """
+    content_type = request.headers.get("content-type", "")
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        records = iter_ndjson_lines(request.stream())
+    elif media_type == "application/json":
+        records = iter_json_array_items(request.stream())
+    elif is_msgpack(media_type) and msgpack is not None:
+        records = iter_msgpack_items(request.stream())
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Expected application/x-ndjson, application/json "
+            "or application/msgpack",
+        )
+    try:
+        records = await peek_records(records)
+    except BatchFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        "Order batch ingestion started",
+        username=current_user.username,
+        content_type=media_type,
+    )
+    if _wants_msgpack(request):
+        return IngestReportResponse(
+            _ingest_batch(records, current_user.username, packb),
+            media_type=MSGPACK_MEDIA_TYPE,
+        )
+    return IngestReportResponse(_ingest_batch(records, current_user.username))
+
+
+def order_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Champs à renvoyer, séparés par des virgules "
+        "(ex. orderId,totalAmount)",
+    ),
+) -> Optional[OrderProjection]:
+    """Projection demandée via ?fields=, ou None pour tous les champs."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _items_json(orders: list, fields: Optional[OrderProjection]) -> bytes:
+    """Tableau JSON des commandes, projetées ou depuis le cache de JSON."""
+    if fields is not None:
+        return fields.json_array(orders).encode()
+    bodies = order_service.order_bodies(orders)
+    return b"[" + b",".join(entry.body for entry in bodies) + b"]"
+
+
+def _items_response(
+    request: Request,
+    orders: list,
+    fields: Optional[OrderProjection],
+    **extra,
+) -> Response:
+    """Liste de commandes (items) suivie des champs de extra."""
+    if _wants_msgpack(request):
+        return msgpack_response(
+            {"items": order_maps(orders, fields), **extra}, VARY
+        )
+    body = b'{"items":' + _items_json(orders, fields)
+    for key, value in extra.items():
+        body += f',"{key}":{json.dumps(value)}'.encode()
+    return _json_response(body + b"}", VARY)
+
+
+async def _lookup(
+    request: Request,
+    order_ids: list[str],
+    username: str,
+    fields: Optional[OrderProjection],
+) -> Response:
+    """Résout une liste d'IDs en un seul passage par OrderService."""
+    if len(order_ids) > LOOKUP_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many ids (max {LOOKUP_MAX_IDS})",
+        )
+    orders, missing = await order_service.get_orders(order_ids)
+    logger.info(
+        "Orders looked up",
+        username=username,
+        found=len(orders),
+        missing=len(missing),
+    )
+    return _items_response(request, orders, fields, missing=missing)
+
+
+@router.post("/lookup", response_model=OrderLookup)
+async def lookup_orders(
+    lookup: OrderLookupRequest,
+    request: Request,
+    fields: Optional[OrderProjection] = Depends(order_fields),
+    current_user: User = Depends(require_orders_read),
+):
+    """
+    Récupère plusieurs commandes par leurs IDs en une requête.
+    Les IDs inconnus sont listés dans missing.
+    Requiert le scope: orders:read
+    """
+    return await _lookup(request, lookup.ids, current_user.username, fields)
+
+
+@router.get("/", response_model=Union[OrderPage, OrderLookup])
+async def list_orders(
+    request: Request,
+    ids: Optional[list[str]] = Query(
+        None,
+        description="IDs à résoudre (répétés ou séparés par des virgules) ; "
+        "retourne alors items et missing au lieu d'une page",
+    ),
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    currency: Optional[str] = None,
+    min_amount: Optional[float] = Query(None, alias="minAmount"),
+    max_amount: Optional[float] = Query(None, alias="maxAmount"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[OrderProjection] = Depends(order_fields),
+    current_user: User = Depends(require_orders_read),
+):
+    """
+    Liste les commandes triées par createdAt, page par page.
+    createdFrom est inclusif, createdTo exclusif ; passer nextCursor
+    dans cursor pour obtenir la page suivante. Avec un filtre de montant
+    sélectif, une page peut être incomplète (voire vide) et porter un
+    nextCursor : le parcours de l'index est borné par appel.
+    Avec ids, recherche groupée équivalente à POST /orders/lookup.
+    fields restreint les champs renvoyés pour chaque commande.
+    Requiert le scope: orders:read
+    """
+    if ids is not None:
+        order_ids = [oid for value in ids for oid in value.split(",") if oid]
+        return await _lookup(request, order_ids, current_user.username, fields)
+    try:
+        orders, next_cursor = await order_service.list_orders(
+            created_from=created_from,
+            created_to=created_to,
+            currency=currency,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        "Orders listed",
+        username=current_user.username,
+        count=len(orders),
+        has_more=next_cursor is not None,
+    )
+    return _items_response(request, orders, fields, nextCursor=next_cursor)
+
+
+@router.get("/stats", response_model=OrderStats)
+async def get_order_stats(
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    currency: Optional[str] = None,
+    granularity: Optional[Literal["minute", "hour", "day"]] = None,
+    percentiles: Optional[str] = Query(
+        None,
+        description="Percentiles des montants à calculer, séparés par des "
+        "virgules (ex. 50,90,99)",
+    ),
+    current_user: User = Depends(require_orders_read),
+):
+    """
+    Chiffre d'affaires par devise sur une fenêtre (24 dernières heures par
+    défaut), avec une série par minute, heure ou jour si granularity est
+    fourni et les percentiles des montants si percentiles est fourni.
+    Les bornes sont tronquées à la minute.
+    Requiert le scope: orders:read
+    """
+    created_to = created_to or datetime.now(timezone.utc)
+    created_from = created_from or created_to - timedelta(days=1)
+    try:
+        stats = await order_service.order_stats(
+            created_from,
+            created_to,
+            currency,
+            granularity,
+            parse_percentiles(percentiles),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        "Order stats computed",
+        username=current_user.username,
+        currencies=len(stats["totals"]),
+        buckets=len(stats["buckets"]),
+    )
+    return stats
+
+
+async def _export_pages(request: Request, pages, username: str):
+    """Relaie les pages en s'arrêtant si le client se déconnecte."""
+    exported = 0
+    async for page in pages:
+        if await request.is_disconnected():
+            logger.warning(
+                "Order export cancelled by client",
+                username=username,
+                exported=exported,
+            )
+            return
+        exported += len(page)
+        yield page
+    logger.info("Order export completed", username=username, exported=exported)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_orders(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    created_from: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(None, alias="createdTo"),
+    currency: Optional[str] = None,
+    fields: Optional[OrderProjection] = Depends(order_fields),
+    current_user: User = Depends(require_orders_read),
+):
+    """
+    Exporte les commandes en flux NDJSON ou CSV, triées par createdAt,
+    éventuellement compressées en gzip à la volée ; fields restreint les
+    colonnes exportées.
+    Requiert le scope: orders:read
+    """
+    logger.info(
+        "Order export started",
+        username=current_user.username,
+        format=export_format,
+        gzip=gzip,
+    )
+    pages = order_service.iter_orders(
+        created_from=created_from, created_to=created_to, currency=currency
+    )
+    body = encode_pages(
+        _export_pages(request, pages, current_user.username),
+        export_format,
+        fields,
+    )
+    filename = f"orders.{export_format}"
+    headers = {}
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        filename += ".gz"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        body, media_type=MEDIA_TYPES[export_format], headers=headers
+    )
 
 
 @router.get("/{order_id}", response_model=OrderOut)
 async def get_order(
-    order_id: str, current_user: User = Depends(require_orders_read)
+    order_id: str,
+    request: Request,
+    fields: Optional[OrderProjection] = Depends(order_fields),
+    current_user: User = Depends(require_orders_read),
 ):
     """
     Récupère une commande par son ID ou retourne 404.
+    Le JSON est servi depuis le cache de sérialisation avec un ETag
+    (MessagePack si Accept le demande) ; If-None-Match correspondant
+    retourne 304.
+    Avec fields, seuls les champs demandés sont renvoyés.
     Requiert le scope: orders:read
     """
     logger.info(
         "Fetching order", order_id=order_id, username=current_user.username
     )
     try:
-        order = await order_service.get_order(order_id)
+        if fields is None:
+            order = await order_service.get_order_body(order_id)
+        else:
+            order = await order_service.get_order(order_id)
         if not order:
             logger.warning(
                 "Order not found",
@@ -65,7 +595,15 @@ async def get_order(
             order_id=order_id,
             username=current_user.username,
         )
-        return order
+        binary = _wants_msgpack(request)
+        if fields is not None:
+            if binary:
+                return msgpack_response(order_map(order, fields), VARY)
+            return _json_response(fields.to_json(order), VARY)
+        etag = _order_etag(order, binary)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, **VARY})
+        return _order_response(order, binary)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from .money import is_exact_minor, minor_units
 
 
 class OrderIn(BaseModel):
@@ -9,9 +12,57 @@ class OrderIn(BaseModel):
     totalAmount: float = Field(..., gt=0, title="Totalamount")
     currency: str = Field(..., title="Currency")
 
+    @model_validator(mode="after")
+    def _check_minor_units(self) -> "OrderIn":
+        # Stocké en unités mineures : un montant plus précis serait arrondi
+        if not is_exact_minor(self.totalAmount, self.currency):
+            raise ValueError(
+                f"totalAmount has more decimals than {self.currency} "
+                f"allows ({minor_units(self.currency)})"
+            )
+        return self
+
 
 class OrderOut(BaseModel):
     orderId: str = Field(..., title="Order ID")
     createdAt: datetime = Field(..., title="Created At")
     totalAmount: float = Field(..., title="Total Amount")
     currency: str = Field(..., title="Currency")
+
+
+class OrderPage(BaseModel):
+    items: list[OrderOut] = Field(..., title="Items")
+    nextCursor: Optional[str] = Field(None, title="Next Cursor")
+
+
+class OrderLookupRequest(BaseModel):
+    ids: list[str] = Field(..., title="Order IDs")
+
+
+class OrderLookup(BaseModel):
+    items: list[OrderOut] = Field(..., title="Items")
+    missing: list[str] = Field(..., title="Missing")
+
+
+class RollupStats(BaseModel):
+    count: int = Field(..., title="Count")
+    total: float = Field(..., title="Total")
+    min: float = Field(..., title="Min")
+    max: float = Field(..., title="Max")
+    average: float = Field(..., title="Average")
+
+
+class StatsBucket(RollupStats):
+    start: datetime = Field(..., title="Start")
+    currency: str = Field(..., title="Currency")
+
+
+class OrderStats(BaseModel):
+    createdFrom: datetime = Field(..., title="Created From")
+    createdTo: datetime = Field(..., title="Created To")
+    granularity: Optional[str] = Field(None, title="Granularity")
+    percentiles: Optional[dict[str, dict[str, float]]] = Field(
+        None, title="Percentiles"
+    )
+    totals: dict[str, RollupStats] = Field(..., title="Totals")
+    buckets: list[StatsBucket] = Field(..., title="Buckets")
@@ -1,13 +1,381 @@
-from .schemas import OrderIn, OrderOut
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import AsyncIterator, Iterable, Optional, Sequence
+
+from .bodies import OrderBody, OrderBodyCache, encode_order
+from .columns import AmountColumns
+from .exceptions import OrderStoreFullException
+from .indexes import (
+    OrderIndex,
+    decode_cursor,
+    encode_cursor,
+    order_epoch,
+    to_epoch,
+)
+from .money import to_minor
+from .records import OrderRecord, order_minor
+from .repository import InMemoryOrderRepository, OrderRepository
+from .rollups import SalesRollup
+from .schemas import OrderIn
+
+# Empreinte mesurée par commande des index, agrégats et colonnes de
+# montants (hors orderId, partagé avec le dépôt)
+TRACKED_ORDER_SIZE = 560
 
 
 class OrderService:
-    def __init__(self):
-        self.orders = {}
+    """
+    Service des commandes : dépôt, index et agrégats en mémoire.
+
+    Les écritures au dépôt ne sont sérialisées que par orderId : une
+    écriture attend la précédente écriture en cours des mêmes IDs, si bien
+    que dépôt et index voient les versions d'une commande dans le même
+    ordre, et toutes les autres restent concurrentes (le journal peut les
+    regrouper dans un même fsync). La mise à jour des index, sans await,
+    est atomique pour la boucle d'événements : ni verrou ni partition en
+    shards n'y ajouteraient de concurrence, et les lectures n'ont qu'un
+    index à parcourir.
+
+    Avec un body_cache, le JSON de chaque commande est sérialisé une fois à
+    l'écriture et réutilisé par les lectures (get_order_body).
+
+    Si le dépôt sert lui-même les requêtes (serves_queries, ex. DynamoDB
+    partagé entre conteneurs Lambda), aucun index ni agrégat n'est tenu en
+    mémoire : listes, exports et statistiques interrogent le dépôt (seaux
+    d'agrégats stockés) ; seuls les percentiles relisent les commandes de
+    la période.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[OrderRepository] = None,
+        body_cache: Optional[OrderBodyCache] = None,
+    ):
+        self.repository = repository or InMemoryOrderRepository()
+        self.body_cache = body_cache
+        self.index = OrderIndex()
+        self.rollups = SalesRollup()
+        # Montants en colonnes, pour les agrégats vectorisés (percentiles)
+        self.columns = AmountColumns()
+        self._index_loaded = False
+        self._index_lock = asyncio.Lock()
+        # Commandes créées pendant une reconstruction des index
+        self._index_backlog = None
+        # Position dans le flux de modifications d'un dépôt partagé
+        self._position = None
+        # Dernière écriture en cours par orderId
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _track(self, order: OrderIn) -> None:
+        """Met à jour les index et les agrégats pour une commande stockée."""
+        previous = self.index.entry(order.orderId)
+        self.index.add(order)
+        if previous is not None:
+            (epoch, _), currency, amount = previous
+            self.rollups.remove(
+                currency,
+                epoch,
+                to_minor(amount, currency),
+                partial(self._minor_amounts, currency),
+            )
+        self.rollups.add(
+            order.currency, order_epoch(order), order_minor(order)
+        )
+        self.columns.add(order)
+
+    def _minor_amounts(self, currency: str, start: int, end: int) -> list:
+        return [
+            to_minor(amount, currency)
+            for amount in self.index.amounts_between(currency, start, end)
+        ]
+
+    def _reset_index(self) -> None:
+        self.index = OrderIndex()
+        self.rollups = SalesRollup()
+        self.columns.reset()
+
+    async def _ensure_index(self) -> None:
+        """
+        Reconstruit les index depuis le dépôt au premier accès en lecture
+        (liste, statistiques) : les écritures n'attendent jamais ce scan.
+        Avec un dépôt partagé entre processus, chaque accès rattrape ensuite
+        les écritures des autres workers via le flux de modifications.
+        Sans objet si le dépôt sert lui-même les requêtes.
+        """
+        if self.repository.serves_queries:
+            return
+        if self._index_loaded and self._position is None:
+            return
+        async with self._index_lock:
+            if self._index_loaded:
+                if self._position is None or await self._catch_up():
+                    return
+                # Trop en retard sur le flux partagé : on repart de zéro
+                self._reset_index()
+                self._index_loaded = False
+            self._index_backlog = []
+            # Position prise avant le scan : les écritures concurrentes
+            # seront rejouées, ce qui est sans effet sur les index
+            self._position = await self.repository.change_position()
+            async for batch in self.repository.scan():
+                for order in batch:
+                    self._track(order)
+            for order in self._index_backlog:
+                self._track(order)
+            self._index_backlog = None
+            self._index_loaded = True
+
+    async def _catch_up(self) -> bool:
+        """Applique les écritures des autres processus (dépôt partagé)."""
+        while True:
+            changes = await self.repository.changes_since(self._position)
+            if changes is None:
+                return False
+            orders, position = changes
+            for order in orders:
+                self._track(order)
+            if position == self._position:
+                return True
+            self._position = position
+            # Par lots bornés, en rendant la main entre deux lots
+            await asyncio.sleep(0)
+
+    def _record(self, orders: list[OrderIn]) -> None:
+        if self.body_cache is not None:
+            for order in orders:
+                self.body_cache.put(order)
+        if self._index_loaded:
+            for order in orders:
+                self._track(order)
+        elif self._index_backlog is not None:
+            self._index_backlog.extend(orders)
+
+    @asynccontextmanager
+    async def _ordered(self, order_ids: Iterable[str]):
+        """
+        Attend les écritures en cours des mêmes orderId. L'écriture courante
+        est inscrite avant l'attente : les suivantes l'attendront à leur
+        tour, sans interblocage possible (on n'attend que des écritures
+        inscrites plus tôt). Son achèvement attend celui des précédentes,
+        même si elle est annulée pendant l'attente : une écriture suivante
+        ne démarre jamais avant une précédente encore en cours.
+        """
+        order_ids = set(order_ids)
+        done = asyncio.get_running_loop().create_future()
+        previous = {
+            self._inflight[order_id]
+            for order_id in order_ids
+            if order_id in self._inflight
+        }
+        for order_id in order_ids:
+            self._inflight[order_id] = done
 
-    async def create_order(self, order: OrderIn) -> OrderOut:
-        self.orders[order.orderId] = order
-        return order
+        def release(_) -> None:
+            for order_id in order_ids:
+                if self._inflight.get(order_id) is done:
+                    del self._inflight[order_id]
+
+        done.add_done_callback(release)
+        try:
+            if previous:
+                # wait() n'annule pas les futures attendues si on est annulé
+                await asyncio.wait(previous)
+            yield
+        finally:
+            pending = [future for future in previous if not future.done()]
+            if pending:
+                # Annulée pendant l'attente : achevée après les précédentes
+                asyncio.gather(*pending).add_done_callback(
+                    lambda _: done.set_result(None)
+                )
+            else:
+                done.set_result(None)
+
+    def check_order(self, order: OrderIn) -> None:
+        """Vérifie que le dépôt peut stocker la commande (voir check)."""
+        self.repository.check(order)
+
+    async def create_order(self, order: OrderIn) -> OrderRecord:
+        # Forme compacte dès l'entrée : dépôt, index et agrégats partagent
+        # le même montant arrondi à l'unité mineure
+        record = OrderRecord.from_order(order)
+        async with self._ordered([record.orderId]):
+            await self.repository.add(record)
+            self._record([record])
+        return record
+
+    async def create_orders(self, orders: list[OrderIn]) -> list[OrderRecord]:
+        records = list(map(OrderRecord.from_order, orders))
+        async with self._ordered(record.orderId for record in records):
+            try:
+                await self.repository.add_many(records)
+            except OrderStoreFullException as e:
+                # Les premières commandes du lot sont déjà dans le dépôt
+                self._record(records[: e.stored])
+                raise
+            self._record(records)
+        return records
 
     async def get_order(self, order_id: str):
-        return self.orders.get(order_id)
+        return await self.repository.get(order_id)
+
+    def order_bodies(self, orders: list[OrderIn]) -> list[OrderBody]:
+        """JSON et ETag des commandes lues, depuis le cache si possible."""
+        if self.body_cache is None:
+            return list(map(encode_order, orders))
+        return list(map(self.body_cache.get, orders))
+
+    async def get_order_body(self, order_id: str) -> Optional[OrderBody]:
+        order = await self.repository.get(order_id)
+        if order is None:
+            return None
+        return self.order_bodies([order])[0]
+
+    async def get_orders(
+        self, order_ids: list[str]
+    ) -> tuple[list[OrderIn], list[str]]:
+        """
+        Résout plusieurs commandes en un seul appel au dépôt.
+        Retourne les commandes trouvées et les IDs manquants, dans l'ordre
+        de la demande et sans doublon.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        found = await self.repository.get_many(order_ids)
+        orders = [found[oid] for oid in order_ids if oid in found]
+        missing = [oid for oid in order_ids if oid not in found]
+        return orders, missing
+
+    async def order_stats(
+        self,
+        created_from: datetime,
+        created_to: datetime,
+        currency: Optional[str] = None,
+        granularity: Optional[str] = None,
+        percentiles: Sequence[float] = (),
+    ) -> dict:
+        """
+        Agrégats de ventes par devise, série optionnelle par seau et
+        percentiles des montants (calculés sur les colonnes de montants).
+        """
+        start, end = to_epoch(created_from), to_epoch(created_to)
+        await self._ensure_index()
+        if self.repository.serves_queries:
+            # Seaux stockés dans le dépôt ; les percentiles, eux, lisent
+            # les montants de la période
+            rollups = await self.repository.rollups(
+                start, end, currency, granularity
+            )
+            columns = None
+            if percentiles:
+                columns = await self._period_columns(
+                    start, created_to, currency
+                )
+        else:
+            rollups = self.rollups
+            columns = self.columns
+        totals = rollups.totals(start, end, currency)
+        buckets = []
+        if granularity is not None:
+            series = rollups.series(start, end, granularity, currency)
+            buckets = [
+                {
+                    "start": datetime.fromtimestamp(
+                        bucket_start, timezone.utc
+                    ),
+                    "currency": code,
+                    **bucket.as_dict(code),
+                }
+                for bucket_start, code, bucket in series
+            ]
+        ranks = None
+        if percentiles:
+            summary = columns.summary(start, end, currency, percentiles)
+            ranks = {
+                code: {
+                    f"p{q:g}": value for q, value in s["percentiles"].items()
+                }
+                for code, s in summary.items()
+            }
+        return {
+            "createdFrom": created_from,
+            "createdTo": created_to,
+            "granularity": granularity,
+            "percentiles": ranks,
+            "totals": {code: b.as_dict(code) for code, b in totals.items()},
+            "buckets": buckets,
+        }
+
+    async def _period_columns(
+        self, start: float, created_to: datetime, currency: Optional[str]
+    ) -> AmountColumns:
+        """
+        Colonnes éphémères des montants de la période, lus dans le dépôt
+        (depuis la minute de start : les agrégats tronquent à la minute).
+        """
+        columns = AmountColumns()
+        created_from = datetime.fromtimestamp(start - start % 60, timezone.utc)
+        async for orders in self.iter_orders(
+            created_from, created_to, currency
+        ):
+            for order in orders:
+                columns.add(order)
+        return columns
+
+    async def _page(self, limit: int, **filters):
+        """Page (commandes, clé de reprise), du dépôt ou des index."""
+        if self.repository.serves_queries:
+            return await self.repository.query(limit=limit, **filters)
+        order_ids, next_key = self.index.query(limit=limit, **filters)
+        found = await self.repository.get_many(order_ids)
+        return [found[oid] for oid in order_ids if oid in found], next_key
+
+    async def list_orders(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[OrderIn], Optional[str]]:
+        """Retourne une page de commandes triées par createdAt."""
+        await self._ensure_index()
+        orders, next_key = await self._page(
+            created_from=created_from,
+            created_to=created_to,
+            currency=currency,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit,
+        )
+        return orders, encode_cursor(next_key) if next_key else None
+
+    async def iter_orders(
+        self,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        currency: Optional[str] = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[list[OrderIn]]:
+        """
+        Parcourt les commandes par pages triées par createdAt, sans copier
+        le dépôt : chaque page repart de la dernière clé de l'index.
+        """
+        await self._ensure_index()
+        after = None
+        while True:
+            orders, after = await self._page(
+                created_from=created_from,
+                created_to=created_to,
+                currency=currency,
+                after=after,
+                limit=page_size,
+            )
+            if orders:
+                yield orders
+            if after is None:
+                return
@@ -0,0 +1,320 @@
+"""
+Dépôt de commandes partagé entre les workers d'un même hôte.
+
+Les commandes sont stockées dans un fichier projeté en mémoire (mmap),
+typiquement sous /dev/shm, que tous les workers uvicorn ouvrent :
+
+- un en-tête (capacité, nombre de commandes, numéro d'écriture)
+- une table de hachage à adressage ouvert (sondage linéaire) dont chaque
+  case est un enregistrement de taille fixe
+- un anneau des cases écrites, qui sert de flux de modifications : chaque
+  worker y rattrape les écritures des autres pour ses index locaux
+
+Le verrouillage inter-processus utilise flock sur le fichier : partagé pour
+les lectures, exclusif pour les écritures. Le verrou est demandé sans
+bloquer (LOCK_NB) : tant qu'un autre worker le tient, la coroutine cède la
+boucle d'événements et réessaie. Les sections critiques ne traversent
+jamais un await et sont bornées : une recherche par orderId prend quelques
+dizaines de microsecondes, un lot de scan ou de rattrapage (au plus
+catch_up_batch positions du flux, ~3 µs par commande décodée) quelques
+millisecondes ; seule une écriture groupée tient le verrou le temps de
+tout son lot.
+"""
+
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterable, Optional
+
+from poshub_api.logging_config import get_logger
+
+from .exceptions import OrderNotStorableException, OrderStoreFullException
+from .records import OrderRecord
+from .repository import OrderRepository
+from .schemas import OrderIn
+
+logger = get_logger(__name__)
+
+MAGIC = b"POSHUBOS"
+VERSION = 1
+
+# magic, version, capacité, taille de clé, nombre, numéro d'écriture
+HEADER = struct.Struct("<8sIIIxxxxQQ")
+HEADER_SIZE = 64
+
+KEY_SIZE = 64
+CURRENCY_SIZE = 8
+# état, longueur de clé, longueur de devise, décalage horaire,
+# microsecondes epoch, unités mineures, devise, orderId
+RECORD = struct.Struct(f"<BBBxiqq{CURRENCY_SIZE}s{KEY_SIZE}s")
+SLOT = struct.Struct("<I")
+
+EMPTY, USED = 0, 1
+# Décalage horaire réservé aux dates naïves
+NAIVE_OFFSET = -(2**31)
+MAX_LOAD_FACTOR = 0.75
+# Positions du flux de modifications décodées par prise du verrou
+CATCH_UP_BATCH = 1000
+# Attente entre deux tentatives de verrouillage, doublée jusqu'au plafond
+LOCK_RETRY_MIN = 0.0001
+LOCK_RETRY_MAX = 0.005
+
+
+class SharedStoreFullError(OrderStoreFullException):
+    """La table partagée a atteint son taux de remplissage maximal."""
+
+
+class SharedRecordTooLargeError(OrderNotStorableException):
+    """orderId ou devise plus longs que leur case (en octets UTF-8)."""
+
+
+def _table_size(capacity: int) -> int:
+    return HEADER_SIZE + capacity * (RECORD.size + SLOT.size)
+
+
+class SharedMemoryOrderRepository(OrderRepository):
+    """Table de commandes en mémoire partagée, commune aux workers."""
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 1 << 20,
+        catch_up_batch: int = CATCH_UP_BATCH,
+    ):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.path = path
+        self.catch_up_batch = catch_up_batch
+        self.lock_retries = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, _table_size(capacity))
+                os.pwrite(
+                    self._fd,
+                    HEADER.pack(MAGIC, VERSION, capacity, KEY_SIZE, 0, 0),
+                    0,
+                )
+                logger.info(
+                    "Shared order table created", path=path, capacity=capacity
+                )
+            magic, version, capacity, key_size, _, _ = HEADER.unpack(
+                os.pread(self._fd, HEADER.size, 0)
+            )
+        if magic != MAGIC or version != VERSION or key_size != KEY_SIZE:
+            os.close(self._fd)
+            raise ValueError(f"Incompatible shared order table: {path}")
+        # Capacité lue dans l'en-tête : le premier worker la fixe
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._ring = HEADER_SIZE + capacity * RECORD.size
+        self._map = mmap.mmap(self._fd, _table_size(capacity))
+
+    @contextmanager
+    def _locked(self, operation: int):
+        """Verrou bloquant, réservé à l'ouverture de la table."""
+        fcntl.flock(self._fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def _lock(self, operation: int):
+        """
+        Verrou pris sans bloquer la boucle : en cas de conflit, attente
+        croissante puis nouvel essai. Le corps ne doit contenir aucun
+        await (les coroutines du processus partagent le descripteur).
+        """
+        delay = LOCK_RETRY_MIN
+        while True:
+            try:
+                fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                self.lock_retries += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LOCK_RETRY_MAX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _header(self) -> tuple[int, int]:
+        """Nombre de commandes et numéro de la prochaine écriture."""
+        _, _, _, _, count, seq = HEADER.unpack_from(self._map, 0)
+        return count, seq
+
+    def _set_header(self, count: int, seq: int) -> None:
+        HEADER.pack_into(
+            self._map, 0, MAGIC, VERSION, self.capacity, KEY_SIZE, count, seq
+        )
+
+    def _find(self, key: bytes) -> tuple[int, bool]:
+        """Case de la clé, ou première case libre sur son sondage."""
+        mask, view = self._mask, self._map
+        slot = zlib.crc32(key) & mask
+        while True:
+            offset = HEADER_SIZE + slot * RECORD.size
+            state, key_len = view[offset], view[offset + 1]
+            if state == EMPTY:
+                return slot, False
+            start = offset + RECORD.size - KEY_SIZE
+            if key_len == len(key) and view[start : start + key_len] == key:
+                return slot, True
+            slot = (slot + 1) & mask
+
+    def _decode(self, slot: int) -> OrderRecord:
+        (_, key_len, cur_len, tz, created_us, minor, currency, key) = (
+            RECORD.unpack_from(self._map, HEADER_SIZE + slot * RECORD.size)
+        )
+        return OrderRecord(
+            key[:key_len].decode(),
+            currency[:cur_len].decode(),
+            created_us,
+            None if tz == NAIVE_OFFSET else tz,
+            minor,
+        )
+
+    @staticmethod
+    def _encode(record: OrderIn) -> tuple[bytes, bytes]:
+        key = record.orderId.encode()
+        currency = record.currency.encode()
+        if len(key) > KEY_SIZE:
+            raise SharedRecordTooLargeError(
+                f"orderId longer than {KEY_SIZE} bytes: {record.orderId}"
+            )
+        if len(currency) > CURRENCY_SIZE:
+            raise SharedRecordTooLargeError(
+                f"Unsupported currency: {record.currency}"
+            )
+        return key, currency
+
+    def check(self, order: OrderIn) -> None:
+        self._encode(order)
+
+    async def _write(self, records: list[OrderRecord]) -> None:
+        encoded = [(record, *self._encode(record)) for record in records]
+        async with self._lock(fcntl.LOCK_EX):
+            count, seq = self._header()
+            for stored, (record, key, currency) in enumerate(encoded):
+                slot, exists = self._find(key)
+                if not exists:
+                    if count + 1 > self.capacity * MAX_LOAD_FACTOR:
+                        self._set_header(count, seq)
+                        raise SharedStoreFullError(
+                            f"Shared order table full ({count} orders)",
+                            stored,
+                        )
+                    count += 1
+                tz = record.tz_offset
+                RECORD.pack_into(
+                    self._map,
+                    HEADER_SIZE + slot * RECORD.size,
+                    USED,
+                    len(key),
+                    len(currency),
+                    NAIVE_OFFSET if tz is None else tz,
+                    record.created_us,
+                    record.minor,
+                    currency,
+                    key,
+                )
+                SLOT.pack_into(
+                    self._map,
+                    self._ring + (seq & self._mask) * SLOT.size,
+                    slot,
+                )
+                seq += 1
+            self._set_header(count, seq)
+
+    async def add(self, order: OrderIn) -> None:
+        await self._write([OrderRecord.from_order(order)])
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        records = list(map(OrderRecord.from_order, orders))
+        if records:
+            await self._write(records)
+
+    async def get(self, order_id: str) -> Optional[OrderRecord]:
+        key = order_id.encode()
+        if len(key) > KEY_SIZE:
+            return None
+        async with self._lock(fcntl.LOCK_SH):
+            slot, exists = self._find(key)
+            return self._decode(slot) if exists else None
+
+    async def get_many(
+        self, order_ids: Iterable[str]
+    ) -> dict[str, OrderRecord]:
+        found = {}
+        async with self._lock(fcntl.LOCK_SH):
+            for order_id in order_ids:
+                key = order_id.encode()
+                if len(key) > KEY_SIZE:
+                    continue
+                slot, exists = self._find(key)
+                if exists:
+                    found[order_id] = self._decode(slot)
+        return found
+
+    async def scan(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[list[OrderRecord]]:
+        view = self._map
+        for start in range(0, self.capacity, batch_size):
+            async with self._lock(fcntl.LOCK_SH):
+                batch = [
+                    self._decode(slot)
+                    for slot in range(
+                        start, min(start + batch_size, self.capacity)
+                    )
+                    if view[HEADER_SIZE + slot * RECORD.size] == USED
+                ]
+            if batch:
+                yield batch
+
+    async def count(self) -> int:
+        async with self._lock(fcntl.LOCK_SH):
+            return self._header()[0]
+
+    async def change_position(self) -> Optional[int]:
+        async with self._lock(fcntl.LOCK_SH):
+            return self._header()[1]
+
+    async def changes_since(
+        self, position: int
+    ) -> Optional[tuple[list[OrderRecord], int]]:
+        async with self._lock(fcntl.LOCK_SH):
+            seq = self._header()[1]
+            if seq - position > self.capacity:
+                # L'anneau a été recouvert depuis position
+                return None
+            # Lot borné : le retard restant est rattrapé par les appels
+            # suivants, sans tenir le verrou le temps de tout décoder
+            end = min(seq, position + self.catch_up_batch)
+            slots = dict.fromkeys(
+                SLOT.unpack_from(
+                    self._map, self._ring + (p & self._mask) * SLOT.size
+                )[0]
+                for p in range(position, end)
+            )
+            return [self._decode(slot) for slot in slots], end
+
+    def stats(self) -> dict:
+        count, seq = self._header()
+        return {
+            "orders": count,
+            "capacity": self.capacity,
+            "load_factor": count / self.capacity,
+            "writes": seq,
+            "lock_retries": self.lock_retries,
+        }
+
+    async def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
@@ -0,0 +1,422 @@
+"""
+Dépôt en mémoire à budget borné, avec un niveau froid sur disque.
+
+Le niveau chaud est un dictionnaire ordonné (LRU) dont la taille estimée est
+plafonnée par memory_budget ; les commandes les moins récemment utilisées,
+ou plus anciennes que hot_ttl secondes, sont évincées vers un tampon puis
+écrites par segments compressés (zlib) dans cold_dir. Les lectures
+consultent le niveau chaud puis le niveau froid de façon transparente ;
+get() remonte une commande froide dans le niveau chaud.
+
+Le niveau froid est un débordement de la mémoire et non une persistance :
+les segments d'un processus précédent sont supprimés au démarrage.
+
+Toute commande coûte de la mémoire même évincée : son emplacement froid
+(orderId et entier empaqueté) et, via order_overhead, ce que OrderService
+garde pour elle (index, agrégats, colonnes de montants). Ces octets fixes
+comptent dans memory_budget, le niveau chaud n'a que le reste ; quand ils
+atteignent le budget, le dépôt refuse les nouvelles commandes
+(OrderStoreFullException). Le plafond réel est donc d'environ
+memory_budget / (COLD_ENTRY_OVERHEAD + orderId + order_overhead)
+commandes, soit ~190 000 pour 128 Mo, plus quelques tampons bornés : le
+tampon d'éviction (segment_size commandes) et segment_cache segments
+décompressés.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import AsyncIterator, Iterable, Optional
+
+from poshub_api.logging_config import get_logger
+
+from .exceptions import OrderStoreFullException
+from .journal import decode_order, encode_order
+from .records import OrderRecord
+from .repository import OrderRepository
+from .schemas import OrderIn
+
+logger = get_logger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".z"
+
+# Surcoût approximatif d'une entrée de dictionnaire ordonné
+ENTRY_OVERHEAD = 112
+# Entrée orderId -> emplacement froid, hors chaîne de l'orderId (mesuré)
+COLD_ENTRY_OVERHEAD = 80
+
+# Emplacement froid (segment, début, fin) empaqueté dans un seul entier :
+# bien plus compact qu'un tuple pour des centaines de milliers d'entrées
+OFFSET_BITS = 24
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+
+def estimate_size(order: OrderRecord) -> int:
+    """Estimation de l'empreinte mémoire d'une commande, en octets."""
+    # La devise et le fuseau sont partagés : seuls l'orderId et les entiers
+    # sont propres à l'enregistrement
+    return (
+        ENTRY_OVERHEAD
+        + sys.getsizeof(order)
+        + sys.getsizeof(order.orderId)
+        + sys.getsizeof(order.created_us)
+        + sys.getsizeof(order.minor)
+    )
+
+
+class TieredOrderRepository(OrderRepository):
+    """Dépôt en mémoire borné, évinçant vers des segments compressés."""
+
+    def __init__(
+        self,
+        cold_dir: str,
+        memory_budget: int = 128 * 2**20,
+        hot_ttl: float = 0.0,
+        segment_size: int = 1000,
+        segment_cache: int = 4,
+        order_overhead: int = 0,
+    ):
+        self.cold_dir = cold_dir
+        self.memory_budget = memory_budget
+        self.hot_ttl = hot_ttl
+        self.segment_size = segment_size
+        self.segment_cache = segment_cache
+        # Octets tenus hors du dépôt pour chaque commande, même froide
+        self.order_overhead = order_overhead
+        # Octets fixes réservés par les commandes connues
+        self.fixed_bytes = 0
+
+        # orderId -> (commande, taille estimée, dernier accès)
+        self.hot = OrderedDict()
+        self.hot_bytes = 0
+        # Commandes évincées en attente d'écriture, puis en cours d'écriture
+        self._spill = {}
+        self._writing = {}
+        # orderId -> emplacement empaqueté dans le segment décompressé,
+        # et nombre de commandes vivantes par segment
+        self._cold = {}
+        self._live = {}
+        self._segments = OrderedDict()
+        self._next_segment = 0
+        self._write_lock = asyncio.Lock()
+
+        self.hot_hits = 0
+        self.cold_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.segments_written = 0
+        self.cold_bytes = 0
+
+        os.makedirs(cold_dir, exist_ok=True)
+        for name in os.listdir(cold_dir):
+            if name.startswith(SEGMENT_PREFIX):
+                os.unlink(os.path.join(cold_dir, name))
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(
+            self.cold_dir, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}"
+        )
+
+    # Budget
+
+    def _order_count(self) -> int:
+        buffered = len(self._spill) + len(self._writing)
+        return len(self.hot) + buffered + len(self._cold)
+
+    def _reserve(self, order_id: str) -> None:
+        """
+        Réserve le coût fixe d'une nouvelle commande (emplacement froid et
+        order_overhead), qu'aucune éviction ne libère ; refuse la commande
+        s'il dépasse le budget.
+        """
+        if (
+            order_id in self.hot
+            or order_id in self._cold
+            or self._buffered(order_id) is not None
+        ):
+            return
+        cost = (
+            COLD_ENTRY_OVERHEAD + sys.getsizeof(order_id) + self.order_overhead
+        )
+        if self.fixed_bytes + cost > self.memory_budget:
+            raise OrderStoreFullException(
+                "Order store memory budget exhausted"
+            )
+        self.fixed_bytes += cost
+
+    # Niveau chaud
+
+    def _put_hot(self, order: OrderIn) -> None:
+        order = OrderRecord.from_order(order)
+        self._reserve(order.orderId)
+        previous = self.hot.pop(order.orderId, None)
+        if previous is not None:
+            self.hot_bytes -= previous[1]
+        else:
+            self._forget_cold(order.orderId)
+        size = estimate_size(order)
+        self.hot[order.orderId] = (order, size, time.monotonic())
+        self.hot_bytes += size
+
+    def _evict(self) -> None:
+        """
+        Évince par LRU au-delà du budget laissé par les octets fixes, puis
+        par ancienneté.
+        """
+        deadline = time.monotonic() - self.hot_ttl if self.hot_ttl else None
+        while self.hot:
+            order_id, (order, size, touched) = next(iter(self.hot.items()))
+            budget = self.memory_budget - self.fixed_bytes
+            if self.hot_bytes <= budget and (
+                deadline is None or touched >= deadline
+            ):
+                return
+            del self.hot[order_id]
+            self.hot_bytes -= size
+            self._spill[order_id] = order
+            self.evictions += 1
+
+    # Niveau froid
+
+    def _forget_cold(self, order_id: str) -> None:
+        """Retire la copie froide d'une commande remplacée ou remontée."""
+        if self._spill.pop(order_id, None) is not None:
+            return
+        if self._writing.pop(order_id, None) is not None:
+            return
+        location = self._cold.pop(order_id, None)
+        if location is None:
+            return
+        segment = location >> 2 * OFFSET_BITS
+        self._live[segment] -= 1
+        if not self._live[segment]:
+            # Segment entièrement obsolète : le fichier peut disparaître
+            del self._live[segment]
+            self._segments.pop(segment, None)
+            path = self._segment_path(segment)
+            self.cold_bytes -= os.path.getsize(path)
+            os.unlink(path)
+
+    def _write_segment(
+        self, segment: int, orders: list[OrderIn]
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """
+        Écrit un segment et retourne sa taille et les bornes des lignes.
+
+        Les commandes au-delà de la capacité d'adressage d'un segment ne sont
+        pas écrites : l'appelant les remet dans le tampon d'éviction.
+        """
+        rows, bounds, offset = [], [], 0
+        for order in orders:
+            row = encode_order(order)
+            if offset + len(row) > OFFSET_MASK:
+                if not rows:
+                    raise ValueError("Order record too large for cold tier")
+                break
+            rows.append(row)
+            bounds.append((offset, offset + len(row)))
+            offset += len(row)
+        data = zlib.compress(b"".join(rows))
+        with open(self._segment_path(segment), "wb") as f:
+            f.write(data)
+        return len(data), bounds
+
+    def _read_segment(self, segment: int) -> bytes:
+        with open(self._segment_path(segment), "rb") as f:
+            return zlib.decompress(f.read())
+
+    async def _load_segment(self, segment: int) -> bytes:
+        """Contenu décompressé d'un segment, via un petit cache LRU."""
+        cached = self._segments.get(segment)
+        if cached is not None:
+            self._segments.move_to_end(segment)
+            return cached
+        data = await asyncio.to_thread(self._read_segment, segment)
+        if segment in self._live:
+            self._segments[segment] = data
+            if len(self._segments) > self.segment_cache:
+                self._segments.popitem(last=False)
+        return data
+
+    async def _read_cold(self, order_id: str) -> Optional[OrderIn]:
+        """Lit une commande froide en ne décodant que sa ligne."""
+        while True:
+            location = self._cold.get(order_id)
+            if location is None:
+                return self._buffered(order_id)
+            segment = location >> 2 * OFFSET_BITS
+            start = location >> OFFSET_BITS & OFFSET_MASK
+            end = location & OFFSET_MASK
+            try:
+                data = await self._load_segment(segment)
+            except FileNotFoundError:
+                # Segment supprimé pendant la lecture : l'emplacement a changé
+                continue
+            if self._cold.get(order_id) == location:
+                return decode_order(data[start:end])
+
+    async def _flush_spill(self) -> None:
+        """Écrit le tampon d'éviction en segments compressés."""
+        async with self._write_lock:
+            while len(self._spill) >= self.segment_size:
+                batch = dict(list(self._spill.items())[: self.segment_size])
+                for order_id in batch:
+                    del self._spill[order_id]
+                # Copie : _forget_cold peut retirer des entrées pendant
+                # l'écriture sans décaler les bornes retournées
+                self._writing = dict(batch)
+                segment = self._next_segment
+                self._next_segment += 1
+                written, bounds = await asyncio.to_thread(
+                    self._write_segment, segment, list(batch.values())
+                )
+                self.cold_bytes += written
+                self.segments_written += 1
+                live = 0
+                # Seules les commandes ni remplacées ni remontées entre-temps
+                # sont rattachées au segment
+                base = segment << 2 * OFFSET_BITS
+                written_ids = list(batch)[: len(bounds)]
+                for order_id, (start, end) in zip(written_ids, bounds):
+                    if self._writing.pop(order_id, None) is not None:
+                        self._cold[order_id] = (
+                            base | start << OFFSET_BITS | end
+                        )
+                        live += 1
+                # Commandes non écrites : retour dans le tampon
+                self._spill.update(self._writing)
+                if live:
+                    self._live[segment] = live
+                else:
+                    self.cold_bytes -= written
+                    os.unlink(self._segment_path(segment))
+                self._writing = {}
+
+    def _buffered(self, order_id: str) -> Optional[OrderIn]:
+        order = self._spill.get(order_id)
+        return order if order is not None else self._writing.get(order_id)
+
+    # Interface OrderRepository
+
+    async def add(self, order: OrderIn) -> None:
+        self._put_hot(order)
+        self._evict()
+        if len(self._spill) >= self.segment_size:
+            await self._flush_spill()
+
+    async def add_many(self, orders: Iterable[OrderIn]) -> None:
+        stored = 0
+        try:
+            for order in orders:
+                self._put_hot(order)
+                stored += 1
+        except OrderStoreFullException as e:
+            # Les commandes précédentes du lot restent enregistrées
+            e.stored = stored
+            raise
+        finally:
+            self._evict()
+            if len(self._spill) >= self.segment_size:
+                await self._flush_spill()
+
+    async def get(self, order_id: str) -> Optional[OrderIn]:
+        entry = self.hot.get(order_id)
+        if entry is not None:
+            self.hot_hits += 1
+            self.hot.move_to_end(order_id)
+            self.hot[order_id] = (entry[0], entry[1], time.monotonic())
+            return entry[0]
+        order = self._buffered(order_id)
+        if order is None:
+            order = await self._read_cold(order_id)
+        if order is None:
+            # Absente, ou remontée entre-temps par une lecture concurrente
+            entry = self.hot.get(order_id)
+            if entry is None:
+                self.misses += 1
+            return entry[0] if entry else None
+        self.cold_hits += 1
+        await self.add(order)
+        return order
+
+    async def get_many(self, order_ids: Iterable[str]) -> dict[str, OrderIn]:
+        # Lecture groupée sans remontée : un parcours ne doit pas vider
+        # le niveau chaud
+        found, cold = {}, []
+        for order_id in order_ids:
+            entry = self.hot.get(order_id)
+            if entry is not None:
+                self.hot_hits += 1
+                found[order_id] = entry[0]
+                continue
+            order = self._buffered(order_id)
+            if order is not None:
+                self.cold_hits += 1
+                found[order_id] = order
+            elif order_id in self._cold:
+                cold.append(order_id)
+            else:
+                self.misses += 1
+        # Un segment par lecture disque au plus, grâce au cache de segments
+        cold.sort(key=self._cold.__getitem__)
+        for order_id in cold:
+            order = await self._read_cold(order_id)
+            if order is not None:
+                self.cold_hits += 1
+                found[order_id] = order
+        return found
+
+    async def scan(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[list[OrderIn]]:
+        hot = [entry[0] for entry in self.hot.values()]
+        hot.extend(self._spill.values())
+        hot.extend(self._writing.values())
+        for start in range(0, len(hot), batch_size):
+            yield hot[start : start + batch_size]
+        for segment in list(self._live):
+            if segment not in self._live:
+                continue
+            try:
+                data = await asyncio.to_thread(self._read_segment, segment)
+            except FileNotFoundError:
+                # Segment devenu obsolète pendant le parcours
+                continue
+            live = [decode_order(line) for line in data.splitlines()]
+            live = [
+                order
+                for order in live
+                if self._cold.get(order.orderId, -1) >> 2 * OFFSET_BITS
+                == segment
+            ]
+            for start in range(0, len(live), batch_size):
+                yield live[start : start + batch_size]
+
+    async def count(self) -> int:
+        return self._order_count()
+
+    def stats(self) -> dict:
+        lookups = self.hot_hits + self.cold_hits
+        return {
+            "hot_orders": len(self.hot),
+            "hot_bytes": self.hot_bytes,
+            "memory_budget": self.memory_budget,
+            "fixed_bytes": self.fixed_bytes,
+            "spilled_orders": len(self._spill) + len(self._writing),
+            "cold_orders": len(self._cold),
+            "cold_segments": len(self._live),
+            "cold_bytes": self.cold_bytes,
+            "hot_hits": self.hot_hits,
+            "cold_hits": self.cold_hits,
+            "misses": self.misses,
+            "hot_hit_ratio": self.hot_hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "segments_written": self.segments_written,
+        }
+
+    async def close(self) -> None:
+        logger.info("Tiered order store closed", **self.stats())
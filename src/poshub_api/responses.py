@@ -0,0 +1,46 @@
+"""
+Réponse JSON rapide utilisée par défaut par l'application.
+
+Le rendu passe par orjson (dépendance déclarée), ou par to_json de
+pydantic-core (toujours présent avec pydantic v2) sur une plateforme
+sans roue orjson. Les deux moteurs
+produisent le même JSON compact : datetime en ISO 8601 (UTC écrit « Z »,
+comme les modèles pydantic), Decimal en chaîne pour ne pas perdre de
+précision, NaN et infinis en null.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+JSON_ENGINE = "orjson" if orjson is not None else "pydantic-core"
+
+
+def _orjson_default(value: Any) -> Any:
+    # Types inconnus d'orjson (Decimal, modèles, ensembles...) : même
+    # représentation que pydantic-core
+    return to_jsonable_python(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Sérialise un contenu en JSON compact (octets UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+    return to_json(content, inf_nan_mode="null")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse dont le rendu utilise orjson ou pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,371 @@
+"""
+Limitation des tentatives de connexion par seaux à jetons.
+
+Chaque clé (nom d'utilisateur, adresse IP cliente) dispose d'un seau de
+`capacity` jetons, rechargé de `per_second` jetons par seconde. Toute
+tentative consomme un jeton de son IP ; le seau du compte n'est que
+consulté avant l'authentification, et seul un échec y consomme un jeton :
+des connexions réussies n'épuisent pas le compte. La recharge est
+paresseuse : un seau ne stocke que (jetons, instant de la dernière mise à
+jour) et n'est recalculé qu'au moment où la clé se présente, sans
+minuterie ni tâche de fond.
+
+Deux implémentations, sélectionnées par LOGIN_THROTTLE_BACKEND :
+- TokenBucketLimiter : seaux en mémoire du worker, nombre de clés borné
+  (LRU). Évincer un seau le remet plein : la borne se choisit au-dessus
+  du nombre de clés actives, et le seau par IP reste le garde-fou d'une
+  rafale sur des noms tous différents.
+- SQLiteTokenBucketLimiter : seaux dans une base SQLite locale partagée
+  par tous les workers de l'hôte (transaction IMMEDIATE par tentative,
+  horloge murale commune). Les seaux redevenus pleins sont purgés
+  périodiquement.
+
+LoginThrottle vérifie l'IP puis le nom d'utilisateur et lève une 429 avec
+Retry-After : le refus a lieu avant toute lecture de compte ou hachage.
+"""
+
+import abc
+import asyncio
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, Request, status
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")
+LOGIN_THROTTLE_PATH = os.getenv("LOGIN_THROTTLE_PATH", "poshub-throttle.db")
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+LOGIN_USER_BURST = int(os.getenv("LOGIN_USER_BURST", "5"))
+LOGIN_USER_PER_MINUTE = float(os.getenv("LOGIN_USER_PER_MINUTE", "5"))
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "60"))
+
+# Longueur maximale d'une clé : un nom d'utilisateur arbitraire ne doit pas
+# faire grossir la table
+MAX_KEY_LENGTH = 128
+
+
+def _refill(
+    tokens: float, elapsed: float, capacity: int, per_second: float
+) -> tuple[float, float]:
+    """
+    Recharge puis consomme un jeton ; retourne (jetons restants, attente).
+    Une attente > 0 signifie refus : aucun jeton n'est consommé.
+    """
+    tokens = min(capacity, tokens + max(0.0, elapsed) * per_second)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / per_second
+
+
+class RateLimiter(abc.ABC):
+    """Interface d'un limiteur par clé."""
+
+    def __init__(self, capacity: int, per_second: float):
+        if capacity < 1 or per_second <= 0:
+            raise ValueError("capacity and per_second must be positive")
+        self.capacity = capacity
+        self.per_second = per_second
+        self.allowed = 0
+        self.limited = 0
+
+    @abc.abstractmethod
+    async def acquire(self, key: str) -> float:
+        """
+        Consomme un jeton pour key ; retourne 0 si la tentative est
+        acceptée, sinon le délai en secondes avant le prochain jeton.
+        """
+
+    @abc.abstractmethod
+    async def peek(self, key: str) -> float:
+        """Comme acquire, sans consommer de jeton (compte les refus)."""
+
+    def _count(self, wait: float) -> float:
+        if wait:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def _count_refusal(self, wait: float) -> float:
+        if wait:
+            self.limited += 1
+        return wait
+
+    def clear(self) -> None:
+        """Oublie tous les seaux."""
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "per_second": self.per_second,
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+class TokenBucketLimiter(RateLimiter):
+    """Seaux à jetons en mémoire, au plus max_keys clés (LRU)."""
+
+    def __init__(
+        self,
+        capacity: int,
+        per_second: float,
+        max_keys: int = LOGIN_THROTTLE_MAX_KEYS,
+        clock=time.monotonic,
+    ):
+        super().__init__(capacity, per_second)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.evicted = 0
+
+    def take(self, key: str) -> float:
+        """Version synchrone d'acquire (aucun await : pas de verrou)."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = (self.capacity, now)
+        else:
+            self._buckets.move_to_end(key)
+        tokens, wait = _refill(
+            bucket[0], now - bucket[1], self.capacity, self.per_second
+        )
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+        return self._count(wait)
+
+    async def acquire(self, key: str) -> float:
+        return self.take(key)
+
+    def look(self, key: str) -> float:
+        """Attente avant le prochain jeton de key, sans le consommer."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        return _refill(
+            bucket[0],
+            self._clock() - bucket[1],
+            self.capacity,
+            self.per_second,
+        )[1]
+
+    async def peek(self, key: str) -> float:
+        return self._count_refusal(self.look(key))
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "keys": len(self._buckets),
+            "evicted": self.evicted,
+        }
+
+
+class SQLiteTokenBucketLimiter(RateLimiter):
+    """
+    Seaux à jetons dans une base SQLite partagée entre workers.
+
+    Chaque tentative lit et réécrit son seau dans une transaction
+    IMMEDIATE (verrou d'écriture de la base), exécutée dans un thread
+    dédié pour ne pas bloquer la boucle d'événements.
+    """
+
+    _CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS {table} ("
+        "key TEXT PRIMARY KEY, "
+        "tokens REAL NOT NULL, "
+        "updated REAL NOT NULL)"
+    )
+    _SELECT = "SELECT tokens, updated FROM {table} WHERE key = ?"
+    _UPSERT = (
+        "INSERT OR REPLACE INTO {table} (key, tokens, updated) "
+        "VALUES (?, ?, ?)"
+    )
+    _PURGE = "DELETE FROM {table} WHERE updated < ?"
+    _COUNT = "SELECT COUNT(*) FROM {table}"
+    _CLEAR = "DELETE FROM {table}"
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int,
+        per_second: float,
+        table: str = "buckets",
+        purge_every: int = 1000,
+        clock=time.time,
+    ):
+        super().__init__(capacity, per_second)
+        self.path = path
+        self.table = table
+        self.purge_every = purge_every
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="throttle-sqlite"
+        )
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._sql = {
+            name: getattr(self, name).format(table=table)
+            for name in (
+                "_CREATE_TABLE",
+                "_SELECT",
+                "_UPSERT",
+                "_PURGE",
+                "_COUNT",
+                "_CLEAR",
+            )
+        }
+        self._conn.execute(self._sql["_CREATE_TABLE"])
+        self.purged = 0
+        self._since_purge = 0
+
+    def take(self, key: str) -> float:
+        now = self._clock()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(self._sql["_SELECT"], (key,)).fetchone()
+            tokens, wait = _refill(
+                row[0] if row else self.capacity,
+                now - row[1] if row else 0.0,
+                self.capacity,
+                self.per_second,
+            )
+            conn.execute(self._sql["_UPSERT"], (key, tokens, now))
+            self._since_purge += 1
+            if self._since_purge >= self.purge_every:
+                self._since_purge = 0
+                self.purged += self._purge(now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _purge(self, now: float) -> int:
+        """Supprime les seaux redevenus pleins (équivalents à absents)."""
+        full_after = self.capacity / self.per_second
+        return self._conn.execute(
+            self._sql["_PURGE"], (now - full_after,)
+        ).rowcount
+
+    async def acquire(self, key: str) -> float:
+        wait = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.take, key
+        )
+        return self._count(wait)
+
+    def look(self, key: str) -> float:
+        row = self._conn.execute(self._sql["_SELECT"], (key,)).fetchone()
+        if row is None:
+            return 0.0
+        return _refill(
+            row[0], self._clock() - row[1], self.capacity, self.per_second
+        )[1]
+
+    async def peek(self, key: str) -> float:
+        wait = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.look, key
+        )
+        return self._count_refusal(wait)
+
+    def _execute(self, sql: str) -> list:
+        """Requête hors transaction, sur le thread de la connexion."""
+        return self._executor.submit(
+            lambda: self._conn.execute(self._sql[sql]).fetchall()
+        ).result()
+
+    def clear(self) -> None:
+        self._execute("_CLEAR")
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "keys": self._execute("_COUNT")[0][0],
+            "purged": self.purged,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+def client_ip(request: Request) -> str:
+    """Adresse du client (sous Mangum : l'IP source vue par API Gateway)."""
+    return request.client.host if request.client else "unknown"
+
+
+class LoginThrottle:
+    """Limite les tentatives de connexion par IP cliente et par compte."""
+
+    def __init__(self, per_ip: RateLimiter, per_user: RateLimiter):
+        self.per_ip = per_ip
+        self.per_user = per_user
+
+    async def check(self, request: Request, username: str) -> None:
+        """
+        Consomme une tentative pour l'IP et vérifie qu'il en reste pour le
+        compte (débité par failed() seulement).
+        Lève une HTTPException 429 avec Retry-After si l'un est épuisé.
+        """
+        ip = client_ip(request)
+        wait = await self.per_ip.acquire("ip:" + ip)
+        if not wait:
+            wait = await self.per_user.peek(
+                "user:" + username[:MAX_KEY_LENGTH]
+            )
+        if wait:
+            logger.warning(
+                "Login throttled",
+                username=username[:MAX_KEY_LENGTH],
+                client_ip=ip,
+                retry_after=round(wait, 1),
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    async def failed(self, username: str) -> None:
+        """Débite le compte après un échec d'authentification."""
+        await self.per_user.acquire("user:" + username[:MAX_KEY_LENGTH])
+
+    def clear(self) -> None:
+        self.per_ip.clear()
+        self.per_user.clear()
+
+    def stats(self) -> dict:
+        return {"ip": self.per_ip.stats(), "user": self.per_user.stats()}
+
+
+def create_login_throttle() -> LoginThrottle:
+    """Construit la limitation configurée via LOGIN_THROTTLE_BACKEND."""
+    limits = (
+        (LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60),
+        (LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE / 60),
+    )
+    if LOGIN_THROTTLE_BACKEND == "sqlite":
+        per_ip, per_user = (
+            SQLiteTokenBucketLimiter(LOGIN_THROTTLE_PATH, *limit, table)
+            for limit, table in zip(limits, ("ip_buckets", "user_buckets"))
+        )
+        logger.info("SQLite login throttle", path=LOGIN_THROTTLE_PATH)
+    else:
+        per_ip, per_user = (TokenBucketLimiter(*limit) for limit in limits)
+    return LoginThrottle(per_ip, per_user)
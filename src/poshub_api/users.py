@@ -0,0 +1,375 @@
+"""
+Comptes utilisateurs : stockage et vérification des mots de passe.
+
+Les mots de passe sont conservés hachés en bcrypt. Un hachage bcrypt coûte
+volontairement des dizaines de millisecondes de CPU : la vérification
+tourne dans un pool de threads borné (PASSWORD_HASH_WORKERS), jamais sur
+la boucle d'événements, et le nombre de vérifications en attente est
+limité (PASSWORD_HASH_MAX_PENDING). Au-delà, la connexion est refusée
+immédiatement (503) : une rafale de connexions ne peut ni bloquer la
+boucle ni accumuler une file sans fin devant le trafic des commandes.
+
+Deux dépôts sont fournis, sélectionnés par USER_STORE :
+- InMemoryUserStore : comptes de démonstration (comportement historique)
+- SQLiteUserStore : base SQLite locale, lectures en cache (TTL borné)
+
+bcrypt est utilisé directement : passlib 1.7.4 (non maintenu) échoue à son
+auto-test avec bcrypt >= 4.1. bcrypt ignore au-delà de 72 octets ; les
+mots de passe sont tronqués explicitement, comme le faisait passlib.
+"""
+
+import abc
+import asyncio
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+import bcrypt
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+USER_STORE = os.getenv("USER_STORE", "memory")
+USER_STORE_PATH = os.getenv("USER_STORE_PATH", "poshub-users.db")
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+BCRYPT_MAX_BYTES = 72
+
+
+class StoredUser(NamedTuple):
+    username: str
+    password_hash: str
+    scopes: tuple[str, ...] = ()
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+
+
+# Comptes de démonstration (coût bcrypt 10 : mots de passe publics)
+TEST_USERS = {
+    "admin": StoredUser(
+        "admin",
+        "$2b$10$wYpT7NOX2YWMWlVnQ5IxseKntNqDyDUD/xh15S4ZbojB07yfWGxNe",
+        ("orders:read", "orders:write", "demo:read"),
+    ),
+    "user": StoredUser(
+        "user",
+        "$2b$10$TsZRHjY3muY6CkNmXQmwMOSqs.7k3U/KXjv9lSh7vF9LOCot.MTqu",
+        ("orders:read",),
+    ),
+    "demo": StoredUser(
+        "demo",
+        "$2b$10$Oj/wBDoSkqAYbqt.O9Sl6uSIrq4QqaBoQluerr1NWYBlCYXdGFqWC",
+        ("demo:read",),
+    ),
+}
+
+
+def _secret(password: str) -> bytes:
+    return password.encode()[:BCRYPT_MAX_BYTES]
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode()
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(password), password_hash.encode())
+    except ValueError:
+        # Hachage stocké invalide
+        return False
+
+
+def hash_cost(password_hash: str) -> Optional[int]:
+    """Coût d'un haché bcrypt ($2b$NN$...), None s'il est invalide."""
+    parts = password_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+# Coût des comptes livrés (tous hachés au même coût)
+SEED_ROUNDS = hash_cost(TEST_USERS["admin"].password_hash)
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash(rounds: int) -> str:
+    """
+    Haché comparé quand l'utilisateur n'existe pas. Il doit avoir le coût
+    des hachés stockés : sinon la durée de réponse trahit l'existence d'un
+    compte. Un haché par coût, calculé une fois, dans le pool.
+    """
+    return hash_password(secrets.token_urlsafe(16), rounds)
+
+
+def _verify_or_dummy(
+    password: str, password_hash: Optional[str], dummy_rounds: int
+) -> bool:
+    return verify_password(
+        password, password_hash or _dummy_hash(dummy_rounds)
+    )
+
+
+class PasswordVerifierBusy(Exception):
+    """Trop de vérifications de mots de passe en attente."""
+
+
+class PasswordVerifier:
+    """
+    Vérifications bcrypt dans un pool de threads borné.
+
+    Un compte inconnu est comparé à un haché factice au coût dummy_rounds :
+    celui des comptes livrés au départ, puis celui du dernier haché stocké
+    vérifié, pour suivre les comptes réellement en base.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        dummy_rounds: int = SEED_ROUNDS,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.dummy_rounds = dummy_rounds
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.verified = 0
+        self.rejected = 0
+        self.busy = 0
+        # Haché factice préparé d'avance, hors de la boucle d'événements
+        self._executor.submit(_dummy_hash, dummy_rounds)
+
+    async def verify(
+        self, password: str, password_hash: Optional[str]
+    ) -> bool:
+        """
+        Vérifie un mot de passe hors de la boucle d'événements ; un haché
+        None (compte inconnu) coûte le même temps et échoue toujours.
+        Lève PasswordVerifierBusy si trop de vérifications attendent.
+        """
+        if self.pending >= self.max_pending:
+            self.busy += 1
+            raise PasswordVerifierBusy()
+        if password_hash is not None:
+            cost = hash_cost(password_hash)
+            if cost is not None and cost != self.dummy_rounds:
+                self.dummy_rounds = cost
+                self._executor.submit(_dummy_hash, cost)
+        self.pending += 1
+        try:
+            matches = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                _verify_or_dummy,
+                password,
+                password_hash,
+                self.dummy_rounds,
+            )
+        finally:
+            self.pending -= 1
+        matches = matches and password_hash is not None
+        if matches:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return matches
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "busy": self.busy,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class UserStore(abc.ABC):
+    """Interface de stockage des comptes."""
+
+    @abc.abstractmethod
+    async def get(self, username: str) -> Optional[StoredUser]:
+        """Retourne le compte ou None s'il n'existe pas."""
+
+    @abc.abstractmethod
+    async def put(self, user: StoredUser) -> None:
+        """Crée ou remplace un compte."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryUserStore(UserStore):
+    """Comptes en mémoire."""
+
+    def __init__(self, users: Iterable[StoredUser] = ()):
+        self._users = {user.username: user for user in users}
+
+    async def get(self, username: str) -> Optional[StoredUser]:
+        return self._users.get(username)
+
+    async def put(self, user: StoredUser) -> None:
+        self._users[user.username] = user
+
+    def stats(self) -> dict:
+        return {"users": len(self._users)}
+
+
+class SQLiteUserStore(UserStore):
+    """
+    Comptes dans une base SQLite locale.
+
+    Les lectures passent par une connexion par thread lecteur et sont
+    gardées dans un cache LRU avec expiration (les comptes inconnus aussi,
+    pour qu'une rafale sur un nom inexistant ne touche pas la base).
+    put() met à jour la base puis le cache.
+    """
+
+    _CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS users ("
+        "username TEXT PRIMARY KEY, "
+        "password_hash TEXT NOT NULL, "
+        "scopes TEXT NOT NULL, "
+        "email TEXT, "
+        "full_name TEXT)"
+    )
+    _UPSERT = (
+        "INSERT OR REPLACE INTO users "
+        "(username, password_hash, scopes, email, full_name) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    _SELECT_ONE = (
+        "SELECT username, password_hash, scopes, email, full_name "
+        "FROM users WHERE username = ?"
+    )
+    _COUNT = "SELECT COUNT(*) FROM users"
+
+    def __init__(
+        self,
+        path: str = USER_STORE_PATH,
+        cache_size: int = USER_CACHE_SIZE,
+        cache_ttl: float = USER_CACHE_TTL_SECONDS,
+        seed: Iterable[StoredUser] = (),
+        clock=time.monotonic,
+    ):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._local = threading.local()
+        self._connections = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="users-sqlite"
+        )
+        self._cache: OrderedDict[str, tuple[Optional[StoredUser], float]]
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        conn = self._connection()
+        if seed and conn.execute(self._COUNT).fetchone()[0] == 0:
+            conn.executemany(self._UPSERT, [self._to_row(u) for u in seed])
+        logger.info("SQLite user store initialized", path=path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion SQLite propre au thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(self._CREATE_TABLE)
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _to_row(user: StoredUser) -> tuple:
+        return (
+            user.username,
+            user.password_hash,
+            " ".join(user.scopes),
+            user.email,
+            user.full_name,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> StoredUser:
+        return StoredUser(row[0], row[1], tuple(row[2].split()), *row[3:])
+
+    def _select(self, username: str) -> Optional[StoredUser]:
+        row = (
+            self._connection().execute(self._SELECT_ONE, (username,))
+        ).fetchone()
+        return self._from_row(row) if row else None
+
+    def _remember(self, username: str, user: Optional[StoredUser]) -> None:
+        self._cache[username] = (user, self._clock() + self.cache_ttl)
+        self._cache.move_to_end(username)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get(self, username: str) -> Optional[StoredUser]:
+        entry = self._cache.get(username)
+        if entry is not None and entry[1] > self._clock():
+            self._cache.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        user = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._select, username
+        )
+        self._remember(username, user)
+        return user
+
+    def _write(self, user: StoredUser) -> None:
+        self._connection().execute(self._UPSERT, self._to_row(user))
+
+    async def put(self, user: StoredUser) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write, user
+        )
+        self._remember(user.username, user)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+
+
+def create_user_store() -> UserStore:
+    """Construit le dépôt configuré via la variable USER_STORE."""
+    if USER_STORE == "sqlite":
+        return SQLiteUserStore(USER_STORE_PATH, seed=TEST_USERS.values())
+    return InMemoryUserStore(TEST_USERS.values())
@@ -0,0 +1,10 @@
+import pytest
+
+from poshub_api import auth
+
+
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    """Chaque test repart avec des tentatives de connexion intactes."""
+    auth.login_throttle.clear()
+    yield
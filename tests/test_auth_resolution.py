@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from poshub_api import auth
+from poshub_api.auth import (
+    SCOPE_BITS,
+    AccessAudit,
+    TokenCache,
+    User,
+    create_access_token,
+    get_current_user,
+    require_demo_read,
+    require_orders_read,
+    require_orders_write,
+    require_scope,
+    scope_mask,
+)
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def info(self, event, **fields):
+        self.records.append(("info", event, fields))
+
+    def warning(self, event, **fields):
+        self.records.append(("warning", event, fields))
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/combined")
+    async def combined(
+        request: Request,
+        reader: User = Depends(require_orders_read),
+        demo: User = Depends(require_demo_read),
+        user: User = Depends(get_current_user),
+    ):
+        return {
+            "same": reader is demo is user is request.state.user,
+            "username": user.username,
+        }
+
+    @app.get("/write")
+    async def write(user: User = Depends(require_orders_write)):
+        return {"username": user.username}
+
+    return app
+
+
+def bearer(scopes) -> dict:
+    token = create_access_token(
+        {"sub": "pos-1", "scopes": scopes}, timedelta(minutes=5)
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Cache désactivé, décodages comptés."""
+    monkeypatch.setattr(auth, "token_cache", TokenCache(max_entries=0))
+    monkeypatch.setattr(auth, "access_audit", AccessAudit(sample_every=1))
+    calls = []
+    decode = auth._decode_token
+
+    def counting(token):
+        calls.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(auth, "_decode_token", counting)
+    return calls
+
+
+def test_scope_mask():
+    """Test un bit par scope connu, scopes inconnus ignorés."""
+    assert len(set(SCOPE_BITS.values())) == len(SCOPE_BITS)
+    mask = scope_mask(["orders:read", "unknown"])
+    assert mask == SCOPE_BITS["orders:read"]
+    assert User(username="u", scopes=["demo:read"]).scope_mask == (
+        SCOPE_BITS["demo:read"]
+    )
+
+
+def test_unknown_scope_rejected():
+    """Test scope absent du registre refusé à la déclaration."""
+    with pytest.raises(ValueError):
+        require_scope("orders:delete")
+
+
+def test_single_resolution_per_request(decodes):
+    """Test un seul décodage pour plusieurs dépendances de scopes."""
+    client = TestClient(make_app())
+
+    response = client.get(
+        "/combined", headers=bearer(["orders:read", "demo:read"])
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"same": True, "username": "pos-1"}
+    assert len(decodes) == 1
+
+
+def test_denied(decodes):
+    """Test scope manquant : 403 et refus compté."""
+    client = TestClient(make_app())
+
+    response = client.get("/write", headers=bearer(["orders:read"]))
+
+    assert response.status_code == 403
+    assert auth.access_audit.stats()["denied"] == 1
+
+
+def test_granted_logs_are_sampled(monkeypatch):
+    """Test un accès accordé journalisé sur N, avec le résumé."""
+    logger = RecordingLogger()
+    monkeypatch.setattr(auth, "logger", logger)
+    audit = AccessAudit(sample_every=3)
+    user = User(username="pos-1", scopes=["orders:read"])
+
+    for scope in ("orders:read", "orders:read", "demo:read", "orders:read"):
+        audit.grant(user, scope)
+
+    assert logger.records == [
+        (
+            "info",
+            "Access granted",
+            {
+                "username": "pos-1",
+                "scope": "demo:read",
+                "granted": {"orders:read": 2, "demo:read": 1},
+            },
+        )
+    ]
+    assert audit.stats()["granted"] == 4
@@ -0,0 +1,203 @@
+import asyncio
+import gzip
+import zlib
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from poshub_api import compression
+from poshub_api.compression import CompressionMiddleware, select_encoding
+from poshub_api.main import app as main_app
+
+PAYLOAD = b'{"orderId":"ord-1","currency":"EUR"}' * 100
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return Response(
+            PAYLOAD, media_type="application/json", headers={"ETag": '"v1"'}
+        )
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    @app.get("/negotiated")
+    async def negotiated():
+        return Response(
+            PAYLOAD, media_type="application/json", headers={"Vary": "Accept"}
+        )
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(
+            gzip.compress(PAYLOAD),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/image")
+    async def image():
+        return Response(PAYLOAD, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield PAYLOAD
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def call(app, path: str, accept_encoding: Optional[str] = "gzip"):
+    """Requête ASGI directe : retourne le début et les blocs du corps."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": (
+            [(b"accept-encoding", accept_encoding.encode())]
+            if accept_encoding is not None
+            else []
+        ),
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # StreamingResponse attend une déconnexion pendant le flux
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    chunks = [m.get("body", b"") for m in messages[1:]]
+    return start["status"], headers, chunks
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "br"),
+        ("gzip;q=0, identity", None),
+        ("deflate", None),
+    ],
+)
+def test_select_encoding(header, expected):
+    """Test négociation Accept-Encoding."""
+    if compression.brotli is None and expected == "br":
+        expected = "gzip"
+    assert select_encoding(header) == expected
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    """Tests du middleware de compression."""
+
+    async def test_gzip(self):
+        """Test réponse compressée, en-têtes mis à jour."""
+        status, headers, chunks = await call(make_app(), "/large")
+
+        body = b"".join(chunks)
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert headers["content-length"] == str(len(body))
+        assert headers["vary"] == "Accept-Encoding"
+        assert headers["etag"] == 'W/"v1"'
+        assert gzip.decompress(body) == PAYLOAD
+
+    async def test_brotli(self):
+        """Test réponse compressée en brotli."""
+        if compression.brotli is None:
+            pytest.skip("brotli non installé")
+        _, headers, chunks = await call(make_app(), "/large", "br, gzip")
+
+        assert headers["content-encoding"] == "br"
+        assert compression.brotli.decompress(b"".join(chunks)) == PAYLOAD
+
+    @pytest.mark.parametrize(
+        "path, accept_encoding",
+        [
+            ("/small", "gzip"),
+            ("/large", "identity"),
+            ("/large", None),
+        ],
+    )
+    async def test_uncompressed_varies(self, path, accept_encoding):
+        """Test réponse compressible non compressée, Vary tout de même."""
+        _, headers, chunks = await call(make_app(), path, accept_encoding)
+
+        assert "content-encoding" not in headers
+        assert headers["vary"] == "Accept-Encoding"
+
+    async def test_uncompressible_unchanged(self):
+        """Test type déjà compressé : ni encodage ni Vary."""
+        _, headers, _ = await call(make_app(), "/image")
+
+        assert "content-encoding" not in headers
+        assert "vary" not in headers
+
+    @pytest.mark.parametrize("accept_encoding", ["gzip", None])
+    async def test_vary_merged(self, accept_encoding):
+        """Test Vary existant complété, sans doublon."""
+        _, headers, _ = await call(make_app(), "/negotiated", accept_encoding)
+
+        assert headers["vary"] == "Accept, Accept-Encoding"
+
+    async def test_already_encoded(self):
+        """Test réponse déjà compressée laissée telle quelle."""
+        _, headers, chunks = await call(make_app(), "/encoded")
+
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(b"".join(chunks)) == PAYLOAD
+
+    async def test_streaming(self):
+        """Test flux compressé bloc par bloc, décodable au fil de l'eau."""
+        _, headers, chunks = await call(make_app(), "/stream")
+
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Chaque bloc est vidé : ses données sont décodables immédiatement
+        assert decoder.decompress(chunks[0]) == PAYLOAD
+        for chunk in chunks[1:]:
+            decoder.decompress(chunk)
+        assert decoder.eof
+
+
+def test_application_keeps_correlation_id():
+    """Test compression sur l'application, X-Correlation-ID conservé."""
+    client = TestClient(main_app)
+    response = client.get(
+        "/openapi.json",
+        headers={"Accept-Encoding": "gzip", "X-Correlation-ID": "corr-gz"},
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["x-correlation-id"] == "corr-gz"
+    assert response.json()["info"]["title"] == "POSHub API"
@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders import router as orders_router
+from poshub_api.orders.idempotency import IdempotencyCache
+
+client = TestClient(app)
+
+
+def order_payload(order_id: str, amount: float = 12.5) -> dict:
+    return {
+        "orderId": order_id,
+        "createdAt": "2025-02-01T08:00:00Z",
+        "totalAmount": amount,
+        "currency": "EUR",
+    }
+
+
+@pytest.fixture
+def admin_headers():
+    response = client.post(
+        "/auth/login", data={"username": "admin", "password": "admin123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestIdempotencyKey:
+    """Tests de l'en-tête Idempotency-Key sur POST /orders/."""
+
+    def test_retry_replays_original_bytes(self, admin_headers, monkeypatch):
+        """Test qu'une nouvelle tentative ne rappelle pas le service."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-1"}
+        first = client.post(
+            "/orders/", json=order_payload("idem-1"), headers=headers
+        )
+
+        calls = []
+        original = orders_router.order_service.create_order
+
+        async def counting_create(order):
+            calls.append(order)
+            return await original(order)
+
+        monkeypatch.setattr(
+            orders_router.order_service, "create_order", counting_create
+        )
+        second = client.post(
+            "/orders/", json=order_payload("idem-1"), headers=headers
+        )
+
+        assert first.status_code == second.status_code == 200
+        assert second.content == first.content
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert calls == []
+
+    def test_replay_is_counted_in_metrics(self, admin_headers):
+        """Test que les rejeux sont comptés dans /metrics."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-2"}
+        client.post("/orders/", json=order_payload("idem-2"), headers=headers)
+
+        metrics_before = client.get("/metrics").json()["idempotency"]
+        client.post("/orders/", json=order_payload("idem-2"), headers=headers)
+        metrics_after = client.get("/metrics").json()["idempotency"]
+
+        assert metrics_after["hits"] == metrics_before["hits"] + 1
+
+    def test_conflicting_payload_422(self, admin_headers):
+        """Test clé réutilisée avec un corps différent."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-3"}
+        client.post("/orders/", json=order_payload("idem-3"), headers=headers)
+
+        response = client.post(
+            "/orders/", json=order_payload("idem-3", 99.0), headers=headers
+        )
+
+        assert response.status_code == 422
+        assert "different payload" in response.json()["detail"]
+
+    def test_replay_keeps_representation_headers(self, admin_headers):
+        """Test rejeu avec l'ETag et le Vary de la réponse d'origine."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-etag"}
+        first = client.post(
+            "/orders/", json=order_payload("idem-etag"), headers=headers
+        )
+        second = client.post(
+            "/orders/", json=order_payload("idem-etag"), headers=headers
+        )
+
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["vary"] == first.headers["vary"]
+        assert "Accept" in second.headers["vary"]
+
+    def test_different_accept_422(self, admin_headers):
+        """Test clé réutilisée en demandant une autre représentation."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-accept"}
+        client.post(
+            "/orders/", json=order_payload("idem-accept"), headers=headers
+        )
+
+        response = client.post(
+            "/orders/",
+            json=order_payload("idem-accept"),
+            headers={**headers, "Accept": "application/msgpack"},
+        )
+
+        assert response.status_code == 422
+        assert "Accept" in response.json()["detail"]
+
+    def test_invalid_body_does_not_reserve_key(self, admin_headers):
+        """Test 422 de validation puis nouvelle tentative corrigée."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-invalid"}
+        invalid = client.post(
+            "/orders/", json=order_payload("idem-5", -5), headers=headers
+        )
+        retried = client.post(
+            "/orders/", json=order_payload("idem-5", -5), headers=headers
+        )
+        corrected = client.post(
+            "/orders/", json=order_payload("idem-5"), headers=headers
+        )
+
+        assert invalid.status_code == retried.status_code == 422
+        assert "Idempotency-Key" not in str(retried.json()["detail"])
+        assert corrected.status_code == 200
+
+    def test_cancelled_request_releases_key(self, admin_headers, monkeypatch):
+        """Test requête annulée : la clé est libérée."""
+        headers = {**admin_headers, "Idempotency-Key": "retry-cancel"}
+
+        async def cancelled(order):
+            raise asyncio.CancelledError()
+
+        monkeypatch.setattr(
+            orders_router.order_service, "create_order", cancelled
+        )
+        with pytest.raises(BaseException):
+            client.post(
+                "/orders/", json=order_payload("idem-6"), headers=headers
+            )
+        monkeypatch.undo()
+
+        response = client.post(
+            "/orders/", json=order_payload("idem-6"), headers=headers
+        )
+        assert response.status_code == 200
+
+
+class TestIdempotencyCache:
+    """Tests du cache LRU/TTL."""
+
+    def test_lru_eviction(self):
+        """Test éviction de l'entrée la moins récemment utilisée."""
+        cache = IdempotencyCache(max_entries=2)
+        for name in ("a", "b"):
+            cache.complete((name,), b"", 200, b"", "application/json")
+        cache.get(("a",))
+        cache.complete(("c",), b"", 200, b"", "application/json")
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_keys_are_scoped_per_user(self):
+        """Test qu'une même clé n'est pas partagée entre utilisateurs."""
+        cache = IdempotencyCache()
+        cache.complete(("admin", "k"), b"fp", 200, b"{}", "application/json")
+
+        assert cache.get(("admin", "k")) is not None
+        assert cache.get(("user", "k")) is None
+
+    def test_ttl_expiration(self):
+        """Test expiration des entrées."""
+        now = [0.0]
+        cache = IdempotencyCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.complete(("a",), b"", 200, b"", "application/json")
+
+        now[0] = 11.0
+
+        assert cache.get(("a",)) is None
+        assert cache.stats()["expirations"] == 1
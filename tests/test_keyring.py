@@ -0,0 +1,234 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+from jose.utils import base64url_encode
+
+from poshub_api import auth
+from poshub_api.auth import create_access_token, verify_token
+from poshub_api.keyring import (
+    KeyRing,
+    KeyRingError,
+    keyring_from_dir,
+    keyring_from_document,
+    parse_key,
+)
+from poshub_api.main import app
+
+client = TestClient(app)
+
+
+def private_pem(key) -> str:
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def public_pem(key) -> str:
+    return (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(scope="module")
+def ec_key():
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+@pytest.fixture
+def use_keyring(monkeypatch):
+    """Remplace le trousseau de l'application le temps du test."""
+
+    def use(keyring: KeyRing) -> KeyRing:
+        monkeypatch.setattr(auth, "keyring", keyring)
+        auth.token_cache.clear()
+        return keyring
+
+    yield use
+    auth.token_cache.clear()
+
+
+def make_token() -> str:
+    return create_access_token(
+        {"sub": "pos-1", "scopes": ["orders:read"]}, timedelta(minutes=5)
+    )
+
+
+class TestParseKey:
+    """Tests de l'analyse des clés."""
+
+    def test_algorithms_inferred(self, rsa_key, ec_key):
+        """Test RS256 et ES256 déduits de la clé."""
+        assert parse_key("r", private_pem(rsa_key)).algorithm == "RS256"
+        assert parse_key("e", private_pem(ec_key)).algorithm == "ES256"
+
+    def test_public_key_verifies_only(self, ec_key):
+        """Test clé publique seule : publiée, ne signe pas."""
+        key = parse_key("pub", public_pem(ec_key))
+
+        assert not key.can_sign
+        assert key.public_jwk["kid"] == "pub"
+        with pytest.raises(KeyRingError):
+            KeyRing([key], active="pub")
+
+    def test_unsupported_key(self):
+        """Test Ed25519 refusé (EdDSA non géré par python-jose)."""
+        key = ed25519.Ed25519PrivateKey.generate()
+        with pytest.raises(KeyRingError):
+            parse_key("ed", private_pem(key))
+
+
+class TestRotation:
+    """Tests de la rotation des clés."""
+
+    def test_sign_and_verify_with_kid(self, use_keyring, rsa_key):
+        """Test token signé avec la clé active et son kid."""
+        use_keyring(KeyRing([parse_key("2025-01", private_pem(rsa_key))]))
+        token = make_token()
+
+        assert jwt.get_unverified_header(token)["kid"] == "2025-01"
+        assert jwt.get_unverified_header(token)["alg"] == "RS256"
+        assert verify_token(token).username == "pos-1"
+
+    def test_rolling_rotation(self, use_keyring, rsa_key, ec_key):
+        """Test ajout, activation puis retrait de l'ancienne clé."""
+        keyring = use_keyring(
+            KeyRing([parse_key("old", private_pem(rsa_key))])
+        )
+        old_token = make_token()
+
+        keyring.add(parse_key("new", private_pem(ec_key)))
+        assert jwt.get_unverified_header(make_token())["kid"] == "old"
+        keyring.activate("new")
+        new_token = make_token()
+
+        assert jwt.get_unverified_header(new_token)["kid"] == "new"
+        assert verify_token(old_token).username == "pos-1"
+        with pytest.raises(KeyRingError):
+            keyring.retire("new")
+        keyring.retire("old")
+        with pytest.raises(HTTPException):
+            verify_token(old_token)
+        assert verify_token(new_token).username == "pos-1"
+
+    def test_replaced_key_revokes_cached_tokens(
+        self, use_keyring, rsa_key, ec_key
+    ):
+        """Test token en cache refusé une fois sa clé remplacée."""
+        keyring = use_keyring(KeyRing([parse_key("k1", private_pem(rsa_key))]))
+        token = make_token()
+        assert verify_token(token).username == "pos-1"
+        revocations = auth.token_cache.stats()["revocations"]
+
+        keyring.add(parse_key("k1", private_pem(ec_key)), activate=True)
+
+        with pytest.raises(HTTPException):
+            verify_token(token)
+        assert auth.token_cache.stats()["revocations"] == revocations + 1
+
+    def test_algorithm_confusion_rejected(self, use_keyring, rsa_key):
+        """Test token HS256 signé avec la clé publique RSA refusé."""
+        use_keyring(KeyRing([parse_key("rsa", private_pem(rsa_key))]))
+        # Forgé à la main : python-jose refuse une clé PEM comme secret
+        signing_input = b".".join(
+            base64url_encode(json.dumps(part).encode())
+            for part in (
+                {"alg": "HS256", "typ": "JWT", "kid": "rsa"},
+                {"sub": "attacker"},
+            )
+        )
+        signature = hmac.new(
+            public_pem(rsa_key).encode(), signing_input, hashlib.sha256
+        ).digest()
+        forged = (signing_input + b"." + base64url_encode(signature)).decode()
+        with pytest.raises(HTTPException):
+            verify_token(forged)
+
+    def test_unknown_kid_rejected(self, use_keyring, ec_key):
+        """Test token sans kid refusé par un trousseau asymétrique."""
+        legacy = make_token()
+        use_keyring(KeyRing([parse_key("ec", private_pem(ec_key))]))
+        with pytest.raises(HTTPException):
+            verify_token(legacy)
+
+
+class TestLoading:
+    """Tests du chargement des trousseaux."""
+
+    def test_from_dir(self, tmp_path, rsa_key, ec_key):
+        """Test fichiers <kid>.pem, dernière clé active par défaut."""
+        (tmp_path / "2025-01.pem").write_text(private_pem(rsa_key))
+        (tmp_path / "2025-02.pem").write_text(private_pem(ec_key))
+
+        keyring = keyring_from_dir(str(tmp_path))
+
+        assert len(keyring) == 2
+        assert keyring.active.kid == "2025-02"
+        assert keyring_from_dir(str(tmp_path), "2025-01").active.kid == (
+            "2025-01"
+        )
+
+    def test_from_document(self, rsa_key, ec_key):
+        """Test document JSON (paramètre SSM)."""
+        document = json.dumps(
+            {
+                "active": "a",
+                "keys": [
+                    {"kid": "a", "pem": private_pem(rsa_key)},
+                    {"kid": "b", "pem": private_pem(ec_key), "alg": "ES256"},
+                ],
+            }
+        )
+
+        keyring = keyring_from_document(document)
+
+        assert keyring.active.kid == "a"
+        assert "b" in keyring
+        with pytest.raises(KeyRingError):
+            keyring_from_document('{"keys": [{"kid": "x"}]}')
+
+
+class TestJwksEndpoint:
+    """Tests de GET /.well-known/jwks.json."""
+
+    def test_public_keys_with_cache_headers(self, use_keyring, rsa_key):
+        """Test clés publiques seules, Cache-Control, ETag et 304."""
+        use_keyring(KeyRing([parse_key("k1", private_pem(rsa_key))]))
+
+        response = client.get("/.well-known/jwks.json")
+
+        assert response.status_code == 200
+        (key,) = response.json()["keys"]
+        assert key["kid"] == "k1"
+        assert key["alg"] == "RS256"
+        assert "d" not in key
+        assert "max-age" in response.headers["cache-control"]
+        cached = client.get(
+            "/.well-known/jwks.json",
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert cached.status_code == 304
+
+    def test_symmetric_key_not_published(self):
+        """Test trousseau HS256 par défaut : aucune clé publiée."""
+        response = client.get("/.well-known/jwks.json")
+        assert response.json() == {"keys": []}
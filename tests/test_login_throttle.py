@@ -0,0 +1,185 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api import auth
+from poshub_api.main import app
+from poshub_api.throttling import (
+    LoginThrottle,
+    SQLiteTokenBucketLimiter,
+    TokenBucketLimiter,
+)
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+class TestTokenBucketLimiter:
+    """Tests des seaux à jetons en mémoire."""
+
+    async def test_burst_then_lazy_refill(self):
+        """Test rafale autorisée, refus, puis recharge avec le temps."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(3, 0.5, clock=clock)
+
+        assert [await limiter.acquire("k") for _ in range(3)] == [0, 0, 0]
+        assert await limiter.acquire("k") == pytest.approx(2.0)
+        clock.now += 2
+        assert await limiter.acquire("k") == 0
+        assert await limiter.acquire("other") == 0
+        assert limiter.stats()["limited"] == 1
+
+    async def test_refill_capped_at_capacity(self):
+        """Test une longue inactivité ne dépasse pas la capacité."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(2, 1.0, clock=clock)
+        await limiter.acquire("k")
+        clock.now += 3600
+
+        assert [await limiter.acquire("k") for _ in range(3)][-1] > 0
+
+    async def test_bounded_keys(self):
+        """Test nombre de clés borné, la moins récente évincée."""
+        limiter = TokenBucketLimiter(1, 0.01, max_keys=2, clock=FakeClock())
+        for key in ("a", "b", "a", "c"):
+            await limiter.acquire(key)
+
+        assert limiter.stats()["keys"] == 2
+        assert limiter.stats()["evicted"] == 1
+        # "a" (récente) est conservée et épuisée, "b" a été oubliée
+        assert await limiter.acquire("a") > 0
+        assert await limiter.acquire("b") == 0
+
+    async def test_peek_does_not_consume(self):
+        """Test consultation d'un seau sans débit de jeton."""
+        limiter = TokenBucketLimiter(1, 0.5, clock=FakeClock())
+
+        assert [await limiter.peek("k") for _ in range(3)] == [0, 0, 0]
+        await limiter.acquire("k")
+        assert await limiter.peek("k") == pytest.approx(2.0)
+        assert limiter.stats()["allowed"] == 1
+        assert limiter.stats()["limited"] == 1
+
+
+@pytest.mark.asyncio
+class TestSQLiteTokenBucketLimiter:
+    """Tests des seaux partagés en SQLite."""
+
+    async def test_shared_between_instances(self, tmp_path):
+        """Test deux workers (instances) sur la même base."""
+        clock = FakeClock()
+        path = str(tmp_path / "throttle.db")
+        first = SQLiteTokenBucketLimiter(path, 2, 1.0, clock=clock)
+        second = SQLiteTokenBucketLimiter(path, 2, 1.0, clock=clock)
+
+        assert await first.acquire("k") == 0
+        assert await second.acquire("k") == 0
+        assert await first.acquire("k") == pytest.approx(1.0)
+        clock.now += 1
+        assert await second.acquire("k") == 0
+        first.close()
+        second.close()
+
+    async def test_full_buckets_purged(self, tmp_path):
+        """Test seaux redevenus pleins supprimés de la base."""
+        clock = FakeClock()
+        limiter = SQLiteTokenBucketLimiter(
+            str(tmp_path / "throttle.db"), 2, 1.0, purge_every=3, clock=clock
+        )
+        await limiter.acquire("old")
+        clock.now += 10
+        await limiter.acquire("a")
+        await limiter.acquire("b")
+
+        assert limiter.stats()["purged"] == 1
+        assert limiter.stats()["keys"] == 2
+        limiter.close()
+
+    async def test_peek_does_not_consume(self, tmp_path):
+        """Test consultation d'un seau partagé sans débit de jeton."""
+        clock = FakeClock()
+        limiter = SQLiteTokenBucketLimiter(
+            str(tmp_path / "throttle.db"), 1, 1.0, clock=clock
+        )
+
+        assert await limiter.peek("k") == 0
+        assert await limiter.acquire("k") == 0
+        assert await limiter.peek("k") == pytest.approx(1.0)
+        clock.now += 1
+        assert await limiter.peek("k") == 0
+        limiter.close()
+
+
+class TestLoginEndpoints:
+    """Tests de la limitation sur /auth/login et /auth/login-json."""
+
+    @pytest.fixture
+    def throttle(self, monkeypatch):
+        def use(ip_burst: int, user_burst: int) -> LoginThrottle:
+            throttle = LoginThrottle(
+                TokenBucketLimiter(ip_burst, 0.001),
+                TokenBucketLimiter(user_burst, 0.001),
+            )
+            monkeypatch.setattr(auth, "login_throttle", throttle)
+            return throttle
+
+        return use
+
+    def test_per_user_limit_before_hashing(self, throttle):
+        """Test 429 avec Retry-After sans vérifier le mot de passe."""
+        throttle(ip_burst=100, user_burst=2)
+        for _ in range(2):
+            response = client.post(
+                "/auth/login", data={"username": "admin", "password": "bad"}
+            )
+            assert response.status_code == 401
+
+        verified = auth.password_verifier.stats()
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        assert auth.password_verifier.stats() == verified
+        # Un autre compte depuis la même IP reste accepté
+        other = client.post(
+            "/auth/login-json", json={"username": "nobody", "password": "x"}
+        )
+        assert other.status_code != 429
+
+    def test_successful_logins_not_throttled(self, throttle):
+        """Test connexions réussies : le compte n'est pas débité."""
+        limits = throttle(ip_burst=100, user_burst=5)
+        statuses = [
+            client.post(
+                "/auth/login",
+                data={"username": "admin", "password": "admin123"},
+            ).status_code
+            for _ in range(6)
+        ]
+
+        assert statuses == [200] * 6
+        assert limits.per_user.stats()["allowed"] == 0
+
+    def test_per_ip_limit(self, throttle):
+        """Test rafale sur des comptes différents bornée par l'IP."""
+        limits = throttle(ip_burst=3, user_burst=100)
+        statuses = [
+            client.post(
+                "/auth/login-json",
+                json={"username": f"spray-{i}", "password": "x"},
+            ).status_code
+            for i in range(4)
+        ]
+
+        assert statuses == [401, 401, 401, 429]
+        # Le compte n'est pas débité quand l'IP est refusée
+        assert limits.per_user.stats()["allowed"] == 3
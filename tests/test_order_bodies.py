@@ -0,0 +1,178 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.bodies import (
+    OrderBodyCache,
+    encode_order,
+    entry_size,
+    etag_matches,
+)
+from poshub_api.orders.records import OrderRecord
+from poshub_api.orders.repository import InMemoryOrderRepository
+from poshub_api.orders.schemas import OrderIn, OrderOut
+from poshub_api.orders.service import OrderService
+
+client = TestClient(app)
+
+
+def make_order(order_id: str, amount: float = 19.99) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=datetime(2025, 9, 2, 14, 30, tzinfo=timezone.utc),
+        totalAmount=amount,
+        currency="EUR",
+    )
+
+
+@pytest.mark.asyncio
+class TestOrderBodyCache:
+    """Tests du cache de JSON pré-sérialisé."""
+
+    async def test_serialized_once_on_write(self):
+        """Test lecture servie depuis le JSON calculé à l'écriture."""
+        cache = OrderBodyCache(10)
+        service = OrderService(InMemoryOrderRepository(), body_cache=cache)
+        record = await service.create_order(make_order("body-1"))
+
+        entry = await service.get_order_body("body-1")
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 0
+        expected = OrderOut.model_validate(record, from_attributes=True)
+        assert json.loads(entry.body) == expected.model_dump(mode="json")
+        assert await service.get_order_body("absent") is None
+
+    async def test_rewrite_changes_etag(self):
+        """Test nouvel ETag quand un orderId est réécrit."""
+        repository = InMemoryOrderRepository()
+        cache = OrderBodyCache(10)
+        service = OrderService(repository, body_cache=cache)
+        await service.create_order(make_order("body-2"))
+        first = await service.get_order_body("body-2")
+
+        # Écriture directe dans le dépôt, hors service (autre worker)
+        rewritten = OrderRecord.from_order(make_order("body-2", 5.0))
+        await repository.add(rewritten)
+        second = await service.get_order_body("body-2")
+
+        assert first.etag != second.etag
+        assert json.loads(second.body)["totalAmount"] == 5.0
+
+    async def test_bounded(self):
+        """Test éviction LRU et cache désactivé."""
+        cache = OrderBodyCache(2)
+        for i in range(3):
+            cache.put(make_order(f"lru-{i}"))
+        disabled = OrderBodyCache(0)
+        disabled.put(make_order("off"))
+
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["evictions"] == 1
+        assert disabled.stats()["size"] == 0
+
+    async def test_bounded_in_bytes(self):
+        """Test éviction au-delà du budget en octets."""
+        size = entry_size(encode_order(make_order("bytes-0")))
+        cache = OrderBodyCache(100, max_bytes=size * 3)
+        for i in range(5):
+            cache.put(make_order(f"bytes-{i}"))
+        cache.put(make_order("bytes-4", 5.0))
+
+        stats = cache.stats()
+        assert stats["size"] == 3
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert stats["evictions"] == 2
+
+
+def test_etag_matches():
+    """Test comparaison faible et listes d'ETags."""
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+class TestConditionalGet:
+    """Tests ETag et If-None-Match sur GET /orders/{id}."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+        client.post(
+            "/orders/",
+            json=make_order("etag-1").model_dump(mode="json"),
+            headers=headers,
+        )
+        return headers
+
+    def test_etag_and_304(self, admin_headers):
+        """Test ETag renvoyé puis 304 sans corps."""
+        response = client.get("/orders/etag-1", headers=admin_headers)
+        etag = response.headers["etag"]
+
+        cached = client.get(
+            "/orders/etag-1",
+            headers={**admin_headers, "If-None-Match": etag},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["orderId"] == "etag-1"
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    def test_stale_etag(self, admin_headers):
+        """Test ETag périmé retourne la commande."""
+        response = client.get(
+            "/orders/etag-1",
+            headers={**admin_headers, "If-None-Match": '"stale"'},
+        )
+        assert response.status_code == 200
+
+
+class TestCreateResponse:
+    """Tests de la réponse de création servie sans re-validation."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_create_returns_cached_json(self, admin_headers):
+        """Test corps identique à OrderOut et ETag réutilisé en lecture."""
+        order = make_order("create-raw-1")
+        created = client.post(
+            "/orders/",
+            json=order.model_dump(mode="json"),
+            headers=admin_headers,
+        )
+        read = client.get("/orders/create-raw-1", headers=admin_headers)
+
+        assert created.status_code == 200
+        assert created.json() == OrderOut(**order.model_dump()).model_dump(
+            mode="json"
+        )
+        assert created.headers["etag"] == read.headers["etag"]
+
+    def test_openapi_unchanged(self):
+        """Test schéma de réponse toujours documenté en OrderOut."""
+        paths = client.get("/openapi.json").json()["paths"]
+        for path, method in (
+            ("/orders/", "post"),
+            ("/orders/{order_id}", "get"),
+        ):
+            schema = paths[path][method]["responses"]["200"]["content"][
+                "application/json"
+            ]["schema"]
+            assert schema == {"$ref": "#/components/schemas/OrderOut"}
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders import columns as columns_module
+from poshub_api.orders.columns import AmountColumns, parse_percentiles
+from poshub_api.orders.money import minor_units, to_minor
+from poshub_api.orders.records import OrderRecord
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+client = TestClient(app)
+
+BASE = datetime(2025, 9, 4, 12, 0, tzinfo=timezone.utc)
+START, END = BASE.timestamp(), (BASE + timedelta(days=1)).timestamp()
+
+
+def make_order(order_id: str, amount: float, currency="EUR", minutes=0):
+    return OrderRecord.from_order(
+        OrderIn(
+            orderId=order_id,
+            createdAt=BASE + timedelta(minutes=minutes),
+            totalAmount=amount,
+            currency=currency,
+        )
+    )
+
+
+def test_iso_4217_exponents():
+    """Test exposants ISO 4217 et devise inconnue."""
+    assert minor_units("JPY") == 0
+    assert minor_units("XOF") == 0
+    assert minor_units("KWD") == 3
+    assert minor_units("CLF") == 4
+    assert minor_units("CHF") == 2
+    assert minor_units("XAU") == 2
+    assert to_minor(1.2345, "CLF") == 12345
+
+
+@pytest.mark.asyncio
+async def test_rollup_totals_are_exact():
+    """Test somme exacte là où une somme flottante dérive."""
+    service = OrderService()
+    await service.create_orders(
+        [make_order(f"exact-{i}", 0.1, minutes=i) for i in range(10)]
+    )
+    assert sum([0.1] * 10) != 1.0
+
+    stats = await service.order_stats(BASE, BASE + timedelta(days=1))
+
+    assert stats["totals"]["EUR"]["total"] == 1.0
+    assert stats["totals"]["EUR"]["average"] == 0.1
+
+
+class TestAmountColumns:
+    """Tests des colonnes de montants."""
+
+    def make_columns(self) -> AmountColumns:
+        columns = AmountColumns()
+        for i in range(1, 101):
+            columns.add(make_order(f"col-{i}", float(i), minutes=i))
+        columns.add(make_order("col-jpy", 1500, "JPY", minutes=5))
+        return columns
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_summary(self, numpy, monkeypatch):
+        """Test agrégats et percentiles, avec et sans NumPy."""
+        if not numpy:
+            monkeypatch.setattr(columns_module, "np", None)
+        elif columns_module.np is None:
+            pytest.skip("NumPy non installé")
+
+        summary = self.make_columns().summary(START, END, None, [50, 90])
+
+        assert summary["EUR"]["count"] == 100
+        assert summary["EUR"]["total"] == 5050.0
+        assert summary["EUR"]["min"] == 1.0
+        assert summary["EUR"]["max"] == 100.0
+        assert summary["EUR"]["percentiles"] == {50: 50.5, 90: 90.1}
+        assert summary["JPY"]["total"] == 1500
+
+    def test_window_and_currency(self):
+        """Test fenêtre [start, end) tronquée à la minute et devise."""
+        columns = self.make_columns()
+        start = (BASE + timedelta(minutes=10, seconds=30)).timestamp()
+        end = (BASE + timedelta(minutes=20)).timestamp()
+
+        summary = columns.summary(start, end, "EUR")
+
+        assert list(summary) == ["EUR"]
+        assert summary["EUR"]["count"] == 10
+        assert summary["EUR"]["min"] == 10.0
+
+    def test_rewrite_moves_rows(self):
+        """Test réécriture d'un orderId, y compris changement de devise."""
+        columns = self.make_columns()
+        columns.add(make_order("col-1", 1000.0, minutes=1))
+        columns.add(make_order("col-50", 7.0, "USD", minutes=50))
+
+        summary = columns.summary(START, END)
+
+        assert len(columns) == 101
+        assert summary["EUR"]["count"] == 99
+        assert summary["EUR"]["total"] == 5050.0 - 1 + 1000 - 50
+        assert summary["USD"]["total"] == 7.0
+
+    def test_parse_percentiles(self):
+        """Test analyse du paramètre percentiles."""
+        assert parse_percentiles("50, 99.9") == [50.0, 99.9]
+        assert parse_percentiles(None) == []
+        for value in ("abc", "101", ","):
+            with pytest.raises(ValueError):
+                parse_percentiles(value)
+
+
+class TestStatsPercentiles:
+    """Tests du paramètre percentiles de GET /orders/stats."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+        for i, amount in enumerate((10.0, 20.0, 30.0)):
+            client.post(
+                "/orders/",
+                json={
+                    "orderId": f"pct-{i}",
+                    "createdAt": "2024-02-03T10:00:00Z",
+                    "totalAmount": amount,
+                    "currency": "SEK",
+                },
+                headers=headers,
+            )
+        return headers
+
+    def test_percentiles(self, admin_headers):
+        """Test percentiles par devise."""
+        response = client.get(
+            "/orders/stats",
+            params={
+                "createdFrom": "2024-02-03T00:00:00Z",
+                "createdTo": "2024-02-04T00:00:00Z",
+                "currency": "SEK",
+                "percentiles": "50,100",
+            },
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["percentiles"] == {
+            "SEK": {"p50": 20.0, "p100": 30.0}
+        }
+
+    def test_invalid_percentiles(self, admin_headers):
+        """Test rang invalide retourne 400."""
+        response = client.get(
+            "/orders/stats",
+            params={"percentiles": "150"},
+            headers=admin_headers,
+        )
+        assert response.status_code == 400
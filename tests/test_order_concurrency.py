@@ -0,0 +1,162 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from poshub_api.orders.repository import InMemoryOrderRepository
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+BASE = datetime(2025, 8, 1, tzinfo=timezone.utc)
+
+
+def make_order(i: int, amount: float = 10.0, currency: str = "EUR"):
+    return OrderIn(
+        orderId=f"concurrent-{i}",
+        createdAt=BASE + timedelta(seconds=i * 7),
+        totalAmount=amount,
+        currency=currency,
+    )
+
+
+class SlowRepository(InMemoryOrderRepository):
+    """Dépôt à latence variable avant et après l'écriture effective."""
+
+    async def add(self, order):
+        await asyncio.sleep(random.random() / 1000)
+        await super().add(order)
+        await asyncio.sleep(random.random() / 1000)
+
+
+class ConcurrencyRepository(InMemoryOrderRepository):
+    """Dépôt relevant le nombre maximal d'écritures simultanées."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = self.max_in_flight = 0
+
+    async def add(self, order):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        await super().add(order)
+        self.in_flight -= 1
+
+
+class GatedRepository(InMemoryOrderRepository):
+    """Dépôt dont les écritures attendent une ouverture explicite."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+        self.started = []
+
+    async def add_many(self, orders):
+        orders = list(orders)
+        self.started.extend(order.orderId for order in orders)
+        await self.gate.wait()
+        await super().add_many(orders)
+
+
+async def all_pages(service: OrderService, **filters) -> list[str]:
+    seen, cursor = [], None
+    while True:
+        page, cursor = await service.list_orders(
+            limit=7, cursor=cursor, **filters
+        )
+        seen.extend(order.orderId for order in page)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.asyncio
+class TestConcurrentOrderWrites:
+    """Tests des écritures concurrentes du service."""
+
+    async def test_concurrent_writes_keep_indexes_consistent(self):
+        """Test écritures concurrentes d'un même orderId."""
+        service = OrderService(SlowRepository())
+        await service.list_orders()
+
+        await asyncio.gather(
+            *(
+                service.create_order(make_order(i % 50, 1.0 + j))
+                for j, i in enumerate(range(1000))
+            )
+        )
+
+        stored = {
+            oid: record.totalAmount
+            for oid, record in service.repository.orders.items()
+        }
+        indexed = {oid: service.index.entry(oid)[2] for oid in stored}
+        totals = (await service.order_stats(BASE, BASE + timedelta(days=1)))[
+            "totals"
+        ]["EUR"]
+
+        assert indexed == stored
+        assert totals["count"] == 50
+        assert totals["total"] == pytest.approx(sum(stored.values()))
+
+    async def test_distinct_ids_written_concurrently(self):
+        """Test IDs distincts écrits simultanément, un même ID en série."""
+        repository = ConcurrencyRepository()
+        service = OrderService(repository)
+
+        await asyncio.gather(
+            *(service.create_order(make_order(i)) for i in range(100))
+        )
+        assert repository.max_in_flight == 100
+
+        repository.max_in_flight = 0
+        await asyncio.gather(
+            *(service.create_order(make_order(1, 1.0 + j)) for j in range(10))
+        )
+        assert repository.max_in_flight == 1
+        assert repository.orders["concurrent-1"].totalAmount == 10.0
+        assert service._inflight == {}
+
+    async def test_concurrent_batches_do_not_deadlock(self):
+        """Test lots concurrents partageant des orderId."""
+        service = OrderService()
+        batches = [
+            [make_order(i) for i in random.sample(range(200), 50)]
+            for _ in range(20)
+        ]
+
+        await asyncio.wait_for(
+            asyncio.gather(*(service.create_orders(b) for b in batches)),
+            timeout=5,
+        )
+
+        ids = {order.orderId for batch in batches for order in batch}
+        assert len(await all_pages(service)) == len(ids)
+
+    async def test_cancelled_writer_keeps_the_chain(self):
+        """Test écriture annulée en attente : la suivante attend encore."""
+        repository = GatedRepository()
+        service = OrderService(repository)
+        first = asyncio.create_task(service.create_orders([make_order(1)]))
+        await asyncio.sleep(0)
+        # Attend la première (orderId 1), puis est annulée
+        second = asyncio.create_task(
+            service.create_orders([make_order(1, 2.0), make_order(2)])
+        )
+        # N'attend que la deuxième (orderId 2)
+        third = asyncio.create_task(
+            service.create_orders([make_order(2, 3.0)])
+        )
+        await asyncio.sleep(0)
+        second.cancel()
+        await asyncio.sleep(0.01)
+
+        assert repository.started == ["concurrent-1"]
+        repository.gate.set()
+        await asyncio.gather(first, third, return_exceptions=True)
+
+        assert second.cancelled()
+        assert repository.started == ["concurrent-1", "concurrent-2"]
+        assert repository.orders["concurrent-2"].totalAmount == 3.0
+        await asyncio.sleep(0)
+        assert service._inflight == {}
@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import moto
+import pytest
+import pytest_asyncio
+
+from poshub_api.orders.dynamodb import DynamoDBOrderRepository
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+TABLE = "poshub-orders-test"
+BASE = datetime(2025, 6, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def make_order(
+    order_id: str, amount: float = 10.0, minutes: int = 0, currency="EUR"
+) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=BASE + timedelta(minutes=minutes),
+        totalAmount=amount,
+        currency=currency,
+    )
+
+
+def sorted_index(name: str, partition: str, sort: str = "sortKey") -> dict:
+    return {
+        "IndexName": name,
+        "KeySchema": [
+            {"AttributeName": partition, "KeyType": "HASH"},
+            {"AttributeName": sort, "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+
+
+class FlakyClient:
+    """Client renvoyant une partie des éléments comme non traités."""
+
+    def __init__(self, client):
+        self._client = client
+        self.batch_write_calls = 0
+        self.batch_get_calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def batch_write_item(self, RequestItems):
+        self.batch_write_calls += 1
+        ((table, requests),) = RequestItems.items()
+        if self.batch_write_calls == 1 and len(requests) > 1:
+            half = len(requests) // 2
+            self._client.batch_write_item(
+                RequestItems={table: requests[:half]}
+            )
+            return {"UnprocessedItems": {table: requests[half:]}}
+        return self._client.batch_write_item(RequestItems=RequestItems)
+
+    def batch_get_item(self, RequestItems):
+        self.batch_get_calls += 1
+        ((table, request),) = RequestItems.items()
+        if self.batch_get_calls == 1 and len(request["Keys"]) > 1:
+            half = len(request["Keys"]) // 2
+            response = self._client.batch_get_item(
+                RequestItems={
+                    table: {**request, "Keys": request["Keys"][:half]}
+                }
+            )
+            response["UnprocessedKeys"] = {
+                table: {**request, "Keys": request["Keys"][half:]}
+            }
+            return response
+        return self._client.batch_get_item(RequestItems=RequestItems)
+
+
+@pytest.fixture
+def dynamodb_client(monkeypatch):
+    """Client DynamoDB local (moto) avec une table de commandes."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("dynamodb", region_name="eu-north-1")
+        client.create_table(
+            TableName=TABLE,
+            BillingMode="PAY_PER_REQUEST",
+            AttributeDefinitions=[
+                {"AttributeName": name, "AttributeType": "S"}
+                for name in (
+                    "orderId",
+                    "timeShard",
+                    "currency",
+                    "sortKey",
+                    "rollup",
+                    "bucketKey",
+                )
+            ],
+            KeySchema=[{"AttributeName": "orderId", "KeyType": "HASH"}],
+            GlobalSecondaryIndexes=[
+                sorted_index("byCreatedAt", "timeShard"),
+                sorted_index("byCurrency", "currency"),
+                sorted_index("byRollup", "rollup", "bucketKey"),
+            ],
+        )
+        yield client
+
+
+@pytest_asyncio.fixture
+async def repository(dynamodb_client):
+    return DynamoDBOrderRepository(
+        TABLE, client=dynamodb_client, consistent_read=True
+    )
+
+
+@pytest.mark.asyncio
+class TestDynamoDBOrderRepository:
+    """Tests du dépôt DynamoDB sur moto."""
+
+    async def test_add_and_get(self, repository):
+        """Test écriture puis lecture cohérente d'une commande."""
+        order = make_order("ddb-1", 19.99)
+        await repository.add(order)
+
+        assert await repository.get("ddb-1") == order
+        assert await repository.get("missing") is None
+
+    async def test_add_many_and_get_many(self, repository):
+        """Test écriture et lecture par lots au-delà des limites d'API."""
+        orders = [make_order(f"bulk-{i}", i + 1) for i in range(260)]
+        await repository.add_many(orders + [make_order("bulk-0", 99.0)])
+
+        found = await repository.get_many(
+            [f"bulk-{i}" for i in range(260)] + ["missing"]
+        )
+
+        assert len(found) == 260
+        assert found["bulk-0"].totalAmount == 99.0
+        assert await repository.count() == 260
+
+    async def test_scan_pages(self, repository):
+        """Test parcours paginé de la table."""
+        await repository.add_many(make_order(f"scan-{i}") for i in range(30))
+
+        batches = [batch async for batch in repository.scan(batch_size=7)]
+
+        assert sum(len(batch) for batch in batches) == 30
+        assert max(len(batch) for batch in batches) <= 7
+
+    async def test_unprocessed_items_are_retried(self, dynamodb_client):
+        """Test relance des éléments et clés non traités."""
+        client = FlakyClient(dynamodb_client)
+        repository = DynamoDBOrderRepository(
+            TABLE, client=client, consistent_read=True, base_delay=0
+        )
+
+        await repository.add_many(make_order(f"retry-{i}") for i in range(20))
+        found = await repository.get_many(f"retry-{i}" for i in range(20))
+
+        assert len(found) == 20
+        assert client.batch_write_calls == 2
+        # Lecture préalable des commandes remplacées (relancée), puis lecture
+        assert client.batch_get_calls == 3
+
+    async def test_query_pages_across_time_shards(self, repository):
+        """Test pages triées par createdAt, fusionnées entre partitions."""
+        await repository.add_many(
+            make_order(f"q-{i}", i + 1, minutes=i) for i in reversed(range(25))
+        )
+
+        seen, after = [], None
+        while True:
+            orders, after = await repository.query(
+                created_from=BASE + timedelta(minutes=2),
+                created_to=BASE + timedelta(minutes=22),
+                after=after,
+                limit=7,
+            )
+            assert len(orders) <= 7
+            seen.extend(order.orderId for order in orders)
+            if after is None:
+                break
+
+        assert seen == [f"q-{i}" for i in range(2, 22)]
+
+    async def test_query_currency_and_amount(self, repository):
+        """Test index par devise et filtre de montant (page bornée)."""
+        await repository.add_many(
+            make_order(f"c-{i}", i + 1, i, "EUR" if i % 2 else "USD")
+            for i in range(20)
+        )
+
+        seen, after = [], None
+        while True:
+            orders, after = await repository.query(
+                currency="EUR", min_amount=12, after=after, limit=3
+            )
+            seen.extend(order.orderId for order in orders)
+            if after is None:
+                break
+
+        assert seen == ["c-11", "c-13", "c-15", "c-17", "c-19"]
+
+    async def test_service_reads_from_table(self, dynamodb_client):
+        """Test écritures d'un autre conteneur visibles en liste et stats."""
+        writer = OrderService(
+            DynamoDBOrderRepository(TABLE, client=dynamodb_client)
+        )
+        reader = OrderService(
+            DynamoDBOrderRepository(TABLE, client=dynamodb_client)
+        )
+        await writer.create_order(make_order("w-1", 10.0))
+        await reader.list_orders()
+        await writer.create_order(make_order("w-2", 5.5, minutes=1))
+
+        orders, cursor = await reader.list_orders()
+        stats = await reader.order_stats(
+            BASE, BASE + timedelta(hours=1), percentiles=[50]
+        )
+
+        assert [order.orderId for order in orders] == ["w-1", "w-2"]
+        assert cursor is None
+        assert stats["totals"]["EUR"]["count"] == 2
+        assert stats["totals"]["EUR"]["total"] == 15.5
+
+    async def test_stats_from_rollup_items(self, dynamodb_client):
+        """Test statistiques lues dans les seaux, comme en mémoire."""
+        repository = DynamoDBOrderRepository(TABLE, client=dynamodb_client)
+        service, reference = OrderService(repository), OrderService()
+        orders = [
+            make_order(
+                f"r-{i}", 1.0 + i % 7, i * 37, "EUR" if i % 3 else "USD"
+            )
+            for i in range(80)
+        ]
+        # Remplacements : montant, minute et devise changent
+        replaced = [
+            make_order("r-0", 50.0, 5, "USD"),
+            make_order("r-7", 0.5, 7 * 37),
+        ]
+        for target in (service, reference):
+            await target.create_orders(orders[:40])
+            for order in orders[40:]:
+                await target.create_order(order)
+            await target.create_orders(replaced)
+            await target.create_order(make_order("r-3", 1.0 + 3 % 7, 3 * 37))
+
+        calls = []
+        query = dynamodb_client.query
+        dynamodb_client.query = lambda **kw: calls.append(kw) or query(**kw)
+        for window, granularity in (
+            ((BASE, BASE + timedelta(days=2)), "hour"),
+            ((BASE + timedelta(minutes=13), BASE + timedelta(hours=30)), None),
+        ):
+            stats = await service.order_stats(*window, granularity=granularity)
+            expected = await reference.order_stats(
+                *window, granularity=granularity
+            )
+            assert stats["totals"] == expected["totals"]
+            assert stats["buckets"] == expected["buckets"]
+        dynamodb_client.query = query
+
+        # Lecture des seaux seulement : pas d'index des commandes
+        assert {call["IndexName"] for call in calls} == {"byRollup"}
+        assert len(calls) <= 8
+        assert await repository.count() == 80
+        assert (
+            await repository.get(f"#rollup#60#EUR#{int(BASE.timestamp())}")
+            is None
+        )
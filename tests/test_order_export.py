@@ -0,0 +1,143 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.export import encode_pages, gzip_stream
+from poshub_api.orders.router import _export_pages
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+client = TestClient(app)
+
+BASE = datetime(2025, 4, 1, tzinfo=timezone.utc)
+
+
+def make_order(i: int, currency: str = "EUR") -> OrderIn:
+    return OrderIn(
+        orderId=f"exp-{i}",
+        createdAt=BASE + timedelta(minutes=i),
+        totalAmount=i + 0.5,
+        currency=currency,
+    )
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+class FakeRequest:
+    """Requête se déconnectant après un nombre donné de vérifications."""
+
+    def __init__(self, connected_checks: int):
+        self.connected_checks = connected_checks
+
+    async def is_disconnected(self) -> bool:
+        self.connected_checks -= 1
+        return self.connected_checks < 0
+
+
+@pytest.mark.asyncio
+class TestOrderExport:
+    """Tests du parcours paginé et de la sérialisation en flux."""
+
+    async def test_iter_orders_pages(self):
+        """Test pages bornées, triées par createdAt et filtrées."""
+        service = OrderService()
+        await service.create_orders(
+            [make_order(i, "EUR" if i % 2 else "USD") for i in range(25)]
+        )
+
+        pages = [
+            page
+            async for page in service.iter_orders(currency="EUR", page_size=4)
+        ]
+
+        assert max(len(page) for page in pages) == 4
+        assert [o.orderId for page in pages for o in page] == [
+            f"exp-{i}" for i in range(1, 25, 2)
+        ]
+
+    async def test_csv_gzip_round_trip(self):
+        """Test CSV compressé à la volée puis décompressé."""
+        service = OrderService()
+        await service.create_orders([make_order(i) for i in range(10)])
+
+        body = await collect(
+            gzip_stream(encode_pages(service.iter_orders(page_size=3), "csv"))
+        )
+        rows = list(
+            csv.DictReader(io.StringIO(gzip.decompress(body).decode()))
+        )
+
+        assert len(rows) == 10
+        assert rows[0]["orderId"] == "exp-0"
+        assert float(rows[9]["totalAmount"]) == 9.5
+
+    async def test_stops_when_client_disconnects(self):
+        """Test arrêt du parcours à la déconnexion du client."""
+        service = OrderService()
+        await service.create_orders([make_order(i) for i in range(10)])
+
+        pages = _export_pages(
+            FakeRequest(connected_checks=2),
+            service.iter_orders(page_size=2),
+            "admin",
+        )
+        body = await collect(encode_pages(pages, "ndjson"))
+
+        assert len(body.splitlines()) == 4
+
+
+class TestExportEndpoint:
+    """Tests pour GET /orders/export."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_export_ndjson_gzip(self, admin_headers):
+        """Test export NDJSON compressé filtré par devise."""
+        for i in range(3):
+            order = make_order(i, "CHF").model_dump(mode="json")
+            client.post("/orders/", json=order, headers=admin_headers)
+
+        response = client.get(
+            "/orders/export",
+            params={"currency": "CHF", "gzip": "true"},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "orders.ndjson.gz" in response.headers["content-disposition"]
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["orderId"] for line in lines] == [
+            "exp-0",
+            "exp-1",
+            "exp-2",
+        ]
+
+    def test_export_csv(self, admin_headers):
+        """Test export CSV avec en-tête."""
+        response = client.get(
+            "/orders/export", params={"format": "csv"}, headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.text.splitlines()[0] == (
+            "orderId,createdAt,totalAmount,currency"
+        )
+
+    def test_export_requires_auth(self):
+        """Test export sans authentification."""
+        assert client.get("/orders/export").status_code in (401, 403)
@@ -0,0 +1,194 @@
+import asyncio
+import errno
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from poshub_api.orders.journal import (
+    LOG_FILE,
+    ROTATED_LOG_FILE,
+    JournaledOrderRepository,
+)
+from poshub_api.orders.schemas import OrderIn
+
+
+class FailingLog:
+    """Journal dont l'écriture s'interrompt à mi-chemin (disque plein)."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def write(self, data: bytes) -> None:
+        self.log.write(data[: len(data) // 2])
+        self.log.flush()
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def close(self) -> None:
+        self.log.close()
+
+
+def make_order(order_id: str, amount: float = 10.0) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=datetime(2025, 4, 1, 9, 0, tzinfo=timezone.utc),
+        totalAmount=amount,
+        currency="EUR",
+    )
+
+
+@pytest.mark.asyncio
+class TestJournaledOrderRepository:
+    """Tests du journal append-only et des snapshots."""
+
+    async def test_recovers_from_log(self, tmp_path):
+        """Test reconstruction de l'état à partir du journal seul."""
+        repo = JournaledOrderRepository(str(tmp_path), snapshot_every=1000)
+        await repo.add(make_order("j-1", 1.0))
+        await repo.add(make_order("j-1", 2.0))
+        await repo.add(make_order("j-2"))
+        # Arrêt brutal : pas de close(), donc pas de snapshot final
+        repo._io.shutdown(wait=True)
+
+        reopened = JournaledOrderRepository(str(tmp_path))
+        assert await reopened.count() == 2
+        assert (await reopened.get("j-1")).totalAmount == 2.0
+        await reopened.close()
+
+    async def test_snapshot_truncates_log(self, tmp_path):
+        """Test qu'un snapshot compacte l'état et vide le journal."""
+        repo = JournaledOrderRepository(str(tmp_path), snapshot_every=10)
+        for i in range(25):
+            await repo.add(make_order(f"s-{i}"))
+            # Snapshot en tâche de fond : attendu pour un compte exact
+            await repo._drain()
+
+        assert repo.stats()["snapshots"] == 2
+        assert os.path.getsize(tmp_path / LOG_FILE) < 25 * 50
+        await repo.close()
+
+        reopened = JournaledOrderRepository(str(tmp_path))
+        assert await reopened.count() == 25
+        await reopened.close()
+
+    async def test_concurrent_writes_share_fsync(self, tmp_path):
+        """Test group commit : moins de fsync que d'écritures."""
+        repo = JournaledOrderRepository(str(tmp_path))
+
+        await asyncio.gather(
+            *(repo.add(make_order(f"g-{i}")) for i in range(200))
+        )
+
+        stats = repo.stats()
+        assert stats["records"] == 200
+        assert stats["fsyncs"] < 200
+        await repo.close()
+
+    async def test_truncated_last_record_is_ignored(self, tmp_path):
+        """Test qu'une écriture interrompue n'empêche pas le redémarrage."""
+        repo = JournaledOrderRepository(str(tmp_path))
+        await repo.add(make_order("t-1"))
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+        with open(tmp_path / LOG_FILE, "ab") as f:
+            f.write(b'["t-2","2025-04-01T09:0')
+
+        reopened = JournaledOrderRepository(str(tmp_path))
+        await reopened.add(make_order("t-3"))
+        reopened._io.shutdown(wait=True)
+        reopened._log.close()
+
+        final = JournaledOrderRepository(str(tmp_path))
+        assert sorted(final.orders) == ["t-1", "t-3"]
+        await final.close()
+
+    async def test_failed_append_is_rolled_back(self, tmp_path):
+        """Test ajout en échec retiré du journal, les suivants relisibles."""
+        repo = JournaledOrderRepository(str(tmp_path))
+        await repo.add(make_order("r-1"))
+        repo._log = FailingLog(repo._log)
+
+        with pytest.raises(OSError):
+            await repo.add(make_order("r-2"))
+        await repo.add(make_order("r-3"))
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+
+        assert repo.stats()["rollbacks"] == 1
+        reopened = JournaledOrderRepository(str(tmp_path))
+        assert sorted(reopened.orders) == ["r-1", "r-3"]
+        assert reopened.stats()["skipped"] == 0
+        await reopened.close()
+
+    async def test_undecodable_record_is_skipped(self, tmp_path):
+        """Test ligne corrompue signalée sans bloquer le démarrage."""
+        repo = JournaledOrderRepository(str(tmp_path))
+        await repo.add(make_order("c-1"))
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+        with open(tmp_path / LOG_FILE, "ab") as f:
+            f.write(b'["c-2",\xff garbage]\n')
+        repo = JournaledOrderRepository(str(tmp_path))
+        await repo.add(make_order("c-3"))
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+
+        reopened = JournaledOrderRepository(str(tmp_path))
+        assert sorted(reopened.orders) == ["c-1", "c-3"]
+        assert reopened.stats()["skipped"] == 1
+        await reopened.close()
+
+    async def test_snapshot_off_the_commit_path(self, tmp_path):
+        """Test écritures acquittées pendant l'écriture d'un snapshot."""
+        repo = JournaledOrderRepository(str(tmp_path), snapshot_every=5)
+        release = threading.Event()
+        write_snapshot = repo._write_snapshot
+
+        def slow_snapshot(orders):
+            release.wait(5)
+            write_snapshot(orders)
+
+        repo._write_snapshot = slow_snapshot
+        for i in range(5):
+            await repo.add(make_order(f"b-{i}"))
+        await repo._flush_task
+        assert repo._snapshot_running()
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(repo.add(make_order(f"b-{i}")) for i in range(5, 12))
+            ),
+            timeout=1,
+        )
+        assert os.path.exists(tmp_path / ROTATED_LOG_FILE)
+        release.set()
+        await repo._drain()
+
+        assert repo.stats()["snapshots"] == 1
+        assert not os.path.exists(tmp_path / ROTATED_LOG_FILE)
+        # Arrêt brutal : snapshot des 5 premières, journal des suivantes
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+        reopened = JournaledOrderRepository(str(tmp_path))
+        assert await reopened.count() == 12
+        await reopened.close()
+
+    async def test_rotated_log_replayed_if_snapshot_missing(self, tmp_path):
+        """Test arrêt avant la fin du snapshot : journal renommé rejoué."""
+        repo = JournaledOrderRepository(str(tmp_path), snapshot_every=3)
+        repo._write_snapshot = lambda orders: None
+        for i in range(5):
+            await repo.add(make_order(f"m-{i}"))
+        await repo._drain()
+        repo._io.shutdown(wait=True)
+        repo._log.close()
+
+        assert os.path.exists(tmp_path / ROTATED_LOG_FILE)
+        reopened = JournaledOrderRepository(str(tmp_path), snapshot_every=3)
+        assert await reopened.count() == 5
+        await reopened.close()
+        final = JournaledOrderRepository(str(tmp_path))
+        assert await final.count() == 5
+        assert not os.path.exists(tmp_path / ROTATED_LOG_FILE)
+        await final.close()
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.exceptions import InvalidCursorException
+from poshub_api.orders.indexes import (
+    OrderIndex,
+    decode_cursor,
+    encode_cursor,
+)
+from poshub_api.orders.schemas import OrderIn
+
+client = TestClient(app)
+
+BASE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def make_order(i: int, currency: str = "EUR", minutes: int = None) -> OrderIn:
+    return OrderIn(
+        orderId=f"idx-{i}",
+        createdAt=BASE + timedelta(minutes=i if minutes is None else minutes),
+        totalAmount=i + 1,
+        currency=currency,
+    )
+
+
+class TestOrderIndex:
+    """Tests de l'index temporel et par devise."""
+
+    def test_pages_follow_created_at_order(self):
+        """Test pagination par curseur sans doublon ni omission."""
+        index = OrderIndex()
+        for i in reversed(range(25)):
+            index.add(make_order(i))
+
+        seen, after = [], None
+        while True:
+            page, after = index.query(after=after, limit=10)
+            seen.extend(page)
+            if after is None:
+                break
+
+        assert seen == [f"idx-{i}" for i in range(25)]
+
+    def test_filters(self):
+        """Test filtres sur la période, la devise et le montant."""
+        index = OrderIndex()
+        for i in range(20):
+            index.add(make_order(i, "EUR" if i % 2 else "USD"))
+
+        page, _ = index.query(
+            created_from=BASE + timedelta(minutes=5),
+            created_to=BASE + timedelta(minutes=12),
+            currency="EUR",
+            min_amount=7,
+        )
+
+        assert page == ["idx-7", "idx-9", "idx-11"]
+
+    def test_selective_filter_scan_is_bounded(self):
+        """Test filtre de montant sélectif : parcours borné, reprise."""
+        index = OrderIndex()
+        for i in range(50):
+            index.add(make_order(i))
+
+        pages, after = [], None
+        while True:
+            page, after = index.query(
+                limit=10, min_amount=46, after=after, max_scan=8
+            )
+            pages.append(page)
+            if after is None:
+                break
+
+        assert len(pages) > 1
+        assert all(len(page) <= 10 for page in pages)
+        assert [oid for page in pages for oid in page] == [
+            f"idx-{i}" for i in range(45, 50)
+        ]
+
+    def test_replaced_order_is_reindexed(self):
+        """Test qu'une commande remplacée ne laisse pas d'ancienne entrée."""
+        index = OrderIndex()
+        index.add(make_order(1, "EUR"))
+        index.add(make_order(1, "USD", minutes=30))
+
+        assert index.query(currency="EUR")[0] == []
+        assert index.query()[0] == ["idx-1"]
+        assert len(index) == 1
+
+    def test_cursor_round_trip(self):
+        """Test encodage et décodage du curseur opaque."""
+        key = (1740787200.0, "idx-1")
+        assert decode_cursor(encode_cursor(key)) == key
+        with pytest.raises(InvalidCursorException):
+            decode_cursor("not-a-cursor")
+
+
+class TestListOrdersEndpoint:
+    """Tests pour GET /orders."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_list_with_cursor(self, admin_headers):
+        """Test parcours de deux pages filtrées par devise."""
+        for i in range(3):
+            order = make_order(i, "JPY").model_dump(mode="json")
+            client.post("/orders/", json=order, headers=admin_headers)
+
+        first = client.get(
+            "/orders/",
+            params={"currency": "JPY", "limit": 2},
+            headers=admin_headers,
+        ).json()
+        second = client.get(
+            "/orders/",
+            params={"currency": "JPY", "cursor": first["nextCursor"]},
+            headers=admin_headers,
+        ).json()
+
+        assert [o["orderId"] for o in first["items"]] == ["idx-0", "idx-1"]
+        assert [o["orderId"] for o in second["items"]] == ["idx-2"]
+        assert second["nextCursor"] is None
+
+    def test_invalid_cursor_400(self, admin_headers):
+        """Test curseur invalide retourne 400."""
+        response = client.get(
+            "/orders/", params={"cursor": "garbage"}, headers=admin_headers
+        )
+        assert response.status_code == 400
@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders import router as orders_router
+from poshub_api.orders.repository import InMemoryOrderRepository
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+client = TestClient(app)
+
+
+def make_order(order_id: str) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=datetime(2025, 9, 1, 8, 0, tzinfo=timezone.utc),
+        totalAmount=12.5,
+        currency="EUR",
+    )
+
+
+class CountingRepository(InMemoryOrderRepository):
+    """Dépôt comptant les allers-retours de lecture."""
+
+    def __init__(self):
+        super().__init__()
+        self.get_many_calls = 0
+
+    async def get_many(self, order_ids):
+        self.get_many_calls += 1
+        return await super().get_many(order_ids)
+
+
+@pytest.mark.asyncio
+async def test_get_orders_single_round_trip():
+    """Test résolution en un appel, ordre conservé, doublons retirés."""
+    repository = CountingRepository()
+    service = OrderService(repository)
+    await service.create_orders([make_order("lk-1"), make_order("lk-2")])
+
+    orders, missing = await service.get_orders(
+        ["lk-2", "nope", "lk-1", "lk-2"]
+    )
+
+    assert [order.orderId for order in orders] == ["lk-2", "lk-1"]
+    assert missing == ["nope"]
+    assert repository.get_many_calls == 1
+
+
+class TestLookupEndpoints:
+    """Tests pour POST /orders/lookup et GET /orders?ids=."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+        for order_id in ("lookup-1", "lookup-2"):
+            client.post(
+                "/orders/",
+                json=make_order(order_id).model_dump(mode="json"),
+                headers=headers,
+            )
+        return headers
+
+    def test_post_lookup(self, admin_headers):
+        """Test recherche groupée avec IDs trouvés et manquants."""
+        response = client.post(
+            "/orders/lookup",
+            json={"ids": ["lookup-1", "unknown", "lookup-2"]},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [o["orderId"] for o in body["items"]] == [
+            "lookup-1",
+            "lookup-2",
+        ]
+        assert body["missing"] == ["unknown"]
+
+    def test_get_with_ids(self, admin_headers):
+        """Test IDs répétés et séparés par des virgules."""
+        response = client.get(
+            "/orders/?ids=lookup-1,unknown&ids=lookup-2",
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["items"]) == 2
+        assert body["missing"] == ["unknown"]
+
+    def test_too_many_ids(self, admin_headers, monkeypatch):
+        """Test limite configurable du nombre d'IDs."""
+        monkeypatch.setattr(orders_router, "LOOKUP_MAX_IDS", 2)
+
+        response = client.post(
+            "/orders/lookup",
+            json={"ids": ["a", "b", "c"]},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 400
+
+    def test_lookup_requires_auth(self):
+        """Test recherche sans authentification."""
+        response = client.post("/orders/lookup", json={"ids": ["x"]})
+        assert response.status_code in (401, 403)
+
+    def test_openapi_schema(self):
+        """Test documentation des deux formes de réponse."""
+        schema = client.get("/openapi.json").json()
+        assert "/orders/lookup" in schema["paths"]
+        assert "OrderLookup" in schema["components"]["schemas"]
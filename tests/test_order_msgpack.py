@@ -0,0 +1,172 @@
+from datetime import datetime, timezone
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.ingest import BatchFormatError, iter_msgpack_items
+from poshub_api.orders.negotiation import accepts_msgpack
+
+client = TestClient(app)
+
+MSGPACK = "application/msgpack"
+CREATED = datetime(2025, 9, 3, 10, 0, tzinfo=timezone.utc)
+
+
+def pack_order(order_id: str, amount: float = 8.5) -> bytes:
+    return msgpack.packb(
+        {
+            "orderId": order_id,
+            "createdAt": CREATED,
+            "totalAmount": amount,
+            "currency": "EUR",
+        },
+        datetime=True,
+    )
+
+
+def unpack(response):
+    return msgpack.unpackb(response.content, timestamp=3)
+
+
+async def chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (MSGPACK, True),
+        ("application/json, application/x-msgpack", True),
+        ("application/msgpack;q=0.5, application/json", False),
+        ("application/msgpack;q=0", False),
+        ("*/*", False),
+        (None, False),
+    ],
+)
+def test_accepts_msgpack(accept, expected):
+    """Test négociation selon Accept et les qualités."""
+    assert accepts_msgpack(accept) is expected
+
+
+@pytest.mark.asyncio
+async def test_iter_msgpack_items_split_chunks():
+    """Test objets coupés entre plusieurs fragments, puis corps tronqué."""
+    data = b"".join(pack_order(f"mp-{i}") for i in range(3))
+
+    items = [item async for item in iter_msgpack_items(chunks(data, 7))]
+    assert [index for index, _ in items] == [1, 2, 3]
+    assert items[2][1]["orderId"] == "mp-2"
+
+    with pytest.raises(BatchFormatError):
+        async for _ in iter_msgpack_items(chunks(data[:-3], 7)):
+            pass
+
+
+class TestMsgPackEndpoints:
+    """Tests des endpoints de commandes en MessagePack."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_create_and_get(self, admin_headers):
+        """Test création en MessagePack puis lecture négociée."""
+        headers = {**admin_headers, "Content-Type": MSGPACK, "Accept": MSGPACK}
+        created = client.post(
+            "/orders/", content=pack_order("mp-create"), headers=headers
+        )
+        as_json = client.get("/orders/mp-create", headers=admin_headers)
+        read = client.get(
+            "/orders/mp-create", headers={**admin_headers, "Accept": MSGPACK}
+        )
+
+        assert created.status_code == 200
+        assert created.headers["content-type"] == MSGPACK
+        assert unpack(created) == unpack(read)
+        assert unpack(read)["createdAt"] == CREATED
+        assert as_json.json()["totalAmount"] == 8.5
+        assert read.headers["etag"] != as_json.headers["etag"]
+        assert read.headers["vary"] == "Accept, Accept-Encoding"
+
+    def test_conditional_get(self, admin_headers):
+        """Test 304 avec l'ETag de la représentation MessagePack."""
+        headers = {**admin_headers, "Content-Type": MSGPACK}
+        client.post("/orders/", content=pack_order("mp-etag"), headers=headers)
+        headers = {**admin_headers, "Accept": MSGPACK}
+        etag = client.get("/orders/mp-etag", headers=headers).headers["etag"]
+
+        cached = client.get(
+            "/orders/mp-etag", headers={**headers, "If-None-Match": etag}
+        )
+        json_etag = client.get(
+            "/orders/mp-etag",
+            headers={**admin_headers, "If-None-Match": etag},
+        )
+
+        assert cached.status_code == 304
+        assert json_etag.status_code == 200
+
+    def test_validation_and_decode_errors(self, admin_headers):
+        """Test validation OrderIn (422) et corps illisible (400)."""
+        headers = {**admin_headers, "Content-Type": MSGPACK}
+        invalid = client.post(
+            "/orders/", content=pack_order("mp-bad", -1), headers=headers
+        )
+        garbage = client.post("/orders/", content=b"\xc1", headers=headers)
+
+        assert invalid.status_code == 422
+        assert invalid.json()["detail"][0]["loc"] == ["body", "totalAmount"]
+        assert garbage.status_code == 400
+
+    def test_list_and_lookup(self, admin_headers):
+        """Test page et recherche groupée en MessagePack."""
+        headers = {**admin_headers, "Content-Type": MSGPACK}
+        client.post("/orders/", content=pack_order("mp-list"), headers=headers)
+        headers = {**admin_headers, "Accept": MSGPACK}
+
+        page = client.get(
+            "/orders/", params={"fields": "orderId"}, headers=headers
+        )
+        lookup = client.post(
+            "/orders/lookup",
+            json={"ids": ["mp-list", "nope"]},
+            headers=headers,
+        )
+
+        assert {"orderId": "mp-list"} in unpack(page)["items"]
+        assert "nextCursor" in unpack(page)
+        assert unpack(lookup)["missing"] == ["nope"]
+        assert unpack(lookup)["items"][0]["createdAt"] == CREATED
+
+    def test_batch(self, admin_headers):
+        """Test ingestion d'une suite d'objets et rapport MessagePack."""
+        body = pack_order("mp-batch-1") + pack_order("mp-batch-2", 0)
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={
+                **admin_headers,
+                "Content-Type": MSGPACK,
+                "Accept": MSGPACK,
+            },
+        )
+
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(response.content)
+        report = list(unpacker)
+        assert response.headers["content-type"] == MSGPACK
+        assert [entry.get("status") for entry in report[:2]] == [
+            "created",
+            "rejected",
+        ]
+        assert report[-1]["summary"] == {
+            "created": 1,
+            "rejected": 1,
+            "error": 0,
+        }
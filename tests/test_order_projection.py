@@ -0,0 +1,122 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.projection import parse_fields, projection
+from poshub_api.orders.records import OrderRecord
+from poshub_api.orders.schemas import OrderIn, OrderOut
+
+client = TestClient(app)
+
+ORDER = OrderIn(
+    orderId='proj-"1"',
+    createdAt=datetime(2025, 10, 1, 9, 15, tzinfo=timezone.utc),
+    totalAmount=42.5,
+    currency="EUR",
+)
+
+
+class TestOrderProjection:
+    """Tests des sérialiseurs projetés."""
+
+    def test_parse_fields_is_canonical_and_cached(self):
+        """Test ordre canonique et cache par ensemble de champs."""
+        first = parse_fields("totalAmount, orderId")
+        second = parse_fields("orderId,totalAmount")
+
+        assert first is second
+        assert first.fields == ("orderId", "totalAmount")
+        assert parse_fields(None) is None
+
+    @pytest.mark.parametrize("value", ["", "orderId,unknown", " , "])
+    def test_invalid_fields(self, value):
+        """Test champs inconnus ou vides."""
+        with pytest.raises(ValueError):
+            parse_fields(value)
+
+    def test_full_projection_matches_order_out(self):
+        """Test sortie identique à OrderOut pour tous les champs."""
+        record = OrderRecord.from_order(ORDER)
+        expected = OrderOut.model_validate(
+            record, from_attributes=True
+        ).model_dump(mode="json")
+
+        assert json.loads(projection().to_json(record)) == expected
+        assert projection().to_dict(record) == expected
+
+    def test_sparse_projection(self):
+        """Test encodage limité aux champs demandés."""
+        fields = parse_fields("orderId,totalAmount")
+
+        assert json.loads(fields.to_json(ORDER)) == {
+            "orderId": 'proj-"1"',
+            "totalAmount": 42.5,
+        }
+
+
+class TestFieldsParameter:
+    """Tests du paramètre fields sur les endpoints de lecture."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+        client.post(
+            "/orders/", json=ORDER.model_dump(mode="json"), headers=headers
+        )
+        return headers
+
+    def test_get_order_fields(self, admin_headers):
+        """Test lecture d'une commande projetée."""
+        response = client.get(
+            "/orders/proj-%221%22",
+            params={"fields": "totalAmount"},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"totalAmount": 42.5}
+
+    def test_list_and_lookup_fields(self, admin_headers):
+        """Test liste et recherche groupée projetées."""
+        page = client.get(
+            "/orders/",
+            params={"fields": "orderId", "currency": "EUR", "limit": 1000},
+            headers=admin_headers,
+        ).json()
+        lookup = client.post(
+            "/orders/lookup?fields=currency",
+            json={"ids": ['proj-"1"', "missing"]},
+            headers=admin_headers,
+        ).json()
+
+        assert all(set(item) == {"orderId"} for item in page["items"])
+        assert "nextCursor" in page
+        assert lookup == {
+            "items": [{"currency": "EUR"}],
+            "missing": ["missing"],
+        }
+
+    def test_export_fields(self, admin_headers):
+        """Test colonnes d'export projetées."""
+        response = client.get(
+            "/orders/export",
+            params={"format": "csv", "fields": "orderId,currency"},
+            headers=admin_headers,
+        )
+
+        assert response.text.splitlines()[0] == "orderId,currency"
+
+    def test_invalid_fields_400(self, admin_headers):
+        """Test champ inconnu retourne 400."""
+        response = client.get(
+            "/orders/", params={"fields": "password"}, headers=admin_headers
+        )
+        assert response.status_code == 400
@@ -0,0 +1,131 @@
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.indexes import to_epoch
+from poshub_api.orders.money import (
+    from_minor,
+    is_exact_minor,
+    minor_units,
+    to_minor,
+)
+from poshub_api.orders.records import OrderRecord
+from poshub_api.orders.schemas import OrderIn
+
+client = TestClient(app)
+
+
+def make_order(created_at: datetime, amount=19.99, currency="EUR"):
+    return OrderIn(
+        orderId="rec-1",
+        createdAt=created_at,
+        totalAmount=amount,
+        currency=currency,
+    )
+
+
+class TestMoney:
+    """Tests des montants en unités mineures."""
+
+    def test_minor_units_per_currency(self):
+        """Test décimales selon la devise."""
+        assert minor_units("EUR") == 2
+        assert minor_units("JPY") == 0
+        assert minor_units("KWD") == 3
+
+    def test_round_trip(self):
+        """Test conversion aller-retour sans erreur d'arrondi."""
+        assert to_minor(19.99, "EUR") == 1999
+        assert from_minor(1999, "EUR") == 19.99
+        assert to_minor(1.234, "KWD") == 1234
+        assert to_minor(1500.4, "JPY") == 1500
+
+    def test_exact_minor(self):
+        """Test montants exprimables ou non en unités mineures."""
+        assert is_exact_minor(19.99, "EUR")
+        assert is_exact_minor(1.234, "KWD")
+        assert not is_exact_minor(0.001, "EUR")
+        assert not is_exact_minor(1500.4, "JPY")
+
+
+class TestOrderRecord:
+    """Tests de la représentation compacte des commandes."""
+
+    @pytest.mark.parametrize(
+        "created_at",
+        [
+            datetime(2025, 6, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+            datetime(2025, 6, 1, 12, 0, tzinfo=timezone(timedelta(hours=2))),
+            datetime(2025, 6, 1, 10, 0),
+        ],
+    )
+    def test_round_trip(self, created_at):
+        """Test restitution exacte de la date, du fuseau et du montant."""
+        order = make_order(created_at)
+        record = OrderRecord.from_order(order)
+
+        assert record.createdAt == created_at
+        assert record.createdAt.utcoffset() == created_at.utcoffset()
+        assert record.totalAmount == 19.99
+        assert record.epoch == to_epoch(created_at)
+        assert record == order
+        assert record.to_model() == order
+
+    def test_compact_and_shared_values(self):
+        """Test absence de __dict__ et devise internée."""
+        first = OrderRecord.from_order(
+            make_order(datetime.now(timezone.utc), currency="".join("EUR"))
+        )
+        second = OrderRecord.from_order(make_order(datetime.now(timezone.utc)))
+
+        assert not hasattr(first, "__dict__")
+        assert first.currency is second.currency
+        assert sys.getsizeof(first) < sys.getsizeof(make_order(datetime.now()))
+
+
+class TestOrderApiBoundary:
+    """Tests de la matérialisation des modèles à la frontière de l'API."""
+
+    @pytest.fixture
+    def admin_headers(self):
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_created_order_is_returned_unchanged(self, admin_headers):
+        """Test réponse identique à la création et à la lecture."""
+        payload = {
+            "orderId": "rec-api-1",
+            "createdAt": "2025-06-01T12:30:00+02:00",
+            "totalAmount": 42.5,
+            "currency": "EUR",
+        }
+
+        created = client.post("/orders/", json=payload, headers=admin_headers)
+        fetched = client.get("/orders/rec-api-1", headers=admin_headers)
+
+        assert created.json() == payload
+        assert fetched.json() == payload
+
+    @pytest.mark.parametrize(
+        "amount, currency", [(0.001, "EUR"), (0.4, "JPY"), (1.5, "XOF")]
+    )
+    def test_amount_finer_than_minor_unit_rejected(
+        self, admin_headers, amount, currency
+    ):
+        """Test 422 plutôt qu'un montant arrondi silencieusement."""
+        payload = {
+            "orderId": f"rec-api-precision-{currency}",
+            "createdAt": "2025-06-01T12:30:00Z",
+            "totalAmount": amount,
+            "currency": currency,
+        }
+
+        response = client.post("/orders/", json=payload, headers=admin_headers)
+
+        assert response.status_code == 422
+        assert currency in str(response.json()["detail"])
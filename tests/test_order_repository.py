@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+
+from poshub_api.orders.repository import (
+    InMemoryOrderRepository,
+    SQLiteOrderRepository,
+)
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+
+def make_order(order_id: str, amount: float = 10.0) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc),
+        totalAmount=amount,
+        currency="EUR",
+    )
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite"])
+async def repository(request, tmp_path):
+    """Dépôt de commandes pour chaque backend."""
+    if request.param == "memory":
+        repo = InMemoryOrderRepository()
+    else:
+        repo = SQLiteOrderRepository(str(tmp_path / "orders.db"))
+    yield repo
+    await repo.close()
+
+
+@pytest.mark.asyncio
+class TestOrderRepository:
+    """Tests communs à tous les backends de stockage."""
+
+    async def test_add_and_get(self, repository):
+        """Test qu'une commande enregistrée est relue à l'identique."""
+        order = make_order("order-1", 42.5)
+        await repository.add(order)
+
+        result = await repository.get("order-1")
+
+        assert result == order
+        assert await repository.count() == 1
+
+    async def test_get_missing_returns_none(self, repository):
+        """Test récupération d'une commande inexistante."""
+        assert await repository.get("missing") is None
+
+    async def test_concurrent_adds(self, repository):
+        """Test écritures concurrentes regroupées en lots."""
+        orders = [make_order(f"order-{i}", i + 1) for i in range(500)]
+
+        await asyncio.gather(*(repository.add(order) for order in orders))
+
+        assert await repository.count() == 500
+        assert (await repository.get("order-499")).totalAmount == 500
+
+    async def test_add_many(self, repository):
+        """Test insertion en masse."""
+        await repository.add_many(make_order(f"bulk-{i}") for i in range(1000))
+
+        assert await repository.count() == 1000
+
+    async def test_service_uses_repository(self, repository):
+        """Test que OrderService délègue au dépôt fourni."""
+        service = OrderService(repository)
+        await service.create_order(make_order("svc-1"))
+
+        assert (await service.get_order("svc-1")).orderId == "svc-1"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_survives_reopen(tmp_path):
+    """Test que les commandes SQLite persistent après réouverture."""
+    path = str(tmp_path / "orders.db")
+    repo = SQLiteOrderRepository(path)
+    await repo.add(make_order("persisted"))
+    await repo.close()
+
+    reopened = SQLiteOrderRepository(path)
+    try:
+        assert (await reopened.get("persisted")).currency == "EUR"
+    finally:
+        await reopened.close()
@@ -0,0 +1,192 @@
+import asyncio
+import fcntl
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+from poshub_api.orders.shared import (
+    SharedMemoryOrderRepository,
+    SharedRecordTooLargeError,
+    SharedStoreFullError,
+)
+
+BASE = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+
+def make_order(i: int, amount: float = 10.0) -> OrderIn:
+    return OrderIn(
+        orderId=f"shm-{i}",
+        createdAt=BASE + timedelta(minutes=i),
+        totalAmount=amount,
+        currency="EUR",
+    )
+
+
+def write_orders(path: str, start: int, count: int) -> None:
+    """Écriture depuis un autre processus, comme un second worker."""
+
+    async def run():
+        repository = SharedMemoryOrderRepository(path, capacity=64)
+        await repository.add_many(
+            make_order(i) for i in range(start, start + count)
+        )
+        await repository.close()
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "orders.shm")
+
+
+@pytest_asyncio.fixture
+async def repository(path):
+    repository = SharedMemoryOrderRepository(path, capacity=64)
+    yield repository
+    await repository.close()
+
+
+@pytest.mark.asyncio
+class TestSharedMemoryOrderRepository:
+    """Tests du dépôt partagé en mémoire projetée."""
+
+    async def test_add_get_and_replace(self, repository):
+        """Test écriture, lecture et remplacement d'une commande."""
+        await repository.add(make_order(1, 12.5))
+        await repository.add(make_order(1, 13.5))
+
+        order = await repository.get("shm-1")
+
+        assert order.totalAmount == 13.5
+        assert order.createdAt == BASE + timedelta(minutes=1)
+        assert await repository.get("missing") is None
+        assert await repository.count() == 1
+
+    async def test_get_many_and_scan(self, repository):
+        """Test lecture groupée et parcours de la table."""
+        await repository.add_many(make_order(i) for i in range(40))
+
+        found = await repository.get_many(["shm-0", "shm-39", "missing"])
+        scanned = [
+            order.orderId
+            async for batch in repository.scan(batch_size=10)
+            for order in batch
+        ]
+
+        assert set(found) == {"shm-0", "shm-39"}
+        assert sorted(scanned) == sorted(f"shm-{i}" for i in range(40))
+
+    async def test_visible_from_other_process(self, path, repository):
+        """Test commandes écrites par un autre processus."""
+        process = multiprocessing.get_context("fork").Process(
+            target=write_orders, args=(path, 100, 10)
+        )
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert (await repository.get("shm-105")).orderId == "shm-105"
+        assert await repository.count() == 10
+
+    async def test_limits(self, repository):
+        """Test table pleine et orderId trop long."""
+        # 33 caractères, mais 66 octets en UTF-8
+        too_long = OrderIn(
+            orderId="é" * 33, createdAt=BASE, totalAmount=1.0, currency="EUR"
+        )
+        with pytest.raises(SharedRecordTooLargeError):
+            repository.check(too_long)
+        with pytest.raises(SharedRecordTooLargeError):
+            await repository.add(too_long)
+        with pytest.raises(SharedStoreFullError) as full:
+            await repository.add_many(make_order(i) for i in range(64))
+        assert full.value.stored == 48
+        assert await repository.count() == 48
+
+    async def test_lock_contention_does_not_block_loop(self, repository):
+        """Test verrou tenu par un autre worker : la boucle reste libre."""
+        await repository.add(make_order(1))
+        other = SharedMemoryOrderRepository(repository.path, capacity=64)
+        fcntl.flock(other._fd, fcntl.LOCK_EX)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(tick())
+        read = asyncio.create_task(repository.get("shm-1"))
+        await asyncio.sleep(0.02)
+        assert not read.done()
+        fcntl.flock(other._fd, fcntl.LOCK_UN)
+        order = await read
+        ticker.cancel()
+
+        assert order.orderId == "shm-1"
+        assert ticks > 5
+        assert repository.stats()["lock_retries"] > 0
+        await other.close()
+
+    async def test_changes_in_bounded_batches(self, path):
+        """Test flux de modifications rendu par lots bornés."""
+        writer = SharedMemoryOrderRepository(path, 64)
+        reader = SharedMemoryOrderRepository(path, 64, catch_up_batch=4)
+        await writer.add_many(make_order(i) for i in range(10))
+
+        orders, position = await reader.changes_since(0)
+
+        assert [o.orderId for o in orders] == [f"shm-{i}" for i in range(4)]
+        assert position == 4
+        await writer.close()
+        await reader.close()
+
+
+@pytest.mark.asyncio
+class TestSharedOrderService:
+    """Tests des index locaux alimentés par le flux de modifications."""
+
+    async def test_index_catches_up_with_other_workers(self, path):
+        """Test liste et statistiques après écriture sur un autre worker."""
+        worker_1 = OrderService(SharedMemoryOrderRepository(path, 64))
+        worker_2 = OrderService(SharedMemoryOrderRepository(path, 64))
+        await worker_2.list_orders()
+
+        await worker_1.create_orders([make_order(i) for i in range(3)])
+        orders, _ = await worker_2.list_orders()
+        stats = await worker_2.order_stats(BASE, BASE + timedelta(hours=1))
+
+        assert [o.orderId for o in orders] == ["shm-0", "shm-1", "shm-2"]
+        assert stats["totals"]["EUR"]["count"] == 3
+
+    async def test_rebuild_when_feed_overwritten(self, path):
+        """Test reconstruction complète si le retard dépasse l'anneau."""
+        worker_1 = OrderService(SharedMemoryOrderRepository(path, 8))
+        worker_2 = OrderService(SharedMemoryOrderRepository(path, 8))
+        await worker_2.list_orders()
+
+        for amount in range(1, 20):
+            await worker_1.create_order(make_order(1, float(amount)))
+        orders, _ = await worker_2.list_orders()
+
+        assert [o.totalAmount for o in orders] == [19.0]
+        assert len(worker_2.index) == 1
+
+    async def test_catch_up_over_several_batches(self, path):
+        """Test rattrapage complet en plusieurs lots bornés."""
+        worker_1 = OrderService(SharedMemoryOrderRepository(path, 64))
+        worker_2 = OrderService(
+            SharedMemoryOrderRepository(path, 64, catch_up_batch=3)
+        )
+        await worker_2.list_orders()
+
+        await worker_1.create_orders([make_order(i) for i in range(10)])
+        orders, _ = await worker_2.list_orders()
+
+        assert len(orders) == 10
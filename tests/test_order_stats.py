@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders.rollups import DAY, HOUR, MINUTE, cover
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.service import OrderService
+
+client = TestClient(app)
+
+BASE = datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+def brute_force(orders, start, end, currency):
+    amounts = [
+        o.totalAmount
+        for o in orders.values()
+        if o.currency == currency and start <= o.createdAt < end
+    ]
+    return len(amounts), sum(amounts), min(amounts), max(amounts)
+
+
+class TestCover:
+    """Tests du découpage d'une fenêtre en seaux alignés."""
+
+    def test_cover_is_exact_and_small(self):
+        """Test que le découpage couvre exactement la fenêtre."""
+        start = int(BASE.timestamp()) + 7 * MINUTE
+        end = start + 3 * DAY + 5 * HOUR + 11 * MINUTE
+        buckets = list(cover(start, end))
+
+        assert sum(size for size, _ in buckets) == end - start
+        assert all(b_start % size == 0 for size, b_start in buckets)
+        assert len(buckets) < 2 * (59 + 23) + 4
+
+
+@pytest.mark.asyncio
+class TestRollupsMatchOrders:
+    """Les agrégats doivent correspondre à un calcul exhaustif."""
+
+    async def test_totals_with_replacements(self):
+        """Test totaux corrects après remplacement de commandes."""
+        rng = random.Random(42)
+        service = OrderService()
+        # Index chargés : les remplacements passent par rollups.remove()
+        await service.order_stats(BASE, BASE)
+        orders = {}
+        for i in range(2000):
+            order = OrderIn(
+                orderId=f"stat-{rng.randrange(1500)}",
+                createdAt=BASE + timedelta(seconds=rng.randrange(3 * DAY)),
+                totalAmount=rng.randrange(1, 10000) / 100,
+                currency=rng.choice(["EUR", "USD"]),
+            )
+            orders[order.orderId] = order
+            await service.create_order(order)
+
+        start = BASE + timedelta(hours=5, minutes=17)
+        end = BASE + timedelta(days=2, hours=3, minutes=42)
+        stats = await service.order_stats(start, end)
+
+        for currency in ("EUR", "USD"):
+            count, total, low, high = brute_force(orders, start, end, currency)
+            result = stats["totals"][currency]
+            assert result["count"] == count
+            assert result["total"] == pytest.approx(total)
+            assert (result["min"], result["max"]) == (low, high)
+
+    async def test_hourly_series(self):
+        """Test série horaire par devise."""
+        service = OrderService()
+        for i, amount in enumerate([10.0, 20.0, 5.0]):
+            await service.create_order(
+                OrderIn(
+                    orderId=f"series-{i}",
+                    createdAt=BASE + timedelta(minutes=50 * i),
+                    totalAmount=amount,
+                    currency="EUR",
+                )
+            )
+
+        stats = await service.order_stats(
+            BASE, BASE + timedelta(hours=3), granularity="hour"
+        )
+
+        assert [(b["count"], b["total"]) for b in stats["buckets"]] == [
+            (2, 30.0),
+            (1, 5.0),
+        ]
+
+
+class TestStatsEndpoint:
+    """Tests pour GET /orders/stats."""
+
+    def test_stats_requires_read_scope(self):
+        """Test que le scope orders:read est requis."""
+        login = client.post(
+            "/auth/login", data={"username": "demo", "password": "demo123"}
+        )
+        response = client.get(
+            "/orders/stats",
+            headers={
+                "Authorization": f"Bearer {login.json()['access_token']}"
+            },
+        )
+        assert response.status_code == 403
+
+    def test_too_many_buckets_400(self):
+        """Test série trop longue refusée."""
+        login = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+        response = client.get(
+            "/orders/stats",
+            params={
+                "createdFrom": "2000-01-01T00:00:00Z",
+                "createdTo": "2025-01-01T00:00:00Z",
+                "granularity": "minute",
+            },
+            headers={
+                "Authorization": f"Bearer {login.json()['access_token']}"
+            },
+        )
+        assert response.status_code == 400
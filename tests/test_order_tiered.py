@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+
+from poshub_api.orders.exceptions import OrderStoreFullException
+from poshub_api.orders.records import OrderRecord
+from poshub_api.orders.schemas import OrderIn
+from poshub_api.orders.tiered import (
+    COLD_ENTRY_OVERHEAD,
+    TieredOrderRepository,
+    estimate_size,
+)
+
+
+def make_order(order_id: str, amount: float = 10.0) -> OrderIn:
+    return OrderIn(
+        orderId=order_id,
+        createdAt=datetime(2025, 5, 1, 9, 30, tzinfo=timezone.utc),
+        totalAmount=amount,
+        currency="EUR",
+    )
+
+
+ORDER_SIZE = estimate_size(OrderRecord.from_order(make_order("tier-0000")))
+COLD_SIZE = COLD_ENTRY_OVERHEAD + sys.getsizeof("tier-0000")
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    """
+    Dépôt dont le niveau chaud contient une dizaine de commandes, à côté
+    des emplacements d'une centaine de commandes froides.
+    """
+    repository = TieredOrderRepository(
+        str(tmp_path),
+        memory_budget=ORDER_SIZE * 10 + COLD_SIZE * 100,
+        segment_size=5,
+    )
+    yield repository
+    await repository.close()
+
+
+@pytest.mark.asyncio
+class TestTieredOrderRepository:
+    """Tests du dépôt à niveaux chaud et froid."""
+
+    async def test_budget_is_respected(self, repository, tmp_path):
+        """Test éviction vers des segments compressés sur disque."""
+        await repository.add_many(
+            make_order(f"tier-{i:04d}") for i in range(100)
+        )
+
+        stats = repository.stats()
+        assert stats["hot_bytes"] + stats["fixed_bytes"] <= (
+            stats["memory_budget"]
+        )
+        assert stats["cold_segments"] > 0
+        assert stats["cold_bytes"] > 0
+        assert await repository.count() == 100
+        assert any(
+            name.startswith("segment-") for name in os.listdir(tmp_path)
+        )
+
+    async def test_cold_reads_are_transparent(self, repository):
+        """Test lecture d'une commande évincée puis remontée."""
+        await repository.add_many(
+            make_order(f"tier-{i:04d}", i + 1) for i in range(100)
+        )
+
+        order = await repository.get("tier-0000")
+
+        assert order.totalAmount == 1
+        assert repository.stats()["cold_hits"] == 1
+        assert "tier-0000" in repository.hot
+        assert await repository.get("tier-0000") == order
+        assert repository.stats()["hot_hits"] == 1
+        assert await repository.count() == 100
+
+    async def test_get_many_and_scan_cover_both_tiers(self, repository):
+        """Test lectures groupées et parcours sur les deux niveaux."""
+        ids = [f"tier-{i:04d}" for i in range(60)]
+        await repository.add_many(make_order(oid) for oid in ids)
+
+        found = await repository.get_many(ids + ["missing"])
+        scanned = [
+            order.orderId
+            async for batch in repository.scan(batch_size=7)
+            for order in batch
+        ]
+
+        assert set(found) == set(ids)
+        assert sorted(scanned) == ids
+        assert repository.stats()["misses"] == 1
+
+    async def test_replaced_order_drops_cold_copy(self, repository):
+        """Test remplacement d'une commande déjà évincée."""
+        await repository.add_many(
+            make_order(f"tier-{i:04d}") for i in range(50)
+        )
+
+        await repository.add(make_order("tier-0001", 99.0))
+        await repository.add_many(
+            make_order(f"more-{i:04d}") for i in range(50)
+        )
+
+        assert (await repository.get("tier-0001")).totalAmount == 99.0
+        assert await repository.count() == 100
+
+    async def test_age_eviction(self, tmp_path):
+        """Test éviction des commandes plus anciennes que hot_ttl."""
+        repository = TieredOrderRepository(
+            str(tmp_path), hot_ttl=0.01, segment_size=2
+        )
+        await repository.add_many(make_order(f"old-{i}") for i in range(4))
+        time.sleep(0.02)
+
+        await repository.add(make_order("new"))
+
+        assert list(repository.hot) == ["new"]
+        assert (await repository.get("old-0")) is not None
+
+    async def test_fixed_bytes_cap_the_store(self, tmp_path):
+        """Test refus des nouvelles commandes une fois le budget fixe plein."""
+        overhead = 500
+        repository = TieredOrderRepository(
+            str(tmp_path),
+            memory_budget=(COLD_SIZE + overhead) * 20,
+            segment_size=5,
+            order_overhead=overhead,
+        )
+
+        with pytest.raises(OrderStoreFullException) as excinfo:
+            await repository.add_many(
+                make_order(f"tier-{i:04d}") for i in range(30)
+            )
+        # Un remplacement ne coûte rien de plus
+        await repository.add(make_order("tier-0003", 42.0))
+
+        stats = repository.stats()
+        assert excinfo.value.stored == 20
+        assert await repository.count() == 20
+        assert stats["hot_bytes"] + stats["fixed_bytes"] <= (
+            stats["memory_budget"]
+        )
+        assert (await repository.get("tier-0003")).totalAmount == 42.0
+        with pytest.raises(OrderStoreFullException):
+            await repository.add(make_order("tier-0099"))
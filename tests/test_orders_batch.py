@@ -0,0 +1,280 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api.main import app
+from poshub_api.orders import router
+from poshub_api.orders.ingest import (
+    BatchFormatError,
+    iter_json_array_items,
+    iter_ndjson_lines,
+)
+from poshub_api.orders.service import OrderService
+from poshub_api.orders.shared import SharedMemoryOrderRepository
+
+client = TestClient(app)
+
+
+def order_payload(order_id: str, amount: float = 10.0) -> dict:
+    return {
+        "orderId": order_id,
+        "createdAt": "2025-01-01T12:00:00Z",
+        "totalAmount": amount,
+        "currency": "EUR",
+    }
+
+
+async def fragments(data: bytes, size: int):
+    """Simule un corps de requête reçu en petits fragments."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture
+def admin_headers():
+    response = client.post(
+        "/auth/login", data={"username": "admin", "password": "admin123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestBatchEndpoint:
+    """Tests pour POST /orders/batch."""
+
+    def test_ndjson_batch_reports_each_line(self, admin_headers):
+        """Test qu'une ligne invalide ne fait pas échouer le lot."""
+        body = "\n".join(
+            [
+                json.dumps(order_payload("batch-1")),
+                json.dumps({"orderId": "batch-bad"}),
+                json.dumps(order_payload("batch-2", 20.0)),
+            ]
+        )
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        report = [json.loads(line) for line in response.text.splitlines()]
+        assert [entry.get("status") for entry in report[:3]] == [
+            "created",
+            "rejected",
+            "created",
+        ]
+        assert report[1]["line"] == 2
+        assert report[-1]["summary"] == {
+            "created": 2,
+            "rejected": 1,
+            "error": 0,
+        }
+
+        stored = client.get("/orders/batch-2", headers=admin_headers)
+        assert stored.json()["totalAmount"] == 20.0
+
+    def test_json_array_batch(self, admin_headers):
+        """Test ingestion d'un tableau JSON."""
+        body = json.dumps([order_payload(f"array-{i}") for i in range(3)])
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/json"},
+        )
+
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+        assert summary["created"] == 3
+
+    @pytest.mark.parametrize("body", ["[,,{}]", "[{} {}]"])
+    def test_malformed_json_array_400(self, admin_headers, body):
+        """Test séparateurs invalides refusés avant toute insertion."""
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 400
+        assert "Expected" in response.json()["detail"]
+
+    def test_unsupported_media_type_415(self, admin_headers):
+        """Test type de contenu non supporté retourne 415."""
+        response = client.post(
+            "/orders/batch",
+            content="x",
+            headers={**admin_headers, "Content-Type": "text/plain"},
+        )
+        assert response.status_code == 415
+
+    def test_batch_requires_write_scope(self):
+        """Test que le scope orders:write est requis."""
+        login = client.post(
+            "/auth/login", data={"username": "user", "password": "user123"}
+        )
+        response = client.post(
+            "/orders/batch",
+            content="",
+            headers={
+                "Authorization": f"Bearer {login.json()['access_token']}",
+                "Content-Type": "application/x-ndjson",
+            },
+        )
+        assert response.status_code == 403
+
+
+class TestSharedStoreLimits:
+    """Tests des limites du dépôt partagé (8 cases, 6 commandes)."""
+
+    @pytest.fixture
+    def full_store(self, tmp_path, monkeypatch):
+        service = OrderService(
+            SharedMemoryOrderRepository(str(tmp_path / "orders.shm"), 8)
+        )
+        monkeypatch.setattr(router, "order_service", service)
+        return service
+
+    def test_batch_reports_orders_past_capacity(
+        self, admin_headers, full_store
+    ):
+        """Test commandes déjà écrites « created », les suivantes en erreur."""
+        body = "\n".join(
+            json.dumps(order_payload(f"full-{i}")) for i in range(8)
+        )
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        report = [json.loads(line) for line in response.text.splitlines()]
+        assert report[-1]["summary"] == {
+            "created": 6,
+            "rejected": 0,
+            "error": 2,
+        }
+        assert report[6]["orderId"] == "full-6"
+        assert report[6]["status"] == "error"
+        stored = client.get("/orders/full-5", headers=admin_headers)
+        assert stored.status_code == 200
+        missing = client.get("/orders/full-6", headers=admin_headers)
+        assert missing.status_code == 404
+
+    def test_create_order_507(self, admin_headers, full_store):
+        """Test POST /orders sur un dépôt plein retourne 507."""
+        for i in range(6):
+            response = client.post(
+                "/orders",
+                json=order_payload(f"full-{i}"),
+                headers=admin_headers,
+            )
+            assert response.status_code == 200
+        response = client.post(
+            "/orders", json=order_payload("full-6"), headers=admin_headers
+        )
+
+        assert response.status_code == 507
+        assert response.json()["detail"] == "Order store is full"
+
+    def test_oversized_order_id_rejected_alone(
+        self, admin_headers, full_store
+    ):
+        """Test orderId trop long pour sa case rejeté sans ses voisines."""
+        body = "\n".join(
+            json.dumps(order_payload(order_id))
+            for order_id in ("batch-long-1", "é" * 33, "batch-long-2")
+        )
+        response = client.post(
+            "/orders/batch",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        )
+
+        report = [json.loads(line) for line in response.text.splitlines()]
+        assert [entry.get("status") for entry in report[:3]] == [
+            "created",
+            "rejected",
+            "created",
+        ]
+        assert report[1]["errors"][0]["type"] == "store"
+
+    def test_oversized_order_id_422(self, admin_headers, full_store):
+        """Test POST /orders d'un orderId trop long pour le dépôt partagé."""
+        response = client.post(
+            "/orders", json=order_payload("é" * 33), headers=admin_headers
+        )
+
+        assert response.status_code == 422
+        assert "64 bytes" in response.json()["detail"]
+
+    def test_long_order_id_accepted_elsewhere(self, admin_headers):
+        """Test la limite ne s'applique qu'avec le dépôt partagé."""
+        response = client.post(
+            "/orders", json=order_payload("é" * 40), headers=admin_headers
+        )
+
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+class TestStreamingParsers:
+    """Tests des lecteurs incrémentaux sur des fragments arbitraires."""
+
+    async def test_ndjson_split_across_fragments(self):
+        """Test lignes coupées entre plusieurs fragments."""
+        data = b'{"a": 1}\n\n{"b": 2}\n{"c": 3}'
+        lines = [item async for item in iter_ndjson_lines(fragments(data, 3))]
+
+        assert lines == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+    async def test_json_array_split_across_fragments(self):
+        """Test éléments et caractères UTF-8 coupés entre fragments."""
+        data = json.dumps([{"name": "crème"}, {"n": 2}], ensure_ascii=False)
+        data = data.encode()
+        items = [
+            item async for item in iter_json_array_items(fragments(data, 2))
+        ]
+
+        assert items == [(1, {"name": "crème"}), (2, {"n": 2})]
+
+    @pytest.mark.parametrize("size", [1, 64])
+    async def test_json_array_separators(self, size):
+        """Test espaces autour des virgules, tableau vide."""
+        data = b' [ {"a": 1} ,\n{"b": 2}\t] \n'
+        items = [
+            item async for item in iter_json_array_items(fragments(data, size))
+        ]
+        empty = [
+            item async for item in iter_json_array_items(fragments(b"[ ]", 1))
+        ]
+
+        assert items == [(1, {"a": 1}), (2, {"b": 2})]
+        assert empty == []
+
+    @pytest.mark.parametrize(
+        "data, produced",
+        [
+            (b"[,,{}]", 0),
+            (b"[,{}]", 0),
+            (b"[{} {}]", 0),
+            (b"[{},,{}]", 1),
+            (b"[{},]", 1),
+            (b"[{}] {}", 1),
+        ],
+    )
+    async def test_json_array_bad_separators_raise(self, data, produced):
+        """Test virgule manquante, en trop ou donnée après le tableau."""
+        items = []
+        with pytest.raises(BatchFormatError):
+            async for item in iter_json_array_items(fragments(data, 1)):
+                items.append(item)
+
+        # Un élément n'est produit qu'une fois son séparateur lu
+        assert len(items) == produced
+
+    async def test_truncated_json_array_raises(self):
+        """Test tableau tronqué."""
+        with pytest.raises(BatchFormatError):
+            async for _ in iter_json_array_items(fragments(b'[{"a": 1', 4)):
+                pass
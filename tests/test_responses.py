@@ -0,0 +1,75 @@
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api import responses
+from poshub_api.main import app
+from poshub_api.responses import FastJSONResponse, dumps
+
+client = TestClient(app)
+
+CONTENT = {
+    "amount": Decimal("10.50"),
+    "utc": datetime(2025, 9, 1, 8, 0, 0, 250000, tzinfo=timezone.utc),
+    "paris": datetime(2025, 9, 1, 10, 0, tzinfo=timezone(timedelta(hours=2))),
+    "naive": datetime(2025, 9, 1, 8, 0),
+    "nan": float("nan"),
+    "tags": ("a", "é"),
+}
+
+
+class TestFastJSON:
+    """Tests du rendu JSON rapide."""
+
+    def test_types(self):
+        """Test datetime, Decimal et NaN."""
+        assert json.loads(dumps(CONTENT)) == {
+            "amount": "10.50",
+            "utc": "2025-09-01T08:00:00.250000Z",
+            "paris": "2025-09-01T10:00:00+02:00",
+            "naive": "2025-09-01T08:00:00",
+            "nan": None,
+            "tags": ["a", "é"],
+        }
+
+    def test_engines_identical(self, monkeypatch):
+        """Test même sortie avec ou sans orjson."""
+        if responses.orjson is None:
+            pytest.skip("orjson non installé")
+        with_orjson = dumps(CONTENT)
+        monkeypatch.setattr(responses, "orjson", None)
+
+        assert dumps(CONTENT) == with_orjson
+
+    def test_compact_utf8(self):
+        """Test rendu compact, non échappé."""
+        response = FastJSONResponse({"devise": "€", "n": [1, 2]})
+        assert response.body == '{"devise":"€","n":[1,2]}'.encode()
+        assert response.media_type == "application/json"
+
+
+class TestDefaultResponseClass:
+    """Tests du câblage sur l'application."""
+
+    def test_routes_use_fast_json(self):
+        """Test classe de réponse par défaut des routes."""
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.content.startswith(b'{"status":"healthy"')
+
+    def test_metrics(self):
+        """Test /metrics rendu directement."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "idempotency" in response.json()
+
+    def test_errors_unchanged(self):
+        """Test erreurs de validation toujours en JSON."""
+        response = client.post("/auth/login-json", json={})
+        assert response.status_code == 422
+        assert "detail" in response.json()
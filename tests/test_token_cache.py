@@ -0,0 +1,110 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+from pydantic import ValidationError
+
+from poshub_api import auth
+from poshub_api.auth import (
+    ALGORITHM,
+    SECRET_KEY,
+    TokenCache,
+    User,
+    create_access_token,
+    verify_token,
+)
+from poshub_api.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TokenCache()
+    monkeypatch.setattr(auth, "token_cache", cache)
+    return cache
+
+
+def make_token(username="pos-1", minutes=30) -> str:
+    return create_access_token(
+        {"sub": username, "scopes": ["orders:read"]},
+        expires_delta=timedelta(minutes=minutes),
+    )
+
+
+class TestVerifyTokenCache:
+    """Tests du cache des tokens vérifiés."""
+
+    def test_same_principal_reused(self, cache):
+        """Test même token : même utilisateur, sans nouveau décodage."""
+        token = make_token()
+
+        first = verify_token(token)
+        second = verify_token(token)
+
+        assert second is first
+        assert first.username == "pos-1"
+        assert first.scopes == ("orders:read",)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_principal_is_immutable(self, cache):
+        """Test utilisateur partagé non modifiable."""
+        user = verify_token(make_token())
+        with pytest.raises(ValidationError):
+            user.scopes = ("orders:write",)
+
+    def test_entry_expires_with_token(self):
+        """Test entrée écartée à l'expiration du token."""
+        now = [1000.0]
+        cache = TokenCache(clock=lambda: now[0])
+        user = User(username="pos-1")
+        cache.put("token", user, expires_at=1030.0)
+
+        assert cache.get("token") is user
+        now[0] = 1030.0
+        assert cache.get("token") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_bound(self):
+        """Test éviction de l'entrée la moins récemment utilisée."""
+        cache = TokenCache(max_entries=2)
+        expires_at = time.time() + 60
+        for name in ("a", "b"):
+            cache.put(name, User(username=name), expires_at)
+        cache.get("a")
+        cache.put("c", User(username="c"), expires_at)
+
+        assert cache.get("b") is None
+        assert cache.get("a").username == "a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalid_token_not_cached(self, cache):
+        """Test token invalide : 401, rien en cache."""
+        token = make_token()[:-2] + "xx"
+        with pytest.raises(HTTPException) as error:
+            verify_token(token)
+
+        assert error.value.status_code == 401
+        assert cache.stats()["size"] == 0
+
+    def test_token_without_exp_not_cached(self, cache):
+        """Test token sans exp vérifié à chaque fois."""
+        token = jwt.encode({"sub": "pos-1"}, SECRET_KEY, algorithm=ALGORITHM)
+
+        assert verify_token(token).username == "pos-1"
+        assert cache.stats()["size"] == 0
+
+
+def test_metrics_exposed():
+    """Test compteurs du cache dans /metrics."""
+    token = make_token("admin")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/auth/me", headers=headers)
+    response = client.get("/auth/me", headers=headers)
+
+    assert response.json()["scopes"] == ["orders:read"]
+    assert client.get("/metrics").json()["auth_tokens"]["hits"] >= 1
@@ -0,0 +1,182 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from poshub_api import auth, users
+from poshub_api.main import app
+from poshub_api.users import (
+    PasswordVerifier,
+    PasswordVerifierBusy,
+    SQLiteUserStore,
+    StoredUser,
+    hash_password,
+    verify_password,
+)
+
+client = TestClient(app)
+
+
+class TestPasswords:
+    """Tests du hachage des mots de passe."""
+
+    def test_hash_and_verify(self):
+        """Test bcrypt : bon et mauvais mot de passe, haché invalide."""
+        hashed = hash_password("s3cret", rounds=4)
+
+        assert hashed.startswith("$2b$04$")
+        assert verify_password("s3cret", hashed)
+        assert not verify_password("other", hashed)
+        assert not verify_password("s3cret", "not-a-hash")
+
+    def test_long_password_truncated(self):
+        """Test mot de passe de plus de 72 octets tronqué, pas refusé."""
+        password = "é" * 50
+        assert verify_password(password, hash_password(password, rounds=4))
+
+    def test_dummy_hash_at_seed_cost(self):
+        """Test haché des comptes inconnus au coût des comptes livrés."""
+        verifier = PasswordVerifier(workers=1)
+        dummy = users._dummy_hash(verifier.dummy_rounds)
+        verifier.close()
+
+        assert {
+            users.hash_cost(user.password_hash)
+            for user in users.TEST_USERS.values()
+        } == {users.hash_cost(dummy)}
+        assert users.hash_cost("not-a-hash") is None
+
+    def test_demo_accounts(self):
+        """Test comptes de démonstration hachés."""
+        stored = users.TEST_USERS["admin"]
+        assert verify_password("admin123", stored.password_hash)
+        assert "orders:write" in stored.scopes
+
+
+@pytest.mark.asyncio
+class TestPasswordVerifier:
+    """Tests du pool de vérification."""
+
+    async def test_runs_off_event_loop(self, monkeypatch):
+        """Test vérification exécutée dans le pool dédié."""
+        threads = []
+
+        def recording(password, password_hash):
+            threads.append(threading.current_thread().name)
+            return True
+
+        monkeypatch.setattr(users, "verify_password", recording)
+        verifier = PasswordVerifier(workers=1)
+
+        assert await verifier.verify("pw", "hash")
+        assert threads[0].startswith("password-hash")
+        verifier.close()
+
+    async def test_unknown_user_fails(self):
+        """Test compte inconnu : toujours refusé."""
+        verifier = PasswordVerifier(workers=1)
+
+        assert not await verifier.verify("admin123", None)
+        assert verifier.stats()["rejected"] == 1
+        verifier.close()
+
+    async def test_dummy_follows_stored_cost(self):
+        """Test haché factice au coût du dernier haché stocké vérifié."""
+        verifier = PasswordVerifier(workers=1)
+
+        await verifier.verify("pw", hash_password("pw", rounds=4))
+
+        assert verifier.dummy_rounds == 4
+        assert not await verifier.verify("pw", None)
+        verifier.close()
+
+    async def test_saturated(self):
+        """Test file pleine : refus immédiat."""
+        verifier = PasswordVerifier(workers=1, max_pending=0)
+
+        with pytest.raises(PasswordVerifierBusy):
+            await verifier.verify("pw", "hash")
+        assert verifier.stats()["busy"] == 1
+        verifier.close()
+
+
+@pytest.mark.asyncio
+class TestSQLiteUserStore:
+    """Tests du dépôt SQLite des comptes."""
+
+    async def test_seed_cache_and_put(self, tmp_path):
+        """Test amorçage, lectures en cache et mise à jour."""
+        path = str(tmp_path / "users.db")
+        store = SQLiteUserStore(path, seed=users.TEST_USERS.values())
+
+        admin = await store.get("admin")
+        assert admin == users.TEST_USERS["admin"]
+        assert await store.get("admin") == admin
+        assert await store.get("nobody") is None
+        assert await store.get("nobody") is None
+        assert store.stats()["hits"] == 2
+        assert store.stats()["misses"] == 2
+
+        await store.put(StoredUser("pos-1", "hash", ("orders:read",)))
+        assert (await store.get("pos-1")).scopes == ("orders:read",)
+        store.close()
+
+        # Persistant, et l'amorçage ne réécrit pas une base existante
+        reopened = SQLiteUserStore(path, seed=[StoredUser("admin", "x")])
+        assert (await reopened.get("pos-1")).password_hash == "hash"
+        assert (await reopened.get("admin")).password_hash != "x"
+        reopened.close()
+
+    async def test_cache_expires(self, tmp_path):
+        """Test entrée relue après expiration du cache."""
+        now = [0.0]
+        store = SQLiteUserStore(
+            str(tmp_path / "users.db"), cache_ttl=10, clock=lambda: now[0]
+        )
+        assert await store.get("late") is None
+        store._write(StoredUser("late", "hash"))
+        now[0] = 11.0
+
+        assert (await store.get("late")).username == "late"
+        store.close()
+
+
+class TestLogin:
+    """Tests de la connexion avec le dépôt de comptes."""
+
+    def test_login_from_sqlite_store(self, tmp_path, monkeypatch):
+        """Test connexion d'un compte stocké en SQLite."""
+        store = SQLiteUserStore(
+            str(tmp_path / "users.db"),
+            seed=[
+                StoredUser(
+                    "pos-7", hash_password("pw-7", rounds=4), ("demo:read",)
+                )
+            ],
+        )
+        monkeypatch.setattr(auth, "user_store", store)
+
+        response = client.post(
+            "/auth/login-json", json={"username": "pos-7", "password": "pw-7"}
+        )
+        rejected = client.post(
+            "/auth/login-json", json={"username": "pos-7", "password": "bad"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["scopes"] == ["demo:read"]
+        assert rejected.status_code == 401
+        store.close()
+
+    def test_saturated_verifier_returns_503(self, monkeypatch):
+        """Test vérifications saturées : 503 avec Retry-After."""
+        monkeypatch.setattr(
+            auth, "password_verifier", PasswordVerifier(max_pending=0)
+        )
+
+        response = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin123"}
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"